@@ -0,0 +1,53 @@
+import logging
+
+import click
+
+from cfre.benchmarks.cases import benchmark_cases
+from cfre.benchmarks.runner import DEFAULT_THRESHOLD, MIN_TIME
+from cfre.benchmarks.runner import find_regressions, load_results, run_case, save_results
+
+logger = logging.getLogger(__name__)
+
+
+@click.command(name='bench')
+@click.option('--savepath', '-s', type=click.Path(dir_okay=False, writable=True),
+              help='Save results as JSON, e.g. to be used as a baseline later.')
+@click.option('--baseline', '-b', type=click.Path(dir_okay=False, readable=True, exists=True),
+              help='Results saved by a previous run to compare against.')
+@click.option('--threshold', '-t', type=click.FloatRange(min=0), default=DEFAULT_THRESHOLD,
+              help='Fail if any benchmark is slower than the baseline by more '
+                   'than this fraction.')
+@click.option('--filter', '-k', 'name_filter',
+              help='Only run benchmarks whose id contains this string.')
+@click.option('--min-time', type=click.FloatRange(min=0), default=MIN_TIME,
+              help='Minimum number of seconds spent measuring each benchmark.')
+def run_benchmarks(savepath: str,
+                   baseline: str,
+                   threshold: float,
+                   name_filter: str,
+                   min_time: float):
+    cases = [c for c in benchmark_cases() if name_filter is None or name_filter in c.id]
+    logger.info(f'Running {len(cases)} benchmarks.')
+    results = []
+    for case in cases:
+        result = run_case(case, min_time)
+        logger.info(f'{result.id}: {result.iterations_per_second:.1f} iterations/s, '
+                    f'peak memory {result.peak_memory / 1024:.1f} KiB')
+        results.append(result)
+
+    if savepath is not None:
+        logger.info(f'Saving results to {savepath}.')
+        save_results(results, savepath)
+
+    if baseline is not None:
+        regressions = find_regressions(results, load_results(baseline), threshold)
+        for r in regressions:
+            logger.error(f'{r.id} regressed by {r.slowdown:.0%}: '
+                         f'{r.iterations_per_second:.1f} iterations/s against '
+                         f'{r.baseline_iterations_per_second:.1f} in the baseline')
+
+        if regressions:
+            raise click.ClickException(f'{len(regressions)} benchmarks regressed '
+                                       f'by more than {threshold:.0%}')
+
+        logger.info(f'No benchmark regressed by more than {threshold:.0%}.')
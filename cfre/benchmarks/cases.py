@@ -0,0 +1,143 @@
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from cfre.blotto.allocations import action_to_battlefields, comb_with_repetition
+from cfre.blotto.blotto_bot import BlottoBot
+from cfre.kuhn.information_set import InformationSetTable, load_infosets, save_infosets
+from cfre.kuhn.kuhn_trainer import KuhnTrainer
+from cfre.kuhn.update_rules import ALGORITHMS
+from cfre.rps.rps_bot import RPSBot
+
+
+# Number of precomputed random actions cycled through by benchmarks of bots
+NUM_RANDOM_ACTIONS = 1024
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """Single benchmarked operation with fixed parameters
+
+    `setup` prepares everything the operation needs outside of measurements
+        and returns a function performing one iteration of the operation.
+    """
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def id(self) -> str:
+        params = ','.join(f'{k}={v}' for k, v in self.params.items())
+        return f'{self.name}[{params}]' if params else self.name
+
+
+def benchmark_cases() -> List[BenchmarkCase]:
+    """All benchmarks of hot paths of the solvers"""
+    cases = []
+    for soldiers, battlefields in [(5, 3), (10, 5), (20, 8)]:
+        params = {'soldiers': soldiers, 'battlefields': battlefields}
+        cases.append(BenchmarkCase('action_to_battlefields',
+                                   _action_to_battlefields_setup(soldiers, battlefields), params))
+
+    for elements, bins in [(5, 3), (100, 10), (1000, 50)]:
+        cases.append(BenchmarkCase('comb_with_repetition',
+                                   lambda e=elements, b=bins: lambda: comb_with_repetition(e, b),
+                                   {'elements': elements, 'bins': bins}))
+
+    for soldiers, battlefields in [(5, 3), (10, 5), (15, 6)]:
+        cases.append(BenchmarkCase('BlottoBot.update_regret',
+                                   _blotto_update_setup(soldiers, battlefields),
+                                   {'soldiers': soldiers, 'battlefields': battlefields}))
+
+    cases.append(BenchmarkCase('RPSBot.act', lambda: RPSBot().act))
+    cases.append(BenchmarkCase('RPSBot.update_regret', _rps_update_setup))
+
+    for algorithm in ALGORITHMS:
+        cases.append(BenchmarkCase('KuhnTrainer.play_round',
+                                   lambda a=algorithm: KuhnTrainer(algorithm=a).play_round,
+                                   {'algorithm': algorithm}))
+
+    for num_infosets in [12, 10000, 100000]:
+        params = {'infosets': num_infosets}
+        cases.append(BenchmarkCase('save_infosets', _save_infosets_setup(num_infosets), params))
+        cases.append(BenchmarkCase('load_infosets', _load_infosets_setup(num_infosets), params))
+
+    return cases
+
+
+def _action_to_battlefields_setup(soldiers: int, battlefields: int) -> Callable:
+    def setup():
+        actions = _cycle(np.random.default_rng(0).integers(
+            1, comb_with_repetition(soldiers, battlefields) + 1, NUM_RANDOM_ACTIONS))
+        return lambda: action_to_battlefields(next(actions), soldiers, battlefields)
+
+    return setup
+
+
+def _blotto_update_setup(soldiers: int, battlefields: int) -> Callable:
+    def setup():
+        bot = BlottoBot(soldiers, battlefields)
+        actions = _cycle(np.random.default_rng(0).integers(
+            1, comb_with_repetition(soldiers, battlefields) + 1, NUM_RANDOM_ACTIONS))
+        return lambda: _play_step(bot, next(actions))
+
+    return setup
+
+
+def _rps_update_setup() -> Callable:
+    bot = RPSBot()
+    actions = _cycle(np.random.default_rng(0).integers(0, 3, NUM_RANDOM_ACTIONS))
+    return lambda: _play_step(bot, next(actions))
+
+
+def _play_step(bot, opponent_action: int):
+    # Regrets are updated against the action chosen by the bot in the same step
+    bot.act()
+    bot.update_regret(opponent_action)
+
+
+def _save_infosets_setup(num_infosets: int) -> Callable:
+    def setup():
+        infosets = _random_infosets(num_infosets)
+        path = os.path.join(_benchmark_dir(), f'save_{num_infosets}.bin')
+        return lambda: save_infosets(infosets, path)
+
+    return setup
+
+
+def _load_infosets_setup(num_infosets: int) -> Callable:
+    def setup():
+        path = os.path.join(_benchmark_dir(), f'load_{num_infosets}.bin')
+        save_infosets(_random_infosets(num_infosets), path)
+        return lambda: load_infosets(path)
+
+    return setup
+
+
+def _random_infosets(num_infosets: int) -> InformationSetTable:
+    rng = np.random.default_rng(0)
+    avg_strategies = rng.dirichlet(np.ones(2), num_infosets)
+    return InformationSetTable.from_arrays([f'{i}pb' for i in range(num_infosets)],
+                                           rng.normal(size=(num_infosets, 2)),
+                                           avg_strategies, rng.random(num_infosets))
+
+
+_BENCHMARK_DIR = None
+
+
+def _benchmark_dir() -> str:
+    # Shared temporary directory, removed when the interpreter exits
+    global _BENCHMARK_DIR
+    if _BENCHMARK_DIR is None:
+        _BENCHMARK_DIR = tempfile.TemporaryDirectory(prefix='cfre-bench-')
+
+    return _BENCHMARK_DIR.name
+
+
+def _cycle(values: np.array):
+    values = values.tolist()
+    while True:
+        yield from values
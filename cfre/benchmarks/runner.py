@@ -0,0 +1,112 @@
+import json
+import platform
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Sequence
+
+from cfre.benchmarks.cases import BenchmarkCase
+
+
+# Measured iterations of a benchmark last at least this many seconds
+MIN_TIME = 0.5
+# Iterations run under tracemalloc to measure peak memory
+MEMORY_ITERATIONS = 10
+# Slowdown relative to the baseline above which a benchmark regressed
+DEFAULT_THRESHOLD = 0.2
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    id: str
+    iterations: int
+    seconds: float
+    iterations_per_second: float
+    # Peak memory in bytes allocated by Python while running iterations
+    peak_memory: int
+
+
+@dataclass(frozen=True)
+class Regression:
+    id: str
+    baseline_iterations_per_second: float
+    iterations_per_second: float
+
+    @property
+    def slowdown(self) -> float:
+        """Relative increase of time per iteration, e.g. 0.5 is 50% slower"""
+        return self.baseline_iterations_per_second / self.iterations_per_second - 1
+
+
+def run_case(case: BenchmarkCase, min_time: float = MIN_TIME) -> BenchmarkResult:
+    """Measures throughput and peak memory of a benchmark
+
+    Iterations are run in batches doubling in size until a batch lasts at
+        least `min_time`, so timer overhead is negligible even for operations
+        taking microseconds. Memory is measured in a separate short run, as
+        tracing allocations slows everything down.
+    """
+    iteration = case.setup()
+    # Warm up caches (e.g. allocation tables) before measuring
+    iteration()
+
+    batch = 1
+    while True:
+        start_time = time.perf_counter()
+        for _ in range(batch):
+            iteration()
+
+        seconds = time.perf_counter() - start_time
+        if seconds >= min_time:
+            break
+
+        batch *= 2
+
+    tracemalloc.start()
+    try:
+        for _ in range(MEMORY_ITERATIONS):
+            iteration()
+
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(case.id, batch, seconds, batch / seconds, peak_memory)
+
+
+def save_results(results: Sequence[BenchmarkResult], savepath: str):
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': [asdict(r) for r in results],
+    }
+    with open(savepath, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def load_results(loadpath: str) -> Dict[str, BenchmarkResult]:
+    """Returns results saved with `save_results` by benchmark id"""
+    with open(loadpath) as f:
+        report = json.load(f)
+
+    return {r['id']: BenchmarkResult(**r) for r in report['results']}
+
+
+def find_regressions(results: Sequence[BenchmarkResult],
+                     baseline: Dict[str, BenchmarkResult],
+                     threshold: float = DEFAULT_THRESHOLD) -> List[Regression]:
+    """Benchmarks slower than in `baseline` by more than `threshold`
+
+    Benchmarks missing in the baseline are skipped.
+    """
+    regressions = []
+    for result in results:
+        base = baseline.get(result.id)
+        if base is None:
+            continue
+
+        regression = Regression(result.id, base.iterations_per_second, result.iterations_per_second)
+        if regression.slowdown > threshold:
+            regressions.append(regression)
+
+    return regressions
@@ -1,43 +1,130 @@
 import logging
-import math
 
 import click
 import numpy as np
+from click.core import ParameterSource
 
-from cfre.blotto.blotto_bot import action_to_battlefields
-from cfre.blotto.blotto_bot import BlottoBot, comb_with_repetition
+from cfre.blotto.blotto_bot import create_blotto_engine
 from cfre.blotto.config import NUM_ROUNDS, NUM_SOLDIERS, NUM_BATTLEFIELDS
 from cfre.blotto.config import PLOT_REFRESH_RATE
+from cfre.blotto.payoffs import SymmetricBlottoPayoffs
 from cfre.utils.dynamic_plots import DynamicPlot, SubplotConfig
+from cfre.utils.metrics import create_sink, metrics_options
+from cfre.utils.profiling import PROFILER
+from cfre.utils.regret_matching import PrunedRegretMatching, RegretMatching
+from cfre.utils.scheduler import TrainingScheduler, scheduler_options
+from cfre.utils.scheduler import load_checkpoint, save_checkpoint
+from cfre.utils.seeding import seed_option
 
 logger = logging.getLogger(__name__)
 
 
-MAX_PLOTS_PER_COL = 5
+# Number of most probable strategies drawn in the plot
+MAX_PLOTTED_STRATEGIES = 10
 
 
 @click.command(name='blotto')
-def run_blotto_bot():
-    logger.info(f'Running {NUM_ROUNDS} iterations of the Blotto game.')
-    bot = BlottoBot(NUM_SOLDIERS, NUM_BATTLEFIELDS)
-    plot = _create_dynamic_plot()
-    for i in range(NUM_ROUNDS):
-        action1 = bot.act()
-        action2 = bot.act(perform_update=False)
-        bot.update_regret(action2)
-
-        if i % PLOT_REFRESH_RATE == 0:
-            plot.update(np.full(bot.avg_strategy.shape, i), bot.avg_strategy)
+@click.option('--savepath', '-s', type=click.Path(dir_okay=False, writable=True))
+@click.option('--loadpath', '-l', type=click.Path(dir_okay=False, readable=True, exists=True))
+@click.option('--runs', '-k', type=click.IntRange(min=1), default=1,
+              help='Number of independent self-play runs trained at once.')
+@click.option('--expected', is_flag=True,
+              help='Update regrets deterministically against the full mixed '
+                   'strategy of the opponent instead of a sampled action.')
+@click.option('--prune', is_flag=True,
+              help='Skip regret updates of strategies with strongly negative regret, '
+                   'pays off mainly together with --expected on large games.')
+@click.option('--symmetric', is_flag=True,
+              help='Train over allocations sorted by soldiers, i.e. classes of '
+                   'allocations equivalent up to permuting battlefields.')
+@click.option('--gap-tolerance', type=click.FloatRange(min=0),
+              help='Stop once the duality gap of the average strategy is at most this.')
+@scheduler_options
+@metrics_options
+@seed_option
+def run_blotto_bot(savepath: str,
+                   loadpath: str,
+                   runs: int,
+                   expected: bool,
+                   prune: bool,
+                   symmetric: bool,
+                   gap_tolerance: float,
+                   tolerance: float,
+                   max_time: float,
+                   metrics_path: str,
+                   headless: bool,
+                   seed: int):
+    start_round = 0
+    if loadpath is not None:
+        # Generator of the engine is restored from the checkpoint
+        start_round, engine = load_checkpoint(loadpath)
+        logger.info(f'Resuming training from round {start_round} saved in {loadpath}.')
+        _check_loaded_engine(engine, runs, prune, symmetric, seed)
+    else:
+        engine = create_blotto_engine(NUM_SOLDIERS, NUM_BATTLEFIELDS, runs,
+                                      prune=prune, symmetric=symmetric,
+                                      rng=np.random.default_rng(seed))
+
+    logger.info(f'Running {NUM_ROUNDS} iterations of {engine.num_runs} Blotto game runs.')
+    plot = _create_dynamic_plot(engine.payoffs.allocations, live=not headless)
+    sink = create_sink(plot.names, metrics_path, [plot])
+    scheduler = TrainingScheduler(NUM_ROUNDS, PLOT_REFRESH_RATE,
+                                  time_budget=max_time, strategy_tolerance=tolerance,
+                                  target_metric=gap_tolerance, metric_name='duality gap')
+    PROFILER.start_interval(start_round)
+    rounds_played = start_round
+    with sink:
+        for i in scheduler.rounds(start_round):
+            if expected:
+                engine.expected_update()
+            else:
+                engine.act()
+                opponent_actions = engine.act(perform_update=False)
+                engine.update_regret(opponent_actions)
+
+            rounds_played = i + 1
+            if scheduler.is_check_round(i):
+                sink.record(i, engine.avg_strategy.mean(axis=0))
+                gap = engine.duality_gap().max() if gap_tolerance is not None else None
+                scheduler.check(i, strategy=engine.avg_strategy, metric=gap)
+                if savepath is not None:
+                    save_checkpoint(savepath, i + 1, engine)
+
+                PROFILER.report(i + 1)
+
+    if savepath is not None:
+        # Rounds played since the last check round would be lost otherwise
+        save_checkpoint(savepath, rounds_played, engine)
 
     plot.save('blotto.png')
+    logger.info(f'Duality gap: {engine.duality_gap().max():.5f}')
+
+
+def _check_loaded_engine(engine: RegretMatching,
+                         runs: int,
+                         prune: bool,
+                         symmetric: bool,
+                         seed: int):
+    """Rejects options configuring a new engine differently from the loaded one"""
+    runs_source = click.get_current_context().get_parameter_source('runs')
+    if runs_source is not ParameterSource.DEFAULT and runs != engine.num_runs:
+        raise click.UsageError(f'--runs {runs} conflicts with {engine.num_runs} runs '
+                               f'of the loaded engine.')
+
+    if prune and not isinstance(engine, PrunedRegretMatching):
+        raise click.UsageError('--prune conflicts with the loaded engine, which does not prune.')
+
+    if symmetric and not isinstance(engine.payoffs, SymmetricBlottoPayoffs):
+        raise click.UsageError('--symmetric conflicts with the loaded engine, '
+                               'which trains over all allocations.')
+
+    if seed is not None:
+        logger.warning('Ignoring --seed, generator of the engine is restored from the checkpoint.')
 
-def _create_dynamic_plot() -> DynamicPlot:
-    num_pure_strategies = comb_with_repetition(NUM_SOLDIERS, NUM_BATTLEFIELDS)
-    configs = []
-    for i in range(1, num_pure_strategies + 1):
-        strategy = action_to_battlefields(i, NUM_SOLDIERS, NUM_BATTLEFIELDS)
-        conf = SubplotConfig(f'Probability of {list(strategy)}', y_range=(0, 1))
-        configs.append(conf)
 
-    cols = int(math.ceil(num_pure_strategies / MAX_PLOTS_PER_COL))
-    return DynamicPlot(configs, cols)
+def _create_dynamic_plot(allocations: np.array, live: bool) -> DynamicPlot:
+    # A line per pure strategy but only the most probable ones are drawn
+    labels = [str(strategy.tolist()) for strategy in allocations]
+    config = SubplotConfig('Probability of allocations', y_range=(0, 1),
+                           labels=labels, max_lines=MAX_PLOTTED_STRATEGIES)
+    return DynamicPlot([config], live=live)
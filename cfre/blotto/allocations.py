@@ -0,0 +1,225 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+
+
+def action_to_battlefields(action: int,
+                           num_soldiers: int,
+                           num_battlefields: int
+                           ) -> np.array:
+    """Maps action id to number of soldiers on each battlefield
+
+    Assignment of soldiers can be treated as numbers in base `num_soldiers`.
+        Given this representation we can obtain a set of possible assignments
+        by applying two constraints:
+            1. 'Length' of the number can be at most `num_battlefields`.
+            2. Sum of all digits has to be exactly `num_soldiers`.
+
+    This method maps action ID to these number representation in descending
+        order. E.g., for `num_soldiers = 3` and `num_battlefields = 2`:
+            |  ID | BF1 | BF2 |
+            | --- | --- | --- |
+            |  1  |  3  |  0  |
+            |  2  |  2  |  1  |
+            |  3  |  1  |  2  |
+            |  4  |  0  |  3  |
+    """
+    if action < 1:
+        raise ValueError(f'Action has to be at least 1 but was {action}')
+
+    num_pure_strategies = comb_with_repetition(num_soldiers, num_battlefields)
+    if action > num_pure_strategies:
+        raise ValueError(f'Action index ({action}) out of bound '
+                         f'(max {num_pure_strategies})')
+
+    comb_id = action  # We want to find combination with ID `act`
+    battlefields = np.zeros(num_battlefields)
+    for field in range(1, num_battlefields+1):
+        for s in range(num_soldiers, -1, -1):
+            # Calculate how many remaining combinations there is
+            # to choose from once we fix number of soldiers
+            # on battlefield `field` to `s`
+            remaining_combs = comb_with_repetition(num_soldiers - s,
+                                                   num_battlefields - field)
+            if comb_id <= remaining_combs:
+                # Choose `s` soldiers for battlefield `field` if `comb_id`
+                # is within remaining combinations after this decision
+                battlefields[field - 1] = s  # field - 1 cause 0 indexing
+                num_soldiers -= s
+                # And move to the next battlefield
+                break
+            else:
+                # Otherwise, skip all possible combinations if this decision
+                # would have been made, and try next value for `s`
+                comb_id -= remaining_combs
+                assert s != 0, ('Bug: battlefield should ' 
+                                'have been assigned already!')
+
+    return battlefields
+
+
+def comb_with_repetition(num_elements: int, num_bins: int) -> int:
+    """
+    Calculates (n+k-1)!/(n!*(k-1)!)
+        where: n - num_elements, k - num_bins
+    """
+    total = 1
+    # Calculate (n+k-1)! / n!
+    for v in range(num_elements+1, num_elements+num_bins):
+        total *= v
+
+    # Calculate (k-1)!
+    divisor = 1
+    for v in range(2, num_bins):
+        divisor *= v
+
+    assert (total / divisor) % 1 == 0, ('Bug: result of combination with '
+                                        'repetition should always be an integer!')
+
+    return total // divisor
+
+
+@lru_cache(maxsize=None)
+def battlefield_allocations(num_soldiers: int, num_battlefields: int) -> np.array:
+    """Table of soldiers on each battlefield for every action
+
+    Row `i` holds the allocation of action `i + 1`, i.e. rows follow the same
+        descending order as `action_to_battlefields`. The table is built
+        battlefield by battlefield from cached sub-tables instead of decoding
+        every action separately. It is cached per configuration and returned
+        as a read-only integer array of shape
+        `(comb_with_repetition(num_soldiers, num_battlefields), num_battlefields)`.
+    """
+    if num_battlefields < 1:
+        raise ValueError(f'Number of battlefields has to be at least 1 '
+                         f'but was {num_battlefields}')
+
+    if num_battlefields == 1:
+        allocations = np.array([[num_soldiers]], dtype=_allocation_dtype(num_soldiers))
+    else:
+        # First battlefield gets `s` soldiers (in descending order) and
+        # remaining ones are filled with all allocations of the rest
+        blocks = []
+        for s in range(num_soldiers, -1, -1):
+            rest = battlefield_allocations(num_soldiers - s, num_battlefields - 1)
+            block = np.empty((rest.shape[0], num_battlefields),
+                             dtype=_allocation_dtype(num_soldiers))
+            block[:, 0] = s
+            block[:, 1:] = rest
+            blocks.append(block)
+
+        allocations = np.concatenate(blocks)
+
+    allocations.setflags(write=False)
+    return allocations
+
+
+def battlefield_partitions(num_soldiers: int, num_battlefields: int) -> np.array:
+    """Table of allocations sorted in non-increasing order
+
+    Outcomes of the Blotto game do not change when battlefields are permuted,
+        so every allocation is equivalent to its sorted version, i.e. an integer
+        partition of `num_soldiers` into at most `num_battlefields` parts padded
+        with zeros. Rows follow the same descending order as
+        `battlefield_allocations`, e.g. for `num_soldiers = 4` and
+        `num_battlefields = 3`: [4, 0, 0], [3, 1, 0], [2, 2, 0], [2, 1, 1].
+    """
+    if num_battlefields < 1:
+        raise ValueError(f'Number of battlefields has to be at least 1 '
+                         f'but was {num_battlefields}')
+
+    return _bounded_partitions(num_soldiers, num_battlefields, num_soldiers)
+
+
+def partition_multiplicities(partitions: np.array) -> np.array:
+    """Number of distinct allocations that sort to each partition
+
+    Equal to `B! / (c_1! * c_2! * ...)` where `c_v` counts battlefields
+        holding `v` soldiers.
+    """
+    num_battlefields = partitions.shape[-1]
+    multiplicities = np.full(partitions.shape[:-1], math.factorial(num_battlefields))
+    # Partitions are sorted, so equal values form runs and the length of the
+    # run ending at each battlefield divides the multiplicity
+    run_length = np.ones(partitions.shape[:-1], dtype=np.int64)
+    for field in range(1, num_battlefields):
+        same = partitions[..., field] == partitions[..., field - 1]
+        run_length = np.where(same, run_length + 1, 1)
+        multiplicities //= run_length
+
+    return multiplicities
+
+
+@lru_cache(maxsize=None)
+def _bounded_partitions(num_soldiers: int, num_battlefields: int, max_soldiers: int) -> np.array:
+    # Partitions with at most `max_soldiers` on every battlefield, the first
+    # battlefield gets `s` soldiers (in descending order) and remaining ones
+    # are filled with partitions of the rest bounded by `s`
+    dtype = _allocation_dtype(num_soldiers)
+    if num_battlefields == 1:
+        fits = num_soldiers <= max_soldiers
+        partitions = np.array([[num_soldiers]] if fits else [], dtype=dtype).reshape(-1, 1)
+    else:
+        blocks = []
+        min_soldiers = -(-num_soldiers // num_battlefields)
+        for s in range(min(num_soldiers, max_soldiers), min_soldiers - 1, -1):
+            rest = _bounded_partitions(num_soldiers - s, num_battlefields - 1, s)
+            block = np.empty((rest.shape[0], num_battlefields), dtype=dtype)
+            block[:, 0] = s
+            block[:, 1:] = rest
+            blocks.append(block)
+
+        partitions = np.concatenate(blocks) if blocks else np.empty((0, num_battlefields), dtype=dtype)
+
+    partitions.setflags(write=False)
+    return partitions
+
+
+def battlefields_to_action(battlefields: np.array,
+                           num_soldiers: int,
+                           num_battlefields: int
+                           ) -> np.array:
+    """Maps soldiers on each battlefield back to action id
+
+    Inverse of `action_to_battlefields`. Accepts either a single allocation
+        of shape `(num_battlefields,)` or a batch of shape
+        `(..., num_battlefields)` and returns id (or array of ids) computed
+        by summing, for every battlefield, the number of combinations
+        skipped before its value was chosen.
+    """
+    battlefields = np.asarray(battlefields)
+    if battlefields.shape[-1:] != (num_battlefields,):
+        raise ValueError(f'Invalid shape of battlefields. Was {battlefields.shape} '
+                         f'but last dimension should be {num_battlefields}')
+
+    if (battlefields < 0).any() or (battlefields.sum(axis=-1) != num_soldiers).any():
+        raise ValueError(f'Battlefields have to hold non-negative numbers '
+                         f'of soldiers summing up to {num_soldiers}')
+
+    skipped = _skipped_combinations(num_soldiers, num_battlefields)
+    battlefields = battlefields.astype(np.intp)
+    # Soldiers left before each battlefield is assigned
+    remaining = num_soldiers - np.cumsum(battlefields, axis=-1) + battlefields
+    fields = np.arange(num_battlefields)
+    action = 1 + skipped[fields, remaining - battlefields].sum(axis=-1)
+    return action if action.ndim else int(action)
+
+
+@lru_cache(maxsize=None)
+def _skipped_combinations(num_soldiers: int, num_battlefields: int) -> np.array:
+    # Entry [f, m] is the number of combinations skipped on battlefield `f`
+    # (0 indexed) when `m` fewer soldiers than remaining are placed on it,
+    # i.e. sum of remaining combinations for all bigger choices
+    skipped = np.zeros((num_battlefields, num_soldiers + 1), dtype=np.int64)
+    for field in range(num_battlefields - 1):
+        bins = num_battlefields - field - 1
+        combs = [comb_with_repetition(t, bins) for t in range(num_soldiers)]
+        skipped[field, 1:] = np.cumsum(combs)
+
+    return skipped
+
+
+def _allocation_dtype(num_soldiers: int) -> np.dtype:
+    # Signed and wide enough to hold a difference of two allocations
+    return np.min_scalar_type(-num_soldiers - 1)
@@ -1,169 +1,64 @@
-from random import random
+from typing import Optional
 
 import numpy as np
 
+from cfre.blotto.allocations import action_to_battlefields, comb_with_repetition
+from cfre.blotto.payoffs import BlottoPayoffs, SymmetricBlottoPayoffs
+from cfre.utils.regret_matching import PrunedRegretMatching, RegretMatching
+
+
+def create_blotto_engine(num_soldiers: int,
+                         num_battlefields: int,
+                         num_runs: int = 1,
+                         default_strategy: np.array = None,
+                         prune: bool = False,
+                         symmetric: bool = False,
+                         rng: Optional[np.random.Generator] = None) -> RegretMatching:
+    """Regret matching over all pure strategies of the Blotto game
+
+    Actions of the engine are 0-based, i.e. action ids minus one. With
+        `prune` strategies with strongly negative regret are skipped
+        until they could become positive again. With `symmetric` actions
+        are rows of `battlefield_partitions` instead, see
+        `SymmetricBlottoPayoffs`.
+    """
+    if num_soldiers < num_battlefields:
+        raise ValueError(f'Number of soldiers {num_soldiers} '
+                         f'has to be bigger than number of '
+                         f'battlefields {num_battlefields}')
 
-class BlottoBot:
+    if symmetric:
+        payoffs = SymmetricBlottoPayoffs(num_soldiers, num_battlefields)
+    else:
+        payoffs = BlottoPayoffs(num_soldiers, num_battlefields)
 
-    def __init__(self,
-                 num_soldiers: int,
-                 num_battlefields: int,
-                 default_strategy: np.array = None):
-        if num_soldiers < num_battlefields:
-            raise ValueError(f'Number of soldiers {num_soldiers} '
-                             f'has to be bigger than number of '
-                             f'battlefields {num_battlefields}')
+    if prune:
+        return PrunedRegretMatching(payoffs, num_runs, default_strategy, rng=rng)
 
-        self._num_soldiers = num_soldiers
-        self._num_battlefields = num_battlefields
-        self._num_pure_strategies = comb_with_repetition(num_soldiers,
-                                                         num_battlefields)
+    return RegretMatching(payoffs, num_runs, default_strategy, rng=rng)
 
-        self._default_strategy = default_strategy
-        if default_strategy is None:
-            uniform_prob = 1 / self._num_pure_strategies
-            self._default_strategy = np.full(self._num_pure_strategies, uniform_prob)
 
-        if self._default_strategy.shape != (self._num_pure_strategies,):
-            raise ValueError(f'Invalid shape of the initial strategy. Was'
-                             f'{self._default_strategy.shape} but should be'
-                             f'{(self._num_pure_strategies,)}')
-
-        self._avg_strategy = np.zeros(self._num_pure_strategies)
-        self._avg_reward = 0
+class BlottoBot:
+    """Single run of `create_blotto_engine` acting with 1-based action ids"""
 
-        self._total_regret = np.zeros(self._num_pure_strategies)
-        self._steps_num = 0
-        self._prev_action = None
+    def __init__(self,
+                 num_soldiers: int,
+                 num_battlefields: int,
+                 default_strategy: np.array = None,
+                 rng: Optional[np.random.Generator] = None):
+        self._engine = create_blotto_engine(num_soldiers, num_battlefields,
+                                            default_strategy=default_strategy, rng=rng)
 
     def update_regret(self, opponent_action: int):
-        reward = self._calculate_outcome(self._prev_action, opponent_action)
-        self._avg_reward += (reward - self._avg_reward) / self._steps_num
-
-        possible_actions = np.arange(1, self._num_pure_strategies+1)
-        out_vec_func = np.vectorize(lambda s: self._calculate_outcome(s, opponent_action))
-        regrets = out_vec_func(possible_actions) - reward
-        self._total_regret += regrets
-
-    def _calculate_outcome(self, act1: int, act2: int) -> int:
-        battlefields1 = action_to_battlefields(act1,
-                                               self._num_soldiers,
-                                               self._num_battlefields)
-        battlefields2 = action_to_battlefields(act2,
-                                               self._num_soldiers,
-                                               self._num_battlefields)
-        player1_points = (battlefields1 > battlefields2).sum()
-        player2_points = (battlefields2 > battlefields1).sum()
-        return player1_points - player2_points
+        self._engine.update_regret(np.array([opponent_action - 1]))
 
     def act(self, perform_update: bool = True) -> int:
-        strategy = self._calculate_strategy()
-        action = self._sample_action(strategy)
-
-        if perform_update:
-            self._steps_num += 1
-            self._update_average_strategy(strategy)
-            self._prev_action = action
-
-        return action
-
-    def _calculate_strategy(self) -> np.array:
-        strategy = np.maximum(self._total_regret, 0)
-        strategy_norm = np.sum(strategy)
-
-        if strategy_norm > 0:
-            return strategy / strategy_norm
-
-        # If all regrets are non-positive, choose default strategy
-        return self._default_strategy
-
-    def _sample_action(self, strategy: np.array) -> int:
-        threshold = random()
-        return np.searchsorted(strategy.cumsum(), threshold) + 1
-
-    def _update_average_strategy(self, strategy: np.array):
-        self._avg_strategy += (strategy - self._avg_strategy) / self._steps_num
+        return int(self._engine.act(perform_update)[0]) + 1
 
     @property
     def avg_strategy(self) -> np.array:
-        return self._avg_strategy
+        return self._engine.avg_strategy[0]
 
     @property
     def avg_reward(self) -> float:
-        return self._avg_reward
-
-
-def action_to_battlefields(action: int,
-                           num_soldiers: int,
-                           num_battlefields: int
-                           ) -> np.array:
-    """Maps action id to number of soldiers on each battlefield
-
-    Assignment of soldiers can be treated as numbers in base `num_soldiers`.
-        Given this representation we can obtain a set of possible assignments
-        by applying two constraints:
-            1. 'Length' of the number can be at most `num_battlefields`.
-            2. Sum of all digits has to be exactly `num_soldiers`.
-
-    This method maps action ID to these number representation in descending
-        order. E.g., for `num_soldiers = 3` and `num_battlefields = 2`:
-            |  ID | BF1 | BF2 |
-            | --- | --- | --- |
-            |  1  |  3  |  0  |
-            |  2  |  2  |  1  |
-            |  3  |  1  |  2  |
-            |  4  |  0  |  3  |
-    """
-    if action < 1:
-        raise ValueError(f'Action has to be at least 1 but was {action}')
-
-    num_pure_strategies = comb_with_repetition(num_soldiers, num_battlefields)
-    if action > num_pure_strategies:
-        raise ValueError(f'Action index ({action}) out of bound '
-                         f'(max {num_pure_strategies})')
-
-    comb_id = action  # We want to find combination with ID `act`
-    battlefields = np.zeros(num_battlefields)
-    for field in range(1, num_battlefields+1):
-        for s in range(num_soldiers, -1, -1):
-            # Calculate how many remaining combinations there is
-            # to choose from once we fix number of soldiers
-            # on battlefield `field` to `s`
-            remaining_combs = comb_with_repetition(num_soldiers - s,
-                                                   num_battlefields - field)
-            if comb_id <= remaining_combs:
-                # Choose `s` soldiers for battlefield `field` if `comb_id`
-                # is within remaining combinations after this decision
-                battlefields[field - 1] = s  # field - 1 cause 0 indexing
-                num_soldiers -= s
-                # And move to the next battlefield
-                break
-            else:
-                # Otherwise, skip all possible combinations if this decision
-                # would have been made, and try next value for `s`
-                comb_id -= remaining_combs
-                assert s != 0, ('Bug: battlefield should ' 
-                                'have been assigned already!')
-
-    return battlefields
-
-
-def comb_with_repetition(num_elements: int, num_bins: int) -> int:
-    """
-    Calculates (n+k-1)!/(n!*(k-1)!)
-        where: n - num_elements, k - num_bins
-    """
-    total = 1
-    # Calculate (n+k-1)! / n!
-    for v in range(num_elements+1, num_elements+num_bins):
-        total *= v
-
-    # Calculate (k-1)!
-    divisor = 1
-    for v in range(2, num_bins):
-        divisor *= v
-
-    assert (total / divisor) % 1 == 0, ('Bug: result of combination with '
-                                        'repetition should always be an integer!')
-
-    return total // divisor
\ No newline at end of file
+        return float(self._engine.avg_reward[0])
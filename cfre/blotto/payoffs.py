@@ -0,0 +1,245 @@
+import numpy as np
+
+from cfre.blotto.allocations import battlefield_allocations, battlefield_partitions
+from cfre.blotto.allocations import battlefields_to_action, comb_with_repetition
+from cfre.blotto.allocations import partition_multiplicities
+
+
+# Above this many pure strategies the full outcome matrix is not materialised
+# and columns are computed on demand instead
+MAX_MATRIX_STRATEGIES = 4096
+# Number of rows processed at once when building the outcome matrix,
+# bounds the size of the temporary (rows, N, B) comparison array
+MATRIX_CHUNK_SIZE = 256
+
+
+class BlottoPayoffs:
+    """Outcomes of every pair of pure strategies of the Blotto game
+
+    Outcome of action `i` against action `j` is the number of battlefields won
+        by `i` minus the number of battlefields won by `j`. Actions use the same
+        1-based ids as `action_to_battlefields`.
+
+    For small games the full `N x N` outcome matrix is built once, larger games
+        compute one column (outcomes of all actions against a single opponent
+        action) at a time from the cached allocation table.
+    """
+
+    def __init__(self, num_soldiers: int, num_battlefields: int, precompute: bool = None):
+        self._num_soldiers = num_soldiers
+        self._num_battlefields = num_battlefields
+        self._num_pure_strategies = comb_with_repetition(num_soldiers, num_battlefields)
+        self._allocations = battlefield_allocations(num_soldiers, num_battlefields)
+
+        if precompute is None:
+            precompute = self._num_pure_strategies <= MAX_MATRIX_STRATEGIES
+
+        self._matrix = None
+        if precompute:
+            self._matrix = self._compute_matrix()
+
+    def outcome(self, act1: int, act2: int) -> int:
+        if self._matrix is not None:
+            return int(self._matrix[act1 - 1, act2 - 1])
+
+        battlefields1 = self._allocations[act1 - 1]
+        battlefields2 = self._allocations[act2 - 1]
+        return int(np.sign(battlefields1 - battlefields2).sum())
+
+    def column(self, opponent_action: int) -> np.array:
+        """Outcomes of all pure strategies against `opponent_action`"""
+        if self._matrix is not None:
+            return self._matrix[:, opponent_action - 1]
+
+        opponent_battlefields = self._allocations[opponent_action - 1]
+        return _outcomes(self._allocations, opponent_battlefields)
+
+    def columns(self, opponent_indices: np.array) -> np.array:
+        """Outcomes of all pure strategies against many opponent strategies
+
+        Unlike action ids, `opponent_indices` are 0-based rows of `allocations`.
+            Returns array of shape `(len(opponent_indices), num_pure_strategies)`.
+        """
+        if self._matrix is not None:
+            return self._matrix[:, opponent_indices].T
+
+        opponent_battlefields = self._allocations[opponent_indices]
+        return _outcomes(self._allocations, opponent_battlefields[:, np.newaxis])
+
+    def expected(self, opponent_strategies: np.array) -> np.array:
+        """Expected outcomes of all pure strategies against mixed strategies
+
+        Returns array of shape `(len(opponent_strategies), num_pure_strategies)`.
+        """
+        if self._matrix is not None:
+            return opponent_strategies @ self._matrix.T
+
+        # Only columns of strategies played by some opponent contribute
+        support = np.flatnonzero(opponent_strategies.any(axis=0))
+        expected = np.zeros((len(opponent_strategies), self._num_pure_strategies))
+        for start in range(0, len(support), MATRIX_CHUNK_SIZE):
+            indices = support[start:start + MATRIX_CHUNK_SIZE]
+            expected += opponent_strategies[:, indices] @ self.columns(indices)
+
+        return expected
+
+    def submatrix(self, rows: np.array, columns: np.array) -> np.array:
+        """Outcomes of strategies `rows` against strategies `columns` (0-based indices)"""
+        if self._matrix is not None:
+            return self._matrix[np.ix_(rows, columns)]
+
+        submatrix = np.empty((len(rows), len(columns)), dtype=_outcome_dtype(self._num_battlefields))
+        column_battlefields = self._allocations[columns]
+        # Same bound on the temporary comparison array as when building the matrix
+        chunk_size = max(1, MATRIX_CHUNK_SIZE * self._num_pure_strategies // max(len(columns), 1))
+        for start in range(0, len(rows), chunk_size):
+            row_battlefields = self._allocations[rows[start:start + chunk_size]]
+            submatrix[start:start + chunk_size] = _outcomes(row_battlefields[:, np.newaxis],
+                                                            column_battlefields)
+
+        return submatrix
+
+    def _compute_matrix(self) -> np.array:
+        matrix = np.empty((self._num_pure_strategies, self._num_pure_strategies),
+                          dtype=_outcome_dtype(self._num_battlefields))
+        for start in range(0, self._num_pure_strategies, MATRIX_CHUNK_SIZE):
+            rows = self._allocations[start:start + MATRIX_CHUNK_SIZE]
+            matrix[start:start + MATRIX_CHUNK_SIZE] = _outcomes(rows[:, np.newaxis],
+                                                                self._allocations)
+
+        return matrix
+
+    def __getstate__(self):
+        # Tables are cheap to rebuild, so keep pickled bots small
+        state = self.__dict__.copy()
+        state['_allocations'] = None
+        state['_precompute'] = state.pop('_matrix') is not None
+        return state
+
+    def __setstate__(self, state):
+        precompute = state.pop('_precompute')
+        self.__dict__.update(state)
+        self._allocations = battlefield_allocations(self._num_soldiers, self._num_battlefields)
+        self._matrix = self._compute_matrix() if precompute else None
+
+    @property
+    def num_pure_strategies(self) -> int:
+        return self._num_pure_strategies
+
+    @property
+    def payoff_range(self) -> float:
+        """Difference between the highest and the lowest outcome"""
+        return 2 * self._num_battlefields
+
+    @property
+    def allocations(self) -> np.array:
+        return self._allocations
+
+    @property
+    def matrix(self) -> np.array:
+        if self._matrix is None:
+            self._matrix = self._compute_matrix()
+
+        return self._matrix
+
+
+class SymmetricBlottoPayoffs:
+    """Outcomes of the Blotto game between classes of permuted allocations
+
+    Permuting battlefields does not change outcomes, so the game can be
+        solved over `battlefield_partitions` only, roughly `B!` fewer
+        strategies. Playing partition `i` means playing each of its
+        `multiplicities[i]` distinct permutations with equal probability,
+        its outcome against partition `j` is the expected outcome over
+        such permutations. Indices are 0-based rows of `partitions`.
+
+    Since every battlefield of a random permutation holds each soldier count
+        of the partition with equal probability, the outcome of `i` against `j`
+        is `sum_v count_i[v] * (below_j[v] - above_j[v]) / B`, where `count_i[v]`
+        is the number of battlefields of `i` with `v` soldiers and `below_j[v]`,
+        `above_j[v]` count battlefields of `j` with fewer and more soldiers.
+        Outcomes are therefore products of small tables and the full matrix
+        is never needed.
+    """
+
+    def __init__(self, num_soldiers: int, num_battlefields: int):
+        self._num_soldiers = num_soldiers
+        self._num_battlefields = num_battlefields
+        self._partitions = battlefield_partitions(num_soldiers, num_battlefields)
+        self._multiplicities = partition_multiplicities(self._partitions)
+
+        counts = np.zeros((len(self._partitions), num_soldiers + 1))
+        np.add.at(counts, (np.arange(len(self._partitions))[:, np.newaxis], self._partitions), 1)
+        below = np.cumsum(counts, axis=1) - counts
+        above = num_battlefields - below - counts
+        self._counts = counts
+        self._differences = (below - above) / num_battlefields
+
+    def columns(self, opponent_indices: np.array) -> np.array:
+        """Outcomes of all partitions against many opponent partitions
+
+        Returns array of shape `(len(opponent_indices), num_pure_strategies)`.
+        """
+        return self._differences[opponent_indices] @ self._counts.T
+
+    def expected(self, opponent_strategies: np.array) -> np.array:
+        """Expected outcomes of all partitions against mixed strategies over partitions
+
+        Returns array of shape `(len(opponent_strategies), num_pure_strategies)`.
+        """
+        return (opponent_strategies @ self._differences) @ self._counts.T
+
+    def submatrix(self, rows: np.array, columns: np.array) -> np.array:
+        """Outcomes of partitions `rows` against partitions `columns`"""
+        return self._counts[rows] @ self._differences[columns].T
+
+    def expand(self, strategies: np.array) -> np.array:
+        """Maps strategies over partitions to strategies over all allocations
+
+        Probability of every partition is split equally between its
+            permutations. Last axis of the result follows rows of
+            `battlefield_allocations`, i.e. action ids minus one.
+        """
+        allocations = battlefield_allocations(self._num_soldiers, self._num_battlefields)
+        sorted_allocations = -np.sort(-allocations, axis=1)
+        # Partitions are ordered like allocations, so their action ids are increasing
+        partition_ids = battlefields_to_action(self._partitions, self._num_soldiers, self._num_battlefields)
+        classes = np.searchsorted(partition_ids, battlefields_to_action(
+            sorted_allocations, self._num_soldiers, self._num_battlefields))
+        return (np.asarray(strategies) / self._multiplicities)[..., classes]
+
+    @property
+    def num_pure_strategies(self) -> int:
+        return len(self._partitions)
+
+    @property
+    def payoff_range(self) -> float:
+        """Difference between the highest and the lowest outcome"""
+        return 2 * self._num_battlefields
+
+    @property
+    def partitions(self) -> np.array:
+        return self._partitions
+
+    @property
+    def allocations(self) -> np.array:
+        # Pure strategies of the engine, like `BlottoPayoffs.allocations`
+        return self._partitions
+
+    @property
+    def multiplicities(self) -> np.array:
+        return self._multiplicities
+
+    @property
+    def matrix(self) -> np.array:
+        return self._counts @ self._differences.T
+
+
+def _outcomes(battlefields1: np.array, battlefields2: np.array) -> np.array:
+    # Battlefields are on the last axis, sign of difference is 1 for a won
+    # battlefield, -1 for a lost one and 0 for a draw
+    return np.sign(battlefields1 - battlefields2).sum(axis=-1)
+
+
+def _outcome_dtype(num_battlefields: int) -> np.dtype:
+    return np.min_scalar_type(-num_battlefields)
@@ -0,0 +1,4 @@
+from cfre.game_tree.best_response import average_strategies, best_response_value, exploitability
+from cfre.game_tree.compiler import FlatGameTree, TERMINAL, compile_game
+from cfre.game_tree.game import CHANCE, Game
+from cfre.game_tree.solver import FlatCFRSolver
@@ -0,0 +1,82 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from cfre.game_tree.compiler import FlatGameTree, TERMINAL
+
+if TYPE_CHECKING:  # Importing the table at runtime would be circular through `cfre.kuhn`
+    from cfre.kuhn.information_set import InformationSetTable
+
+
+def average_strategies(tree: FlatGameTree, infosets: 'InformationSetTable') -> np.array:
+    """Average strategies of all information sets of the tree
+
+    Returns `(num_infosets, num_actions)` array ordered like `tree.infoset_keys`.
+        Information sets that are missing or were never reached are played
+        uniformly at random over their legal actions.
+    """
+    uniform = tree.legal_actions / tree.legal_actions.sum(axis=1, keepdims=True)
+    strategies = uniform.copy()
+    for i, key in enumerate(tree.infoset_keys):
+        if key in infosets:
+            strategies[i] = infosets.avg_strategy(key) * tree.legal_actions[i]
+
+    norms = strategies.sum(axis=1, keepdims=True)
+    return np.divide(strategies, norms, out=uniform, where=norms > 0)
+
+
+def best_response_value(tree: FlatGameTree, strategies: np.array, br_player: int) -> float:
+    """Expected utility of the best response of `br_player` to `strategies`
+
+    The opponent plays `strategies` (indexed by infoset of the tree). Best
+        responding player picks one action per information set, the one with
+        the highest value summed over all its nodes weighted by chance and
+        opponent reach. Levels are processed from the leaves up, which
+        assumes all nodes of an information set have the same depth.
+    """
+    edge_probs = tree.chance_prob.copy()
+    children = np.arange(1, tree.num_nodes)
+    parents = tree.parent[children]
+    decision = tree.player[parents] >= 0
+    edge_probs[children[decision]] = strategies[tree.infoset[parents[decision]],
+                                                tree.action[children[decision]]]
+
+    # Probability of reaching each node due to chance and the opponent
+    is_br_edge = np.zeros(tree.num_nodes, dtype=bool)
+    is_br_edge[children] = tree.player[parents] == br_player
+    outside_probs = np.where(is_br_edge, 1., edge_probs)
+    outside_reach = np.ones(tree.num_nodes)
+    for depth in range(1, tree.num_levels):
+        level = tree.level(depth)
+        outside_reach[level] = outside_reach[tree.parent[level]] * outside_probs[level]
+
+    sign = 1 if br_player == 0 else -1
+    values = np.where(tree.player == TERMINAL, sign * tree.utility, 0.)
+    for depth in range(tree.num_levels - 2, -1, -1):
+        level = np.arange(tree.level_offsets[depth + 1], tree.level_offsets[depth + 2])
+        chosen_by_br = is_br_edge[level]
+
+        # Chance and opponent nodes take expectations over their children
+        other = level[~chosen_by_br]
+        np.add.at(values, tree.parent[other], edge_probs[other] * values[other])
+
+        # Best responding nodes play the best action of their information set
+        own = level[chosen_by_br]
+        own_infosets = tree.infoset[tree.parent[own]]
+        action_values = np.zeros(tree.legal_actions.shape)
+        np.add.at(action_values, (own_infosets, tree.action[own]),
+                  outside_reach[own] * values[own])
+        action_values[~tree.legal_actions] = -np.inf
+        best_actions = action_values.argmax(axis=1)
+        best = own[tree.action[own] == best_actions[own_infosets]]
+        values[tree.parent[best]] = values[best]
+
+    return float(values[0])
+
+
+def exploitability(tree: FlatGameTree, strategies: np.array) -> float:
+    """Average gain of best responses against both seats, in utility units
+
+    It is 0 for a Nash equilibrium, since then no player can gain by deviating.
+    """
+    return (best_response_value(tree, strategies, 0) + best_response_value(tree, strategies, 1)) / 2
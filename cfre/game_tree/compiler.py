@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from cfre.game_tree.game import CHANCE, Game
+
+
+# Player id of terminal nodes
+TERMINAL = -2
+
+
+@dataclass(frozen=True)
+class FlatGameTree:
+    """Game tree expanded into flat arrays indexed by node id
+
+    Nodes are numbered in breadth first order, so nodes of every depth form
+        a contiguous range (see `level_offsets`) and children of every node
+        are the contiguous range `child_offsets[n]:child_offsets[n + 1]`.
+    """
+    # Parent node id, -1 for the root
+    parent: np.array
+    # Index of the action leading from the parent, -1 for root and chance children
+    action: np.array
+    # Player to move, `CHANCE` for chance and `TERMINAL` for terminal nodes
+    player: np.array
+    # Probability of the node given its parent is a chance node, 1 otherwise
+    chance_prob: np.array
+    child_offsets: np.array
+    # Index in `infoset_keys` of decision nodes, -1 for other nodes
+    infoset: np.array
+    # Utility of player 0 in terminal nodes, 0 for other nodes
+    utility: np.array
+    # Nodes of depth `d` are `level_offsets[d]:level_offsets[d + 1]`
+    level_offsets: np.array
+    infoset_keys: List[str]
+    # Which actions are legal in every information set
+    legal_actions: np.array
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.parent)
+
+    @property
+    def num_levels(self) -> int:
+        return len(self.level_offsets) - 1
+
+    def level(self, depth: int) -> slice:
+        return slice(self.level_offsets[depth], self.level_offsets[depth + 1])
+
+
+def compile_game(game: Game) -> FlatGameTree:
+    """Expands all states of the game once into a `FlatGameTree`"""
+    parent = [-1]
+    action = [-1]
+    chance_prob = [1.]
+    states = [game.initial_state()]
+    player = []
+    child_offsets = []
+    infoset = []
+    utility = []
+    level_offsets = [0]
+    infoset_index = {}
+    legal_actions = []
+
+    level_end = 1
+    node_id = 0
+    while node_id < len(states):
+        if node_id == level_end:
+            level_offsets.append(node_id)
+            level_end = len(states)
+
+        state = states[node_id]
+        child_offsets.append(len(states))
+        node_player = CHANCE
+        node_infoset = -1
+        node_utility = 0.
+        if game.is_terminal(state):
+            node_player = TERMINAL
+            node_utility = game.terminal_utility(state)
+        elif game.current_player(state) == CHANCE:
+            for next_state, prob in game.chance_outcomes(state):
+                states.append(next_state)
+                parent.append(node_id)
+                action.append(-1)
+                chance_prob.append(prob)
+        else:
+            node_player = game.current_player(state)
+            key = game.infoset_key(state)
+            actions = list(game.legal_actions(state))
+            if key not in infoset_index:
+                infoset_index[key] = len(infoset_index)
+                mask = np.zeros(game.num_actions, dtype=bool)
+                mask[actions] = True
+                legal_actions.append(mask)
+
+            node_infoset = infoset_index[key]
+            for a in actions:
+                states.append(game.next_state(state, a))
+                parent.append(node_id)
+                action.append(a)
+                chance_prob.append(1.)
+
+        player.append(node_player)
+        infoset.append(node_infoset)
+        utility.append(node_utility)
+        node_id += 1
+
+    child_offsets.append(len(states))
+    level_offsets.append(len(states))
+    return FlatGameTree(
+        parent=np.array(parent),
+        action=np.array(action),
+        player=np.array(player),
+        chance_prob=np.array(chance_prob),
+        child_offsets=np.array(child_offsets),
+        infoset=np.array(infoset),
+        utility=np.array(utility),
+        level_offsets=np.array(level_offsets),
+        infoset_keys=list(infoset_index),
+        legal_actions=np.array(legal_actions).reshape(-1, game.num_actions),
+    )
@@ -0,0 +1,53 @@
+from abc import ABC, abstractmethod
+from typing import Hashable, List, Sequence, Tuple
+
+
+# Player id of chance nodes
+CHANCE = -1
+
+State = Hashable
+
+
+class Game(ABC):
+    """Rules of a two-player zero-sum game with chance and imperfect information
+
+    States are immutable values created by `initial_state` and `next_state`.
+        Utilities are given for player 0, player 1 gets their negation.
+    """
+
+    @abstractmethod
+    def initial_state(self) -> State:
+        pass
+
+    @abstractmethod
+    def current_player(self, state: State) -> int:
+        """Returns 0 or 1 for decision nodes and `CHANCE` for chance nodes"""
+
+    @abstractmethod
+    def is_terminal(self, state: State) -> bool:
+        pass
+
+    @abstractmethod
+    def terminal_utility(self, state: State) -> float:
+        """Returns utility of player 0 in a terminal state"""
+
+    @abstractmethod
+    def legal_actions(self, state: State) -> Sequence[int]:
+        """Returns indices of actions available to the player to move"""
+
+    @abstractmethod
+    def chance_outcomes(self, state: State) -> List[Tuple[State, float]]:
+        """Returns next states and their probabilities in a chance node"""
+
+    @abstractmethod
+    def next_state(self, state: State, action: int) -> State:
+        pass
+
+    @abstractmethod
+    def infoset_key(self, state: State) -> str:
+        """Returns key of the information set of the player to move"""
+
+    @property
+    @abstractmethod
+    def num_actions(self) -> int:
+        """Number of distinct action indices used in the game"""
@@ -0,0 +1,94 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from cfre.game_tree.compiler import FlatGameTree
+from cfre.game_tree.game import CHANCE
+from cfre.utils.profiling import PROFILER
+
+if TYPE_CHECKING:  # Importing the table at runtime would be circular through `cfre.kuhn`
+    from cfre.kuhn.information_set import InformationSetTable
+
+
+class FlatCFRSolver:
+    """CFR over a `FlatGameTree` without recursion
+
+    Every iteration computes regret matching strategies of all information
+        sets, propagates reach probabilities down the tree level by level,
+        propagates values back up level by level and accumulates regrets and
+        average strategies per information set with a few NumPy calls per
+        level. Updates of both players are simultaneous.
+    """
+
+    def __init__(self, tree: FlatGameTree, infosets: 'InformationSetTable'):
+        self._tree = tree
+        self._infosets = infosets
+
+        self._rows = self._infosets.rows(tree.infoset_keys)
+
+        # Edges are identified by their child node (every node but the root)
+        children = np.arange(1, tree.num_nodes)
+        parents = tree.parent[children]
+        parent_players = tree.player[parents]
+        decision = parent_players >= 0
+        self._decision_children = children[decision]
+        self._decision_parents = parents[decision]
+        self._decision_players = parent_players[decision]
+        self._decision_infosets = tree.infoset[self._decision_parents]
+        self._decision_actions = tree.action[self._decision_children]
+        self._decision_nodes = np.flatnonzero(tree.player >= 0)
+
+        # Player whose choice leads to every node (`CHANCE` for the root), and
+        # owners of the three reach probabilities (player 0, player 1, chance)
+        self._edge_player = np.full(tree.num_nodes, CHANCE)
+        self._edge_player[children] = parent_players
+        self._edge_owners = np.array([0, 1, CHANCE])
+
+    @PROFILER.timed('game_tree.iterate')
+    def iterate(self) -> float:
+        """Runs one CFR iteration, returns expected utility of player 0"""
+        tree = self._tree
+        strategies = self._infosets.current_strategies(self._rows, tree.legal_actions)
+
+        # Probability of every edge under current strategies and chance
+        edge_probs = tree.chance_prob.copy()
+        edge_probs[self._decision_children] = strategies[self._decision_infosets,
+                                                         self._decision_actions]
+
+        # Reach of player 0, player 1 and chance, level by level from the root
+        reach_edge_probs = np.where(self._edge_owners[:, np.newaxis] == self._edge_player,
+                                    edge_probs, 1.)
+        reach = np.ones((3, tree.num_nodes))
+        for depth in range(1, tree.num_levels):
+            level = tree.level(depth)
+            reach[:, level] = reach[:, tree.parent[level]] * reach_edge_probs[:, level]
+
+        # Values of player 0, level by level from the leaves
+        values = tree.utility.copy()
+        for depth in range(tree.num_levels - 1, 0, -1):
+            level = tree.level(depth)
+            np.add.at(values, tree.parent[level], edge_probs[level] * values[level])
+
+        # Counterfactual regrets of every edge, from the perspective of the acting player
+        sign = np.where(self._decision_players == 0, 1., -1.)
+        opponent_reach = reach[1 - self._decision_players, self._decision_parents]
+        counterfactual_reach = opponent_reach * reach[2, self._decision_parents]
+        edge_regrets = sign * counterfactual_reach * (values[self._decision_children]
+                                                      - values[self._decision_parents])
+        regrets = np.zeros_like(strategies)
+        np.add.at(regrets, (self._decision_infosets, self._decision_actions), edge_regrets)
+
+        # Average strategy is weighted by own reach (including chance)
+        nodes = self._decision_nodes
+        own_reach = reach[tree.player[nodes], nodes] * reach[2, nodes]
+        weights = np.zeros(len(self._rows))
+        np.add.at(weights, tree.infoset[nodes], own_reach)
+
+        self._infosets.update_average_strategies(self._rows, strategies, weights)
+        self._infosets.update_regrets(self._rows, regrets)
+        self._infosets.end_iteration()
+        return float(values[0])
+
+    @property
+    def information_sets(self) -> 'InformationSetTable':
+        return self._infosets
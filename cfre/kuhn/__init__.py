@@ -1,64 +1,317 @@
+import asyncio
 import logging
+import os
+from contextlib import ExitStack
+from typing import Optional
 
 import click
+import numpy as np
 
-from cfre.kuhn.information_set import InformationSet, infosets_to_pretty_str
-from cfre.kuhn.information_set import load_infosets, save_infosets
+from cfre.kuhn.evaluation import BASELINES, baseline_policy, evaluate
+from cfre.kuhn.exploitability import infosets_exploitability
+from cfre.kuhn.information_set import InformationSet, InformationSetTable
+from cfre.kuhn.information_set import infosets_to_pretty_str
+from cfre.kuhn.information_set import load_infosets, load_saved_rounds, save_infosets
+from cfre.kuhn.information_set import saved_game_callback
 from cfre.kuhn.kuhn_game import KuhnGame
-from cfre.kuhn.kuhn_trainer import KuhnTrainer
-from cfre.kuhn.config import LOGGING_FREQUENCY, NUM_ROUNDS
+from cfre.kuhn.kuhn_rules import CARDS, NUM_ACTIONS
+from cfre.kuhn.kuhn_trainer import KuhnTrainer, TRAINING_MODES, create_round_function
+from cfre.kuhn.parallel import PARALLEL_MODES, ParallelKuhnTrainer, default_sync_interval
+from cfre.kuhn.policy import KuhnPolicy
+from cfre.kuhn.server import KuhnServer
+from cfre.kuhn.snapshots import BackgroundTrainer, SnapshotWatcher, default_snapshot_path
+from cfre.kuhn.snapshots import snapshot_options
+from cfre.kuhn.update_rules import ALGORITHMS
+from cfre.kuhn.config import LOGGING_FREQUENCY, NUM_ROUNDS, SERVER_PORT, SYNC_ROUNDS
+from cfre.utils.profiling import PROFILER
+from cfre.utils.scheduler import TrainingScheduler, scheduler_options
+from cfre.utils.seeding import seed_option
 
 logger = logging.getLogger(__name__)
 
 
+# Rejects infosets paths of other games
+_check_game = saved_game_callback('kuhn', 'Kuhn Poker')
+
+
 @click.command(name='train_kuhn')
 @click.option('--savepath', '-s', type=click.Path(dir_okay=False, writable=True))
-@click.option('--loadpath', '-l', type=click.Path(dir_okay=False, readable=True, exists=True))
-def run_kuhn_trainer(savepath: str, loadpath: str):
+@click.option('--loadpath', '-l', type=click.Path(dir_okay=False, readable=True, exists=True),
+              callback=_check_game)
+@click.option('--mode', '-m', type=click.Choice(TRAINING_MODES), default='chance',
+              help='Sample a single deal per iteration (chance), traverse all '
+                   'deals at once (full-width) or use Monte Carlo CFR with '
+                   'external or outcome sampling.')
+@click.option('--workers', '-w', type=click.IntRange(min=1), default=1,
+              help='Number of processes training in parallel, '
+                   'not supported in full-width mode.')
+@click.option('--sync-interval', type=click.IntRange(min=1),
+              help=f'Rounds each worker plays between merging infosets, defaults '
+                   f'to {SYNC_ROUNDS} rounds split among the workers. Longer '
+                   f'intervals merge less often and train faster, but workers play '
+                   f'against strategies missing more rounds of the others, so '
+                   f'exploitability after the same number of rounds is higher '
+                   f'(several times the sequential one with 4 workers and 100).')
+@click.option('--target-exploitability', '-e', type=click.FloatRange(min=0),
+              help='Stop once exploitability (mbb per hand) of the average '
+                   'strategy, checked at every logging round, is at most this.')
+@click.option('--algorithm', '-a', type=click.Choice(list(ALGORITHMS)),
+              help='Regret and average strategy update rule, defaults to the one '
+                   'stored in loaded infosets or vanilla CFR.')
+@scheduler_options
+@seed_option
+def run_kuhn_trainer(savepath: str,
+                     loadpath: str,
+                     mode: str,
+                     workers: int,
+                     sync_interval: int,
+                     target_exploitability: float,
+                     algorithm: str,
+                     tolerance: float,
+                     max_time: float,
+                     seed: int):
+    start_round = 0
     if loadpath is not None:
         logger.info(f'Creating trainer using preexisting infosets from {loadpath}.')
         infosets = load_infosets(loadpath)
-        trainer = KuhnTrainer(infosets)
+        start_round = load_saved_rounds(loadpath)
+        if algorithm is not None and algorithm != infosets.algorithm:
+            logger.info(f'Switching from {infosets.algorithm} to {algorithm} updates.')
+            infosets.set_algorithm(algorithm)
     else:
         logger.info(f'Creating trainer from scratch.')
-        trainer = KuhnTrainer()
+        infosets = InformationSetTable(NUM_ACTIONS, algorithm=algorithm or 'vanilla')
+
+    logger.info(f'Running {NUM_ROUNDS} {mode} iterations of the '
+                f'{infosets.algorithm} CFR for Kuhn Poker.')
+    scheduler = TrainingScheduler(NUM_ROUNDS, LOGGING_FREQUENCY,
+                                  time_budget=max_time,
+                                  strategy_tolerance=tolerance,
+                                  target_metric=target_exploitability,
+                                  metric_name='exploitability')
+    if workers > 1:
+        if mode not in PARALLEL_MODES:
+            raise click.UsageError(f'--workers can only be used with modes {PARALLEL_MODES}, '
+                                   f'full-width iterations are deterministic and '
+                                   f'every worker would repeat the same work.')
+
+        if sync_interval is None:
+            sync_interval = default_sync_interval(workers)
 
-    logger.info(f'Running {NUM_ROUNDS} iterations of the CFR for Kuhn Poker.')
+        _run_parallel_trainer(infosets, savepath, mode, workers,
+                              sync_interval, scheduler, start_round, seed)
+        return
+
+    play_round = create_round_function(mode, infosets, np.random.default_rng(seed))
+    PROFILER.start_interval(start_round)
 
     total_reward = 0
-    for i in range(NUM_ROUNDS):
-        total_reward += trainer.play_round()
-        if i % LOGGING_FREQUENCY == 0:
-            infosets = trainer.information_sets
+    rounds_played = start_round
+    for i in scheduler.rounds(start_round):
+        total_reward += play_round()
+        rounds_played = i + 1
+        if scheduler.is_check_round(i):
+            avg_reward = total_reward / (i - start_round + 1)
+            _log_progress(i, infosets, avg_reward, savepath, scheduler)
+
+    _save_final_infosets(infosets, savepath, rounds_played)
+
+
+def _run_parallel_trainer(infosets: InformationSetTable,
+                          savepath: str,
+                          mode: str,
+                          workers: int,
+                          sync_interval: int,
+                          scheduler: TrainingScheduler,
+                          start_round: int,
+                          seed: int):
+    logger.info(f'Training on {workers} workers, merging every {sync_interval} rounds.')
+    PROFILER.start_interval(start_round)
+    with ParallelKuhnTrainer(workers, sync_interval, mode, infosets, seed=seed) as trainer:
+        total_reward = 0
+        rounds_played = start_round
+        step = workers * sync_interval
+        for i in scheduler.rounds(start_round, step):
+            step_reward, step_rounds = trainer.train()
+            total_reward += step_reward
+            rounds_played = i + step_rounds
+            if scheduler.is_check_round(i, step):
+                avg_reward = total_reward / (i - start_round + step_rounds)
+                _log_progress(i + step_rounds - 1, trainer.information_sets,
+                              avg_reward, savepath, scheduler)
 
-            logger.info(f'Round {i}:')
-            logger.info(f'Information sets: {infosets_to_pretty_str(infosets)}')
-            logger.info(f'Average reward: {total_reward / (i + 1)}')
-            if savepath is not None:
-                logger.info(f'Saving infosets to {savepath}.')
-                save_infosets(infosets, savepath)
-            logger.info('****************\n')
+        _save_final_infosets(trainer.information_sets, savepath, rounds_played)
+
+
+def _log_progress(round_num: int,
+                  infosets: InformationSetTable,
+                  avg_reward: float,
+                  savepath: str,
+                  scheduler: TrainingScheduler):
+    """Logs and saves infosets, checks convergence of their average strategy"""
+    with PROFILER.timer('exploitability'):
+        exploitability = infosets_exploitability(infosets)
+
+    logger.info(f'Round {round_num}:')
+    logger.info(f'Information sets: {infosets_to_pretty_str(infosets)}')
+    logger.info(f'Average reward: {avg_reward}')
+    logger.info(f'Exploitability: {exploitability:.3f} mbb/hand')
+    if savepath is not None:
+        logger.info(f'Saving infosets to {savepath}.')
+        save_infosets(infosets, savepath, game='kuhn', cards=CARDS, rounds=round_num + 1)
+    PROFILER.report(round_num + 1)
+    logger.info('****************\n')
+    scheduler.check(round_num, strategy=infosets.avg_strategies, metric=exploitability)
+
+
+def _save_final_infosets(infosets: InformationSetTable, savepath: str, rounds_played: int):
+    """Saves infosets once training stopped, whatever the reason
+
+    Rounds played since the last check round would be lost otherwise.
+    """
+    if savepath is not None:
+        logger.info(f'Saving infosets after {rounds_played} rounds to {savepath}.')
+        save_infosets(infosets, savepath, game='kuhn', cards=CARDS, rounds=rounds_played)
 
 
 @click.command(name='play_kuhn')
-@click.option('--loadpath', '-l', type=click.Path(dir_okay=False, readable=True, exists=True), required=True)
-def run_kuhn_game(loadpath: str):
+@click.option('--loadpath', '-l', type=click.Path(dir_okay=False, readable=True, exists=True),
+              callback=_check_game, required=True)
+@snapshot_options
+@seed_option
+def run_kuhn_game(loadpath: str,
+                  watch: bool,
+                  train: bool,
+                  train_mode: str,
+                  publish_interval: int,
+                  snapshot_path: str,
+                  seed: int):
     print(f'Loading pre-existing strategies from: {loadpath}')
-    infosets = load_infosets(loadpath)
-    game = KuhnGame(infosets)
+    rng = np.random.default_rng(seed)
+    with ExitStack() as stack:
+        snapshots = _start_snapshots(stack, loadpath, watch, train, train_mode,
+                                     publish_interval, snapshot_path, seed, rng)
+        if snapshots is None or snapshots.policy is None:
+            game = KuhnGame(KuhnPolicy.from_infosets(load_infosets(loadpath, mmap=True), rng), rng)
+        else:
+            game = KuhnGame(snapshots.policy, rng)
 
-    cont = 'y'
-    num_games = 0
-    total_reward = 0
-    while cont != 'n':
-        print(f'\nStarting game {num_games+1}')
-        reward = game.start_game(num_games % 2)
-        total_reward += reward
-        num_games += 1
+        cont = 'y'
+        num_games = 0
+        total_reward = 0
+        while cont != 'n':
+            if snapshots is not None and snapshots.refresh():
+                print(f'Playing against strategy snapshot {snapshots.generation}.')
+                game.set_policy(snapshots.policy)
 
-        print(f'Reward from game {num_games}: {reward}')
-        print(f'Total reward so far: {total_reward} '
-              f'(average: {total_reward / num_games})')
-        cont = input('Do you want to continue? (n for no) ')
+            print(f'\nStarting game {num_games+1}')
+            reward = game.start_game(num_games % 2)
+            total_reward += reward
+            num_games += 1
+
+            print(f'Reward from game {num_games}: {reward}')
+            print(f'Total reward so far: {total_reward} '
+                  f'(average: {total_reward / num_games})')
+            cont = input('Do you want to continue? (n for no) ')
 
     print('\nThanks for playing!')
+
+
+@click.command(name='serve_kuhn')
+@click.option('--loadpath', '-l', type=click.Path(dir_okay=False, readable=True, exists=True),
+              callback=_check_game, required=True)
+@click.option('--host', default='127.0.0.1')
+@click.option('--port', '-p', type=click.IntRange(min=0, max=65535), default=SERVER_PORT)
+@click.option('--stdio', is_flag=True,
+              help='Play a single session over standard input and output '
+                   'instead of serving sessions over TCP.')
+@snapshot_options
+@seed_option
+def run_kuhn_server(loadpath: str,
+                    host: str,
+                    port: int,
+                    stdio: bool,
+                    watch: bool,
+                    train: bool,
+                    train_mode: str,
+                    publish_interval: int,
+                    snapshot_path: str,
+                    seed: int):
+    logger.info(f'Loading pre-existing strategies from: {loadpath}')
+    rng = np.random.default_rng(seed)
+    with ExitStack() as stack:
+        snapshots = _start_snapshots(stack, loadpath, watch, train, train_mode,
+                                     publish_interval, snapshot_path, seed, rng)
+        if snapshots is None or snapshots.policy is None:
+            policy = KuhnPolicy.from_infosets(load_infosets(loadpath, mmap=True), rng)
+        else:
+            policy = snapshots.policy
+
+        server = KuhnServer(policy, rng, snapshots)
+        try:
+            asyncio.run(server.serve_stdio() if stdio else server.serve_tcp(host, port))
+        except KeyboardInterrupt:
+            logger.info('Server stopped.')
+
+
+def _start_snapshots(stack: ExitStack,
+                     loadpath: str,
+                     watch: bool,
+                     train: bool,
+                     train_mode: str,
+                     publish_interval: int,
+                     snapshot_path: Optional[str],
+                     seed: int,
+                     rng: np.random.Generator) -> Optional[SnapshotWatcher]:
+    """Starts background training if requested, returns watcher of its snapshots
+
+    The watcher has no policy until a snapshot is published, callers play
+        the loaded infosets meanwhile.
+    """
+    if not (watch or train):
+        return None
+
+    if snapshot_path is None:
+        snapshot_path = default_snapshot_path(loadpath)
+
+    trainer = None
+    if train:
+        if os.path.abspath(snapshot_path) == os.path.abspath(loadpath):
+            raise click.UsageError('--snapshot-path has to differ from --loadpath, '
+                                   'training must not overwrite the loaded infosets.')
+
+        logger.info(f'Training in the background, publishing snapshots to {snapshot_path} '
+                    f'every {publish_interval} rounds.')
+        seed_sequence = np.random.SeedSequence(seed)
+        trainer = stack.enter_context(BackgroundTrainer(loadpath, snapshot_path,
+                                                        publish_interval, train_mode,
+                                                        seed_sequence.spawn(1)[0]))
+
+    return SnapshotWatcher(snapshot_path, rng, trainer)
+
+
+@click.command(name='eval_kuhn')
+@click.option('--loadpath', '-l', type=click.Path(dir_okay=False, readable=True, exists=True),
+              callback=_check_game, required=True,
+              help='Infosets of the evaluated strategy.')
+@click.option('--opponent', '-o', type=click.Path(dir_okay=False, readable=True, exists=True),
+              callback=_check_game,
+              help='Infosets of the opponent strategy.')
+@click.option('--baseline', '-b', type=click.Choice(list(BASELINES)), default='uniform',
+              help='Fixed opponent strategy used if no opponent infosets are given.')
+@click.option('--hands', '-n', type=click.IntRange(min=1), default=1000000)
+@seed_option
+def run_kuhn_evaluation(loadpath: str, opponent: str, baseline: str, hands: int, seed: int):
+    policy = KuhnPolicy.from_infosets(load_infosets(loadpath, mmap=True))
+    if opponent is not None:
+        opponent_name = opponent
+        opponent_policy = KuhnPolicy.from_infosets(load_infosets(opponent, mmap=True))
+    else:
+        opponent_name = f'{baseline} baseline'
+        opponent_policy = baseline_policy(baseline)
+
+    logger.info(f'Playing {hands} hands of {loadpath} against {opponent_name}.')
+    result = evaluate(policy, opponent_policy, hands, np.random.default_rng(seed))
+    logger.info(f'Mean reward: {result.mean_reward:.5f} '
+                f'(95% CI: [{result.ci_low:.5f}, {result.ci_high:.5f}])')
+    logger.info(f'Exact expected reward: {result.expected_reward:.5f}')
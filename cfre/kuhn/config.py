@@ -1,2 +1,5 @@
 NUM_ROUNDS = 100000
 LOGGING_FREQUENCY = 10000
+SYNC_ROUNDS = 40
+SERVER_PORT = 8765
+PUBLISH_INTERVAL = 10000
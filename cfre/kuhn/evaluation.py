@@ -0,0 +1,107 @@
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from cfre.kuhn.kuhn_rules import DEAL_CARD_IDS, DEALS, GAME_TREE, NUM_ACTIONS
+from cfre.kuhn.kuhn_rules import NODE_CHILDREN, NODE_IS_TERMINAL, NODE_PLAYERS, NODE_UTILITIES
+from cfre.kuhn.policy import KuhnPolicy
+
+
+BASELINES = {
+    'uniform': [0.5, 0.5],
+    'always_pass': [1, 0],
+    'always_bet': [0, 1],
+}
+# z-score of the two-sided 95% confidence interval
+CONFIDENCE_Z = 1.96
+
+
+@dataclass
+class EvaluationResult:
+    num_hands: int
+    # Mean reward of the evaluated policy and its 95% confidence interval
+    mean_reward: float
+    ci_low: float
+    ci_high: float
+    # Exact expected reward over all deals, averaged over both seats
+    expected_reward: float
+
+
+def baseline_policy(name: str, rng: Optional[np.random.Generator] = None) -> KuhnPolicy:
+    if name not in BASELINES:
+        raise ValueError(f'Unknown baseline "{name}", '
+                         f'should be one of {list(BASELINES)}')
+
+    return KuhnPolicy.constant(np.array(BASELINES[name]), rng)
+
+
+def expected_value(policy0: KuhnPolicy, policy1: KuhnPolicy) -> float:
+    """Exact expected reward of player 0 obtained by enumerating all deals"""
+    policies = (policy0, policy1)
+    reach = np.zeros((len(GAME_TREE), len(DEALS)))
+    reach[0] = 1 / len(DEALS)
+    # Parents have lower ids than their children, so a single pass suffices
+    for node in GAME_TREE:
+        if node.is_terminal:
+            continue
+
+        card_ids = DEAL_CARD_IDS[:, node.player]
+        probabilities = policies[node.player].probabilities[node.node_id, card_ids]
+        for a, child in enumerate(node.children):
+            reach[child] = reach[node.node_id] * probabilities[:, a]
+
+    return float((reach * NODE_UTILITIES).sum())
+
+
+def play_hands(policy0: KuhnPolicy,
+               policy1: KuhnPolicy,
+               num_hands: int,
+               rng: np.random.Generator) -> np.array:
+    """Plays `num_hands` hands at once, returns rewards of player 0"""
+    policies = (policy0, policy1)
+    deals = rng.integers(len(DEALS), size=num_hands)
+    node_ids = np.zeros(num_hands, dtype=np.intp)
+
+    active = np.flatnonzero(~NODE_IS_TERMINAL[node_ids])
+    while len(active) > 0:
+        players = NODE_PLAYERS[node_ids[active]]
+        actions = np.empty(len(active), dtype=np.intp)
+        for player, policy in enumerate(policies):
+            to_move = players == player
+            hands = active[to_move]
+            card_ids = DEAL_CARD_IDS[deals[hands], player]
+            actions[to_move] = policy.sample(node_ids[hands], card_ids, rng)
+
+        node_ids[active] = NODE_CHILDREN[node_ids[active], actions]
+        active = active[~NODE_IS_TERMINAL[node_ids[active]]]
+
+    return NODE_UTILITIES[node_ids, deals]
+
+
+def evaluate(policy: KuhnPolicy,
+             opponent: KuhnPolicy,
+             num_hands: int,
+             rng: np.random.Generator,
+             batch_size: int = 1000000) -> EvaluationResult:
+    """Plays `policy` against `opponent`, alternating seats every hand"""
+    total = 0
+    total_squares = 0
+    played = 0
+    while played < num_hands:
+        batch = min(batch_size, num_hands - played)
+        first_seat = (batch + 1) // 2
+        rewards = np.concatenate([
+            play_hands(policy, opponent, first_seat, rng),
+            -play_hands(opponent, policy, batch - first_seat, rng),
+        ])
+        total += rewards.sum()
+        total_squares += np.square(rewards).sum()
+        played += batch
+
+    mean = float(total / num_hands)
+    variance = max(total_squares / num_hands - mean ** 2, 0)
+    half_width = CONFIDENCE_Z * math.sqrt(variance / num_hands)
+    expected = (expected_value(policy, opponent) - expected_value(opponent, policy)) / 2
+    return EvaluationResult(num_hands, mean, mean - half_width, mean + half_width, expected)
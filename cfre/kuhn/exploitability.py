@@ -0,0 +1,65 @@
+import numpy as np
+
+from cfre.kuhn.information_set import InformationSetTable
+from cfre.kuhn.kuhn_rules import CARDS, DEAL_CARD_IDS, DEALS, GAME_TREE
+from cfre.kuhn.policy import KuhnPolicy
+
+
+# Both players ante one chip, which is treated as the big blind
+MBB_PER_CHIP = 1000
+
+# Row `c` selects deals in which given player holds `CARDS[c]`, indexed by player
+_CARD_DEALS = np.array([[DEAL_CARD_IDS[:, player] == c for c in range(len(CARDS))]
+                        for player in range(2)], dtype=float)
+
+
+def best_response_value(policy: KuhnPolicy, br_player: int) -> float:
+    """Expected reward of the best response of `br_player` to `policy`
+
+    Best responding player knows the strategy of the opponent (given by
+        `policy`) but not the opponent's card, so for each of its cards it
+        picks the action with the highest value summed over deals consistent
+        with that card. All deals are handled at once as vectors.
+    """
+    reach = np.full(len(DEALS), 1 / len(DEALS))
+    return float(_best_response(0, reach, policy.probabilities, br_player).sum())
+
+
+def exploitability(policy: KuhnPolicy) -> float:
+    """Average gain of best responses against both seats in mbb per hand
+
+    It is 0 for a Nash equilibrium, since then no player can gain by deviating.
+    """
+    br_values = best_response_value(policy, 0) + best_response_value(policy, 1)
+    return MBB_PER_CHIP * br_values / 2
+
+
+def infosets_exploitability(infosets: InformationSetTable) -> float:
+    """Exploitability of the average strategy of the infosets in mbb per hand"""
+    return exploitability(KuhnPolicy.from_infosets(infosets))
+
+
+def _best_response(node_id: int,
+                   opponent_reach: np.array,
+                   probabilities: np.array,
+                   br_player: int) -> np.array:
+    # Returns values of the best responding player for every deal,
+    # weighted by chance and opponent reach probabilities
+    node = GAME_TREE[node_id]
+    if node.is_terminal:
+        sign = 1 if br_player == 0 else -1
+        return sign * opponent_reach * node.utilities
+
+    if node.player != br_player:
+        card_ids = DEAL_CARD_IDS[:, node.player]
+        action_probs = probabilities[node_id, card_ids]
+        return sum(_best_response(child, opponent_reach * action_probs[:, a],
+                                  probabilities, br_player)
+                   for a, child in enumerate(node.children))
+
+    action_values = np.array([_best_response(child, opponent_reach, probabilities, br_player)
+                              for child in node.children])
+    # Pick best action for every card of the player and use it in its deals
+    best_actions = (action_values @ _CARD_DEALS[br_player].T).argmax(axis=0)
+    card_ids = DEAL_CARD_IDS[:, br_player]
+    return action_values[best_actions[card_ids], np.arange(len(DEALS))]
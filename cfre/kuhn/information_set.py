@@ -1,11 +1,22 @@
+import json
 import pickle
-from random import random
-from typing import Dict
+import struct
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
+import click
 import numpy as np
 
+from cfre.kuhn.update_rules import ALGORITHMS
+from cfre.utils.files import atomic_write
+from cfre.utils.profiling import PROFILER
+
 
 class InformationSet:
+    """Single information set, kept to load infosets pickled by older versions
+
+    New code should use `InformationSetTable`, which stores all information
+        sets of a game in contiguous arrays.
+    """
 
     def __init__(self, num_actions):
         self._num_actions = num_actions
@@ -17,9 +28,9 @@ class InformationSet:
     def update_regret(self, regret: np.array):
         self._total_regret += regret
 
-    def sample_from_average_strategy(self) -> int:
-        threshold = random()
-        return np.searchsorted(self.avg_strategy.cumsum(), threshold)
+    def sample_from_average_strategy(self, rng: np.random.Generator) -> int:
+        threshold = rng.random()
+        return int(np.searchsorted(self.avg_strategy.cumsum(), threshold, side='right'))
 
     def get_strategy(self, realization_weight: float) -> np.array:
         strategy = np.maximum(self._total_regret, 0)
@@ -43,19 +54,435 @@ class InformationSet:
         return self._avg_strategy
 
 
-def infosets_to_pretty_str(infosets: Dict[str, InformationSet]):
+class InformationSetTable:
+    """Regrets and average strategies of many information sets
+
+    Every information set is a row of contiguous `(rows, num_actions)` arrays
+        of total regrets and average strategies plus a vector of total
+        realization weights. Keys (e.g. `'2pb'`) are mapped to rows, which are
+        created on first access. Row based methods let hot loops resolve keys
+        once and update many information sets with a single NumPy call.
+
+    `algorithm` selects how accumulators are discounted at the end of every
+        iteration (see `ALGORITHMS`), trainers call `end_iteration` after
+        every iteration.
+    """
+
+    def __init__(self, num_actions: int, capacity: int = 16, algorithm: str = 'vanilla'):
+        self._num_actions = num_actions
+        self._index = {}
+        self.set_algorithm(algorithm)
+        self._iteration = 0
+
+        self._total_weights = np.zeros(capacity)
+        self._total_regrets = np.zeros((capacity, num_actions))
+        self._avg_strategies = np.zeros((capacity, num_actions))
+
+    @classmethod
+    def from_infosets(cls, infosets: Dict[str, InformationSet]) -> 'InformationSetTable':
+        num_actions = next(iter(infosets.values()))._num_actions if infosets else 2
+        table = cls(num_actions, capacity=max(len(infosets), 1))
+        for key, iset in infosets.items():
+            row = table.index(key)
+            table._total_weights[row] = iset._total_weight
+            table._total_regrets[row] = iset._total_regret
+            table._avg_strategies[row] = iset.avg_strategy
+
+        return table
+
+    @classmethod
+    def from_arrays(cls,
+                    keys: Sequence[str],
+                    total_regrets: np.array,
+                    avg_strategies: np.array,
+                    total_weights: np.array,
+                    algorithm: str = 'vanilla',
+                    iteration: int = 0) -> 'InformationSetTable':
+        """Creates table on top of given arrays without copying them
+
+        Arrays may be read-only (e.g. memory-mapped), in which case only
+            average strategies of the table can be read.
+        """
+        table = cls(total_regrets.shape[1], capacity=0, algorithm=algorithm)
+        table._iteration = iteration
+        table._index = {key: row for row, key in enumerate(keys)}
+        table._total_regrets = total_regrets
+        table._avg_strategies = avg_strategies
+        table._total_weights = total_weights
+        return table
+
+    def set_algorithm(self, algorithm: str):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f'Unknown algorithm "{algorithm}", '
+                             f'should be one of {list(ALGORITHMS)}')
+
+        self._algorithm = algorithm
+        self._update_rule = ALGORITHMS[algorithm]
+
+    def end_iteration(self):
+        """Discounts accumulators according to the algorithm of the table"""
+        self._iteration += 1
+        if not self._update_rule.is_vanilla:
+            self._discount(self.total_regrets, self.total_weights, self._iteration)
+
+    def _discount(self, regrets: np.array, weights: np.array, iteration: int):
+        # Discounts regrets and weights in place as at the end of `iteration`
+        positive_discount = self._update_rule.positive_regret_discount(iteration)
+        negative_discount = self._update_rule.negative_regret_discount(iteration)
+        regrets *= np.where(regrets > 0, positive_discount, negative_discount)
+        # Average strategy is kept normalised, so discounting weights of
+        # previous strategies is enough to give more weight to the next ones
+        weights *= self._update_rule.strategy_discount(iteration)
+
+    def _discounted(self,
+                    regrets: np.array,
+                    weights: np.array,
+                    first_iteration: int,
+                    last_iteration: int) -> Tuple[np.array, np.array]:
+        # Copies of regrets and weights discounted at the end of every iteration in range
+        regrets, weights = regrets.copy(), weights.copy()
+        if not self._update_rule.is_vanilla:
+            for iteration in range(first_iteration, last_iteration + 1):
+                self._discount(regrets, weights, iteration)
+
+        return regrets, weights
+
+    def index(self, key: str) -> int:
+        """Returns row of the information set, creating it if needed"""
+        row = self._index.get(key)
+        if row is None:
+            row = len(self._index)
+            self._ensure_capacity(row + 1)
+            self._index[key] = row
+
+        return row
+
+    def rows(self, keys: Iterable[str]) -> np.array:
+        return np.array([self.index(k) for k in keys], dtype=np.intp)
+
+    def _ensure_capacity(self, num_rows: int):
+        capacity = len(self._total_weights)
+        if num_rows <= capacity:
+            return
+
+        new_capacity = max(num_rows, 2 * capacity)
+        self._total_weights = _resized(self._total_weights, new_capacity)
+        self._total_regrets = _resized(self._total_regrets, new_capacity)
+        self._avg_strategies = _resized(self._avg_strategies, new_capacity)
+
+    def update_regret(self, row: int, regret: np.array):
+        self._total_regrets[row] += regret
+
+    def update_regrets(self, rows: np.array, regrets: np.array):
+        """Adds regrets to many rows at once, `rows` have to be unique"""
+        self._total_regrets[rows] += regrets
+
+    def get_strategy(self, row: int, realization_weight: float) -> np.array:
+        strategy = np.maximum(self._total_regrets[row], 0)
+        strategy_norm = np.sum(strategy)
+        if strategy_norm > 0:
+            strategy = strategy / strategy_norm
+        else:
+            # If all regrets are non-positive, choose uniform random strategy
+            strategy = np.full(self._num_actions, 1 / self._num_actions)
+
+        self._total_weights[row] += realization_weight
+        if self._total_weights[row] > 0:
+            strategy_diff = strategy - self._avg_strategies[row]
+            weight = realization_weight / self._total_weights[row]
+            self._avg_strategies[row] += weight * strategy_diff
+
+        return strategy
+
+    def get_strategies(self, rows: np.array, realization_weights: np.array) -> np.array:
+        """Vectorized `get_strategy` for many rows, `rows` have to be unique"""
+        strategies = self.current_strategies(rows)
+        self.update_average_strategies(rows, strategies, realization_weights)
+        return strategies
+
+    def current_strategies(self, rows: np.array, legal_actions: np.array = None) -> np.array:
+        """Regret matching strategies of the rows, without updating averages
+
+        Optional boolean `legal_actions` of shape `(len(rows), num_actions)`
+            masks out actions which cannot be played in an information set.
+        """
+        strategies = np.maximum(self._total_regrets[rows], 0)
+        if legal_actions is None:
+            legal_actions = np.ones_like(strategies, dtype=bool)
+
+        strategies[~legal_actions] = 0
+        strategy_norms = strategies.sum(axis=1, keepdims=True)
+        # If all regrets are non-positive, choose uniform random strategy
+        uniform = legal_actions / legal_actions.sum(axis=1, keepdims=True)
+        return np.divide(strategies, strategy_norms, out=uniform, where=strategy_norms > 0)
+
+    def update_average_strategies(self,
+                                  rows: np.array,
+                                  strategies: np.array,
+                                  realization_weights: np.array):
+        """Adds strategies to averages of the rows, `rows` have to be unique"""
+        total_weights = self._total_weights[rows] + realization_weights
+        self._total_weights[rows] = total_weights
+        weights = np.divide(realization_weights, total_weights,
+                            out=np.zeros_like(total_weights), where=total_weights > 0)
+        strategy_diffs = strategies - self._avg_strategies[rows]
+        self._avg_strategies[rows] += weights[:, np.newaxis] * strategy_diffs
+
+    def merge(self, updated_tables: Sequence['InformationSetTable']):
+        """Adds updates made to copies of this table back into it
+
+        Every table in `updated_tables` has to be a copy of this table that
+            has been trained further. Regrets and average strategy accumulators
+            gathered by all copies since they were made are summed into this
+            table, information sets created by the copies are added.
+
+        Every copy has also discounted the accumulators of this table at the
+            end of each of its iterations. Only what a copy gathered on top of
+            the discounted accumulators is summed, while accumulators of this
+            table are discounted once, over all iterations of the copies.
+        """
+        base_rows = len(self)
+        base_iteration = self._iteration
+        for table in updated_tables:
+            self.rows(table.keys())
+
+        num_rows = len(self)
+        base_regrets = np.zeros((num_rows, self._num_actions))
+        base_regrets[:base_rows] = self.total_regrets[:base_rows]
+        base_weights = np.zeros(num_rows)
+        base_weights[:base_rows] = self.total_weights[:base_rows]
+        base_strategies = self.avg_strategies.copy()
+
+        new_iteration = base_iteration + sum(table.iteration - base_iteration
+                                             for table in updated_tables)
+        regrets, weights = self._discounted(base_regrets, base_weights,
+                                            base_iteration + 1, new_iteration)
+        # Average strategy is merged as a weighted sum of strategies
+        strategy_sums = weights[:, np.newaxis] * base_strategies
+        copy_bases = {}
+        for table in updated_tables:
+            if table.iteration not in copy_bases:
+                copy_bases[table.iteration] = self._discounted(base_regrets, base_weights,
+                                                               base_iteration + 1,
+                                                               table.iteration)
+
+            copy_regrets, copy_weights = copy_bases[table.iteration]
+            rows = self.rows(table.keys())
+            regrets[rows] += table.total_regrets - copy_regrets[rows]
+            weights[rows] += table.total_weights - copy_weights[rows]
+            sums = table.total_weights[:, np.newaxis] * table.avg_strategies
+            strategy_sums[rows] += sums - copy_weights[rows, np.newaxis] * base_strategies[rows]
+
+        if self._update_rule.floors_regrets:
+            # Flooring regrets of every copy does not floor their sum
+            np.maximum(regrets, 0, out=regrets)
+
+        self._iteration = new_iteration
+        self._total_regrets[:num_rows] = regrets
+        self._total_weights[:num_rows] = weights
+        np.divide(strategy_sums, weights[:, np.newaxis],
+                  out=self._avg_strategies[:num_rows], where=weights[:, np.newaxis] > 0)
+
+    def avg_strategy(self, key: str) -> np.array:
+        return self._avg_strategies[self._index[key]]
+
+    def sample_from_average_strategy(self, key: str, rng: np.random.Generator) -> int:
+        threshold = rng.random()
+        return int(np.searchsorted(self.avg_strategy(key).cumsum(), threshold, side='right'))
+
+    def keys(self) -> List[str]:
+        return list(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def num_actions(self) -> int:
+        return self._num_actions
+
+    @property
+    def algorithm(self) -> str:
+        return self._algorithm
+
+    @property
+    def iteration(self) -> int:
+        return self._iteration
+
+    @property
+    def total_weights(self) -> np.array:
+        return self._total_weights[:len(self)]
+
+    @property
+    def total_regrets(self) -> np.array:
+        return self._total_regrets[:len(self)]
+
+    @property
+    def avg_strategies(self) -> np.array:
+        return self._avg_strategies[:len(self)]
+
+
+def _resized(array: np.array, capacity: int) -> np.array:
+    resized = np.zeros((capacity,) + array.shape[1:])
+    resized[:len(array)] = array
+    return resized
+
+
+def infosets_to_pretty_str(infosets: InformationSetTable):
     out = '{\n'
-    for hist, iset in infosets.items():
-        out += f'\t{hist}: {iset.avg_strategy}\n'
+    for hist in infosets.keys():
+        out += f'\t{hist}: {infosets.avg_strategy(hist)}\n'
 
     return out + '}'
 
 
-def save_infosets(infosets: Dict[str, InformationSet], savepath: str):
-    with open(savepath, 'wb') as f:
-        pickle.dump(infosets, f)
+CHECKPOINT_MAGIC = b'CFREINFO'
+CHECKPOINT_VERSION = 2
+# Arrays start at multiples of this many bytes so they can be memory-mapped
+CHECKPOINT_ALIGNMENT = 64
+_CHECKPOINT_PREFIX = struct.Struct('<8sII')  # Magic, version, header length
+_CHECKPOINT_DTYPE = np.dtype('<f8')
+
+
+@PROFILER.timed('checkpoint.save')
+def save_infosets(infosets: InformationSetTable, savepath: str, **params: Any):
+    """Saves infosets as a binary checkpoint
+
+    Checkpoint starts with a magic string, format version and a JSON header
+        holding the infoset keys and `params` (e.g. game parameters). It is
+        followed by aligned little-endian float arrays of total regrets,
+        average strategies and total weights. The file is written to a
+        temporary file first and atomically renamed, so readers never see
+        a partially written checkpoint.
+    """
+    keys = infosets.keys()
+    header = {
+        'num_actions': infosets.num_actions,
+        'algorithm': infosets.algorithm,
+        'iteration': infosets.iteration,
+        'keys': keys,
+        'params': params,
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    prefix = _CHECKPOINT_PREFIX.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, len(header_bytes))
+    padding = -(len(prefix) + len(header_bytes)) % CHECKPOINT_ALIGNMENT
+
+    with atomic_write(savepath) as f:
+        f.write(prefix + header_bytes + bytes(padding))
+        for array in _checkpoint_arrays(infosets):
+            f.write(np.ascontiguousarray(array, dtype=_CHECKPOINT_DTYPE).tobytes())
 
 
-def load_infosets(loadpath: str) -> Dict[str, InformationSet]:
+@PROFILER.timed('checkpoint.load')
+def load_infosets(loadpath: str, mmap: bool = False) -> InformationSetTable:
+    """Loads infosets saved with `save_infosets`
+
+    With `mmap` arrays are memory-mapped read-only instead of read into
+        memory, which makes loading instant but the table can only be used to
+        read average strategies (e.g. to play the game). Pickled infosets saved
+        by older versions are loaded as well.
+    """
     with open(loadpath, 'rb') as f:
-        return pickle.load(f)
+        prefix = f.read(_CHECKPOINT_PREFIX.size)
+
+    if not prefix.startswith(CHECKPOINT_MAGIC):
+        return _load_pickled_infosets(loadpath)
+
+    header, offset = _read_checkpoint_header(loadpath)
+    num_rows = len(header['keys'])
+    num_actions = header['num_actions']
+    shapes = [(num_rows, num_actions), (num_rows, num_actions), (num_rows,)]
+
+    arrays = []
+    for shape in shapes:
+        if mmap and num_rows > 0:
+            array = np.memmap(loadpath, dtype=_CHECKPOINT_DTYPE, mode='r',
+                              offset=offset, shape=shape)
+        else:
+            array = np.fromfile(loadpath, dtype=_CHECKPOINT_DTYPE,
+                                count=int(np.prod(shape)), offset=offset)
+            array = array.astype(float, copy=False).reshape(shape)
+
+        arrays.append(array)
+        offset += int(np.prod(shape)) * _CHECKPOINT_DTYPE.itemsize
+
+    total_regrets, avg_strategies, total_weights = arrays
+    return InformationSetTable.from_arrays(header['keys'], total_regrets,
+                                           avg_strategies, total_weights,
+                                           # Version 1 checkpoints had no algorithm
+                                           header.get('algorithm', 'vanilla'),
+                                           header.get('iteration', 0))
+
+
+def load_infosets_params(loadpath: str) -> Dict[str, Any]:
+    """Returns parameters saved in the checkpoint header"""
+    header, _ = _read_checkpoint_header(loadpath)
+    return header['params']
+
+
+def load_saved_rounds(loadpath: str) -> int:
+    """Returns number of training rounds saved with infosets, 0 if unknown"""
+    try:
+        return load_infosets_params(loadpath).get('rounds', 0)
+    except ValueError:
+        # Infosets pickled by older versions do not store played rounds
+        return 0
+
+
+def load_saved_game(loadpath: str) -> Optional[str]:
+    """Returns name of the game infosets were saved for, None if unknown"""
+    try:
+        return load_infosets_params(loadpath).get('game')
+    except ValueError:
+        # Infosets pickled by older versions do not store their game
+        return None
+
+
+def saved_game_callback(game: str, game_name: str) -> Callable:
+    """Click callback rejecting infosets paths saved for a game other than `game`
+
+    Infosets without a stored game (e.g. pickled by older versions) are accepted.
+    """
+    def callback(ctx: click.Context, param: click.Parameter, loadpath: Optional[str]):
+        saved_game = None if loadpath is None else load_saved_game(loadpath)
+        if saved_game is not None and saved_game != game:
+            raise click.BadParameter(f'{loadpath} holds infosets of "{saved_game}", '
+                                     f'not of {game_name}.')
+
+        return loadpath
+
+    return callback
+
+
+def _read_checkpoint_header(loadpath: str) -> Tuple[Dict[str, Any], int]:
+    with open(loadpath, 'rb') as f:
+        magic, version, header_len = _CHECKPOINT_PREFIX.unpack(f.read(_CHECKPOINT_PREFIX.size))
+        if magic != CHECKPOINT_MAGIC:
+            raise ValueError(f'{loadpath} is not an infosets checkpoint')
+
+        if version > CHECKPOINT_VERSION:
+            raise ValueError(f'Unsupported checkpoint version {version} '
+                             f'(at most {CHECKPOINT_VERSION} is supported)')
+
+        header = json.loads(f.read(header_len).decode('utf-8'))
+
+    offset = _CHECKPOINT_PREFIX.size + header_len
+    offset += -offset % CHECKPOINT_ALIGNMENT
+    return header, offset
+
+
+def _checkpoint_arrays(infosets: InformationSetTable) -> Tuple[np.array, ...]:
+    return infosets.total_regrets, infosets.avg_strategies, infosets.total_weights
+
+
+def _load_pickled_infosets(loadpath: str) -> InformationSetTable:
+    with open(loadpath, 'rb') as f:
+        infosets = pickle.load(f)
+
+    if isinstance(infosets, dict):
+        # Infosets saved before they were stored in a table
+        infosets = InformationSetTable.from_infosets(infosets)
+
+    return infosets
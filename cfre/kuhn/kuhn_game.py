@@ -1,20 +1,23 @@
-from random import sample
-from typing import Dict
+from typing import Optional
 
-from cfre.kuhn import InformationSet
+import numpy as np
 
-
-CARDS = [1, 2, 3]
-NUM_ACTIONS = 2
-VALUE_TO_ACTION = {0: 'p', 1: 'b'}
+from cfre.kuhn.kuhn_rules import ACTION_TO_VALUE, CARDS, DEAL_CARD_IDS, DEALS
+from cfre.kuhn.kuhn_rules import GAME_TREE, NUM_ACTIONS, VALUE_TO_ACTION
+from cfre.kuhn.policy import KuhnPolicy
 
 
 class KuhnGame:
 
-    def __init__(self, infosets: Dict[str, InformationSet]):
-        self._infosets = infosets
+    def __init__(self, policy: KuhnPolicy, rng: Optional[np.random.Generator] = None):
+        self._policy = policy
+        self._rng = np.random.default_rng() if rng is None else rng
         self._user_player = None
-        self._cards = None
+        self._deal = None
+
+    def set_policy(self, policy: KuhnPolicy):
+        """Replaces the policy of the bot from the next game on"""
+        self._policy = policy
 
     def start_game(self, user_player=0):
         if user_player > 1 or user_player < 0:
@@ -22,40 +25,27 @@ class KuhnGame:
                              f'0 or 1 but was: {user_player}')
 
         self._user_player = user_player
-        self._cards = sample(CARDS, 2)
+        self._deal = self._rng.integers(len(DEALS))
         reward_modifier = 1 if user_player == 0 else -1
-        return reward_modifier * self._play_game('')
-
-    def _play_game(self, history: str):
-        plays_so_far = len(history)
-        player = plays_so_far % NUM_ACTIONS
-        opponent = 1 - player
-
-        # Check for terminal states
-        if plays_so_far >= 2:
-            card_comparison_util = 1 if self._cards[player] > self._cards[opponent] else -1
-            last_two_plays = history[-2:]
-            if last_two_plays == 'pp':
-                return card_comparison_util
-
-            if last_two_plays == 'bb':
-                return 2 * card_comparison_util
-
-            if last_two_plays == 'bp':
-                return 1
-
-        # Get player action
-        info_set_key = str(self._cards[player]) + history
-        if player == self._user_player:
-            action = input(f'Current state: {info_set_key}. '
-                           f'Choose your next action (p - pass, b - bet). ')
-            while action not in VALUE_TO_ACTION.values():
-                action = input(f'Invalid action. Was "{action}" but only one of '
-                               f'{list(VALUE_TO_ACTION.values())} is possible.'
-                               f'Choose again. ')
-        else:
-            action_key = self._infosets[info_set_key].sample_from_average_strategy()
-            action = VALUE_TO_ACTION[action_key]
-
-        # Negative because recursive call calculates reward for an opponent
-        return -self._play_game(history + action)
+        return reward_modifier * self._play_game()
+
+    def _play_game(self) -> int:
+        """Plays the game from the root, returns reward of player 0"""
+        node = GAME_TREE[0]
+        while not node.is_terminal:
+            card_id = DEAL_CARD_IDS[self._deal, node.player]
+            if node.player == self._user_player:
+                info_set_key = node.infoset_keys[card_id]
+                action = input(f'Current state: {info_set_key}. '
+                               f'Choose your next action (p - pass, b - bet). ')
+                while action not in ACTION_TO_VALUE:
+                    action = input(f'Invalid action. Was "{action}" but only one of '
+                                   f'{list(VALUE_TO_ACTION.values())} is possible.'
+                                   f'Choose again. ')
+                action_key = ACTION_TO_VALUE[action]
+            else:
+                action_key = self._policy.act(node.node_id, card_id)
+
+            node = GAME_TREE[node.children[action_key]]
+
+        return int(node.utilities[self._deal])
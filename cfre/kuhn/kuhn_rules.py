@@ -0,0 +1,142 @@
+from dataclasses import dataclass
+from itertools import permutations
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cfre.game_tree.game import CHANCE, Game
+
+
+CARDS = [1, 2, 3]
+NUM_ACTIONS = 2
+VALUE_TO_ACTION = {0: 'p', 1: 'b'}
+ACTION_TO_VALUE = {a: v for v, a in VALUE_TO_ACTION.items()}
+# All possible (player 0 card, player 1 card) deals, each equally likely
+DEALS = np.array(list(permutations(CARDS, 2)))
+# Index in `CARDS` of the card held by each player in every deal
+DEAL_CARD_IDS = np.searchsorted(CARDS, DEALS)
+
+
+@dataclass(frozen=True)
+class HistoryNode:
+    node_id: int
+    history: str
+    player: int
+    # Child node id for every action, empty for terminal nodes
+    children: Tuple[int, ...]
+    # Key of the information set for every card in `CARDS`
+    infoset_keys: Tuple[str, ...]
+    # Utility of player 0 for every deal in `DEALS`, None for non-terminal nodes
+    utilities: Optional[np.array]
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.utilities is not None
+
+
+def _build_game_tree() -> List[HistoryNode]:
+    """Expands all betting histories into a list of nodes, root has id 0"""
+    nodes = []
+
+    def add_node(history: str) -> int:
+        node_id = len(nodes)
+        nodes.append(None)  # Reserve id before children are added
+
+        player = len(history) % NUM_ACTIONS
+        utilities = _terminal_utilities(history)
+        children = ()
+        if utilities is None:
+            children = tuple(add_node(history + VALUE_TO_ACTION[a])
+                             for a in range(NUM_ACTIONS))
+
+        infoset_keys = tuple(str(c) + history for c in CARDS)
+        nodes[node_id] = HistoryNode(node_id, history, player, children,
+                                    infoset_keys, utilities)
+        return node_id
+
+    add_node('')
+    return nodes
+
+
+def _terminal_utilities(history: str) -> Optional[np.array]:
+    return terminal_utility(history, DEALS.T)
+
+
+def terminal_utility(history: str, cards: Sequence) -> Optional[np.array]:
+    """Returns utility of player 0, None if the history is not terminal
+
+    Cards of both players can be single cards or arrays of many deals.
+    """
+    if len(history) < 2:
+        return None
+
+    card_comparison_util = np.sign(cards[0] - cards[1])
+    last_two_plays = history[-2:]
+    if last_two_plays == 'pp':
+        return card_comparison_util
+
+    if last_two_plays == 'bb':
+        return 2 * card_comparison_util
+
+    if last_two_plays == 'bp':
+        # Player who passed after a bet loses the ante
+        loser = (len(history) - 1) % NUM_ACTIONS
+        return np.full_like(card_comparison_util, 1 if loser == 1 else -1)
+
+    return None
+
+
+class KuhnRules(Game):
+    """Kuhn Poker as a generic `Game`
+
+    States are (deal, history) pairs, deal is None before cards are dealt.
+        Information set keys match the ones used by `KuhnTrainer`.
+    """
+
+    def initial_state(self) -> Tuple[Optional[Tuple[int, int]], str]:
+        return None, ''
+
+    def current_player(self, state: Tuple) -> int:
+        deal, history = state
+        if deal is None:
+            return CHANCE
+
+        return len(history) % NUM_ACTIONS
+
+    def is_terminal(self, state: Tuple) -> bool:
+        deal, history = state
+        return deal is not None and terminal_utility(history, deal) is not None
+
+    def terminal_utility(self, state: Tuple) -> float:
+        deal, history = state
+        return float(terminal_utility(history, deal))
+
+    def legal_actions(self, state: Tuple) -> Sequence[int]:
+        return range(NUM_ACTIONS)
+
+    def chance_outcomes(self, state: Tuple) -> List[Tuple[Tuple, float]]:
+        return [((tuple(map(int, deal)), ''), 1 / len(DEALS)) for deal in DEALS]
+
+    def next_state(self, state: Tuple, action: int) -> Tuple:
+        deal, history = state
+        return deal, history + VALUE_TO_ACTION[action]
+
+    def infoset_key(self, state: Tuple) -> str:
+        deal, history = state
+        return str(deal[self.current_player(state)]) + history
+
+    @property
+    def num_actions(self) -> int:
+        return NUM_ACTIONS
+
+
+GAME_TREE = _build_game_tree()
+
+# Flat views of `GAME_TREE` for vectorized traversals over many deals
+NODE_PLAYERS = np.array([node.player for node in GAME_TREE])
+# Child node id for every action, -1 for terminal nodes
+NODE_CHILDREN = np.array([node.children or (-1,) * NUM_ACTIONS for node in GAME_TREE])
+# Utility of player 0 for every deal, 0 for non-terminal nodes
+NODE_UTILITIES = np.array([node.utilities if node.is_terminal else np.zeros(len(DEALS))
+                           for node in GAME_TREE])
+NODE_IS_TERMINAL = np.array([node.is_terminal for node in GAME_TREE])
@@ -1,50 +1,69 @@
-from collections import defaultdict
-from random import sample
-from typing import Tuple, Dict
+from typing import Callable, Optional, Tuple
 
 import numpy as np
 
-from cfre.kuhn.information_set import InformationSet
-from cfre.kuhn.kuhn_game import CARDS, NUM_ACTIONS, VALUE_TO_ACTION
+from cfre.game_tree import FlatCFRSolver, compile_game
+from cfre.kuhn.information_set import InformationSet, InformationSetTable
+from cfre.kuhn.kuhn_rules import DEALS, KuhnRules
+from cfre.kuhn.kuhn_rules import NUM_ACTIONS, VALUE_TO_ACTION, terminal_utility
+from cfre.kuhn.mccfr import MCCFRTrainer, SAMPLING_SCHEMES
+from cfre.utils.profiling import PROFILER
+from cfre.utils.seeding import UniformStream
+
+
+TRAINING_MODES = ['chance', 'full-width'] + SAMPLING_SCHEMES
+
+# All Kuhn Poker states compiled once for full-width iterations
+KUHN_TREE = compile_game(KuhnRules())
+# Deals as tuples of Python ints, which are faster to compare in `_cfr`
+_DEALS = [tuple(map(int, deal)) for deal in DEALS]
 
 
 class KuhnTrainer:
 
-    def __init__(self, infosets=None):
+    def __init__(self,
+                 infosets: InformationSetTable = None,
+                 algorithm: str = 'vanilla',
+                 rng: Optional[np.random.Generator] = None):
         self._cards = None
+        self._uniforms = UniformStream(np.random.default_rng() if rng is None else rng)
         self._infosets = infosets
         if self._infosets is None:
-            self._infosets = defaultdict(_new_kuhn_info_set)
+            self._infosets = InformationSetTable(NUM_ACTIONS, algorithm=algorithm)
+
+        self._solver = None
 
+    @PROFILER.timed('kuhn.play_round')
     def play_round(self) -> float:
-        self._cards = sample(CARDS, 2)
-        return self._cfr('', (1, 1))
+        self._cards = _DEALS[self._uniforms.integer(len(_DEALS))]
+        reward = self._cfr('', (1, 1))
+        self._infosets.end_iteration()
+        return reward
 
     def _cfr(self, history: str, player_probs: Tuple[float, float]):
+        if PROFILER.enabled:
+            PROFILER.count('kuhn.node_visits')
+
         plays_so_far = len(history)
         player = plays_so_far % NUM_ACTIONS
         opponent = 1 - player
 
-        # Check for terminal states
-        if plays_so_far >= 2:
-            card_comparison_util = 1 if self._cards[player] > self._cards[opponent] else -1
-            last_two_plays = history[-2:]
-            if last_two_plays == 'pp':
-                return card_comparison_util
-
-            if last_two_plays == 'bb':
-                return 2 * card_comparison_util
-
-            if last_two_plays == 'bp':
-                return 1
+        # Check for terminal states, utility is returned for the player to move
+        utility = terminal_utility(history, self._cards)
+        if utility is not None:
+            return int(utility) if player == 0 else -int(utility)
 
         # Get (or create) information set for the player
         info_set_key = str(self._cards[player]) + history
-        info_set = self._infosets[info_set_key]
+        info_set_row = self._infosets.index(info_set_key)
+        if PROFILER.enabled:
+            PROFILER.count('kuhn.infoset_lookups')
+            # Strategy, action rewards, regret and weighted regret arrays
+            PROFILER.count('kuhn.array_allocations', 4)
 
         # Recursively call CFR for each action
         weight = player_probs[player]
-        strategy = info_set.get_strategy(weight)
+        strategy = self._infosets.get_strategy(info_set_row, weight)
 
         expected_action_rewards = np.zeros(NUM_ACTIONS)
         for a in range(NUM_ACTIONS):
@@ -62,26 +81,45 @@ class KuhnTrainer:
         # Compute and accumulate regret for each action
         regret = expected_action_rewards - full_expected_reward
         weighted_regret = player_probs[opponent] * regret
-        info_set.update_regret(weighted_regret)
+        self._infosets.update_regret(info_set_row, weighted_regret)
 
         return full_expected_reward
 
-    @property
-    def information_sets(self) -> Dict[str, InformationSet]:
-        return self._infosets
-
-
-def _new_kuhn_info_set():  # Use instead of lambda so it's picklable
-    return InformationSet(2)
-
+    def play_full_round(self) -> float:
+        """Runs one CFR iteration over all deals at once
 
+        Iterates over the precompiled `KUHN_TREE` level by level, visiting
+            each history once per iteration instead of once per deal. Updates
+            are weighted by the chance probability of each deal, i.e. a full
+            round is the expectation of `play_round` updates.
 
+        Returns expected reward of player 0 over all deals.
+        """
+        if self._solver is None:
+            self._solver = FlatCFRSolver(KUHN_TREE, self._infosets)
 
+        return self._solver.iterate()
 
+    @property
+    def information_sets(self) -> InformationSetTable:
+        return self._infosets
 
 
+def create_round_function(mode: str,
+                          infosets: InformationSetTable,
+                          rng: Optional[np.random.Generator] = None) -> Callable[[], float]:
+    """Returns function playing one training round of given mode on infosets"""
+    if mode == 'chance':
+        return KuhnTrainer(infosets, rng=rng).play_round
 
+    if mode == 'full-width':
+        return KuhnTrainer(infosets).play_full_round
 
+    if mode in SAMPLING_SCHEMES:
+        return MCCFRTrainer(infosets, sampling=mode, seed=rng).play_round
 
+    raise ValueError(f'Unknown training mode "{mode}", should be one of {TRAINING_MODES}')
 
 
+def _new_kuhn_info_set():  # Needed to unpickle infosets saved as a defaultdict
+    return InformationSet(2)
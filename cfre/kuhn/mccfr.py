@@ -0,0 +1,148 @@
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from cfre.kuhn.information_set import InformationSetTable
+from cfre.kuhn.kuhn_rules import DEAL_CARD_IDS, DEALS, GAME_TREE, NUM_ACTIONS
+from cfre.utils.profiling import PROFILER
+from cfre.utils.seeding import UniformStream
+
+
+SAMPLING_SCHEMES = ['external', 'outcome']
+# Probability of exploring uniformly at nodes of the updated player
+# in outcome sampling, needed so that every action keeps being sampled
+DEFAULT_EXPLORATION = 0.6
+
+
+class MCCFRTrainer:
+    """Monte Carlo CFR for Kuhn Poker
+
+    Every round runs one traversal per player, updating regrets of that
+        player only. External sampling samples chance and opponent actions
+        and expands all actions of the updated player, outcome sampling
+        samples a single trajectory and corrects regrets by importance
+        weights. Cost of a round follows the length of sampled paths
+        instead of the size of the game tree.
+
+    `seed` is anything accepted by `np.random.default_rng`, e.g. a generator
+        shared with the caller.
+    """
+
+    def __init__(self,
+                 infosets: InformationSetTable = None,
+                 sampling: str = 'external',
+                 seed: Union[None, int, np.random.SeedSequence, np.random.Generator] = None,
+                 exploration: float = DEFAULT_EXPLORATION,
+                 algorithm: str = 'vanilla'):
+        if sampling not in SAMPLING_SCHEMES:
+            raise ValueError(f'Unknown sampling scheme "{sampling}", '
+                             f'should be one of {SAMPLING_SCHEMES}')
+
+        self._sampling = sampling
+        self._exploration = exploration
+        self._uniforms = UniformStream(np.random.default_rng(seed))
+        self._infosets = infosets
+        if self._infosets is None:
+            self._infosets = InformationSetTable(NUM_ACTIONS, algorithm=algorithm)
+
+        # Rows of infosets for every card, indexed by node id in `GAME_TREE`
+        self._node_rows = [self._infosets.rows(node.infoset_keys) if not node.is_terminal else None
+                           for node in GAME_TREE]
+        self._deal = None
+
+    @PROFILER.timed('kuhn.mccfr_round')
+    def play_round(self) -> float:
+        """Runs one traversal per player, returns reward of player 0
+
+        The reward is the value estimate of player 0 from its traversal
+            (external sampling) or its reward in the sampled hand (outcome
+            sampling).
+        """
+        rewards = []
+        for traverser in range(2):
+            self._deal = self._uniforms.integer(len(DEALS))
+            if self._sampling == 'external':
+                rewards.append(self._external_sampling(0, traverser))
+            else:
+                _, _, reward = self._outcome_sampling(0, traverser, 1, 1, 1)
+                rewards.append(reward)
+
+        self._infosets.end_iteration()
+        return rewards[0]
+
+    def _external_sampling(self, node_id: int, traverser: int) -> float:
+        # Returns sampled value of the node for the traverser
+        node = GAME_TREE[node_id]
+        if node.is_terminal:
+            return _player_utility(node.utilities[self._deal], traverser)
+
+        player = node.player
+        row = self._node_rows[node_id][DEAL_CARD_IDS[self._deal, player]]
+        if player != traverser:
+            # Average strategy is updated at nodes of the sampled opponent
+            strategy = self._infosets.get_strategy(row, 1)
+            action = _sample(strategy, self._uniforms.uniform())
+            return self._external_sampling(node.children[action], traverser)
+
+        strategy = self._infosets.get_strategy(row, 0)
+        action_values = np.array([self._external_sampling(child, traverser)
+                                  for child in node.children])
+        value = np.dot(strategy, action_values)
+        self._infosets.update_regret(row, action_values - value)
+        return value
+
+    def _outcome_sampling(self,
+                          node_id: int,
+                          traverser: int,
+                          traverser_reach: float,
+                          opponent_reach: float,
+                          sample_prob: float) -> Tuple[float, float, float]:
+        # Returns importance weighted utility of the traverser, probability of
+        # playing the sampled tail of the trajectory and reward of player 0
+        node = GAME_TREE[node_id]
+        if node.is_terminal:
+            reward = node.utilities[self._deal]
+            return _player_utility(reward, traverser) / sample_prob, 1, reward
+
+        player = node.player
+        row = self._node_rows[node_id][DEAL_CARD_IDS[self._deal, player]]
+        strategy = self._infosets.get_strategy(row, 0)
+        if player == traverser:
+            uniform = np.full(NUM_ACTIONS, 1 / NUM_ACTIONS)
+            sample_probs = self._exploration * uniform + (1 - self._exploration) * strategy
+        else:
+            sample_probs = strategy
+
+        action = _sample(sample_probs, self._uniforms.uniform())
+        child = node.children[action]
+        child_sample_prob = sample_prob * sample_probs[action]
+        if player == traverser:
+            utility, tail_prob, reward = self._outcome_sampling(
+                child, traverser, traverser_reach * strategy[action],
+                opponent_reach, child_sample_prob)
+
+            weighted_utility = utility * opponent_reach
+            regret = -weighted_utility * tail_prob * strategy[action] * np.ones(NUM_ACTIONS)
+            regret[action] += weighted_utility * tail_prob
+            self._infosets.update_regret(row, regret)
+        else:
+            utility, tail_prob, reward = self._outcome_sampling(
+                child, traverser, traverser_reach,
+                opponent_reach * strategy[action], child_sample_prob)
+
+            # Stochastically weighted average strategy update
+            self._infosets.get_strategy(row, opponent_reach / sample_prob)
+
+        return utility, tail_prob * strategy[action], reward
+
+    @property
+    def information_sets(self) -> InformationSetTable:
+        return self._infosets
+
+
+def _player_utility(utility_player0: float, player: int) -> float:
+    return utility_player0 if player == 0 else -utility_player0
+
+
+def _sample(probs: np.array, threshold: float) -> int:
+    return int(np.count_nonzero(probs.cumsum()[:-1] <= threshold))
@@ -0,0 +1,100 @@
+from multiprocessing import Pool
+from typing import Optional, Tuple
+
+import numpy as np
+
+from cfre.kuhn.config import SYNC_ROUNDS
+from cfre.kuhn.information_set import InformationSetTable
+from cfre.kuhn.kuhn_rules import NUM_ACTIONS
+from cfre.kuhn.kuhn_trainer import TRAINING_MODES, create_round_function
+
+
+# Full-width iterations are deterministic, so every worker would repeat the same work
+PARALLEL_MODES = [mode for mode in TRAINING_MODES if mode != 'full-width']
+
+
+def default_sync_interval(num_workers: int) -> int:
+    """Rounds each worker plays between merges, `SYNC_ROUNDS` in total
+
+    Workers train on a copy of the infosets that misses all rounds played by
+        the other workers since the last merge, so the total number of rounds
+        per merge is kept fixed rather than the rounds of each worker.
+    """
+    return max(1, SYNC_ROUNDS // num_workers)
+
+
+class ParallelKuhnTrainer:
+    """Runs `KuhnTrainer` iterations in a pool of worker processes
+
+    Every synchronisation step each worker gets a copy of the master
+        infosets and trains them for `sync_interval` rounds with its own
+        random stream spawned from `seed`, so workers sample different
+        deals and whole runs are reproducible. Regrets and average strategies
+        accumulated by all workers are then summed into the master infosets,
+        which are handed out again in the next step. Only sampling modes
+        (`PARALLEL_MODES`) are supported, since workers need different samples.
+
+    Use as a context manager so that worker processes are shut down.
+    """
+
+    def __init__(self,
+                 num_workers: int,
+                 sync_interval: int,
+                 mode: str = 'chance',
+                 infosets: InformationSetTable = None,
+                 algorithm: str = 'vanilla',
+                 seed: Optional[int] = None):
+        if num_workers < 1:
+            raise ValueError(f'Number of workers has to be at least 1 '
+                             f'but was {num_workers}')
+
+        if mode not in PARALLEL_MODES:
+            raise ValueError(f'Mode "{mode}" can not be trained in parallel, '
+                             f'should be one of {PARALLEL_MODES}')
+
+        self._num_workers = num_workers
+        self._sync_interval = sync_interval
+        self._mode = mode
+        self._infosets = infosets
+        if self._infosets is None:
+            self._infosets = InformationSetTable(NUM_ACTIONS, algorithm=algorithm)
+
+        self._seed_sequence = np.random.SeedSequence(seed)
+        self._pool = Pool(num_workers)
+
+    def train(self) -> Tuple[float, int]:
+        """Runs one synchronisation step on all workers
+
+        Returns total reward of player 0 and number of rounds played.
+        """
+        tasks = [(self._infosets, self._sync_interval, self._mode, seed_sequence)
+                 for seed_sequence in self._seed_sequence.spawn(self._num_workers)]
+        results = self._pool.starmap(_train_shard, tasks)
+
+        self._infosets.merge([infosets for infosets, _ in results])
+        total_reward = sum(reward for _, reward in results)
+        return total_reward, self._num_workers * self._sync_interval
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self) -> 'ParallelKuhnTrainer':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def information_sets(self) -> InformationSetTable:
+        return self._infosets
+
+
+def _train_shard(infosets: InformationSetTable,
+                 num_rounds: int,
+                 mode: str,
+                 seed_sequence: np.random.SeedSequence
+                 ) -> Tuple[InformationSetTable, float]:
+    play_round = create_round_function(mode, infosets, np.random.default_rng(seed_sequence))
+    total_reward = sum(play_round() for _ in range(num_rounds))
+    return infosets, total_reward
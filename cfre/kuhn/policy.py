@@ -0,0 +1,80 @@
+from typing import Optional
+
+import numpy as np
+
+from cfre.kuhn.information_set import InformationSetTable
+from cfre.kuhn.kuhn_rules import CARDS, GAME_TREE, NUM_ACTIONS
+from cfre.utils.seeding import UniformStream
+
+
+class KuhnPolicy:
+    """Frozen average strategy of both players, indexed by integer ids
+
+    Action probabilities are stored in a `(num_nodes, num_cards, num_actions)`
+        array indexed by node id in `GAME_TREE` and card index in `CARDS`,
+        together with their cumulative distributions. Sampling an action is
+        a table lookup and a comparison with a uniform number, which are drawn
+        from a NumPy generator in blocks.
+    """
+
+    def __init__(self, probabilities: np.array, rng: Optional[np.random.Generator] = None):
+        expected_shape = (len(GAME_TREE), len(CARDS), NUM_ACTIONS)
+        if probabilities.shape != expected_shape:
+            raise ValueError(f'Invalid shape of probabilities. Was '
+                             f'{probabilities.shape} but should be {expected_shape}')
+
+        self._probabilities = np.array(probabilities, dtype=float)
+        self._cdf = self._probabilities.cumsum(axis=-1)
+        # Guard against rounding so that every uniform number maps to an action
+        self._cdf[..., -1] = 1
+        self._probabilities.setflags(write=False)
+        self._cdf.setflags(write=False)
+
+        self._rng = np.random.default_rng() if rng is None else rng
+        self._uniforms = UniformStream(self._rng)
+
+    @classmethod
+    def from_infosets(cls,
+                      infosets: InformationSetTable,
+                      rng: Optional[np.random.Generator] = None) -> 'KuhnPolicy':
+        """Builds policy from average strategies of the infosets
+
+        Information sets that are missing or were never reached
+            are played uniformly at random.
+        """
+        probabilities = np.full((len(GAME_TREE), len(CARDS), NUM_ACTIONS), 1 / NUM_ACTIONS)
+        for node in GAME_TREE:
+            for card_id, key in enumerate(node.infoset_keys):
+                if node.is_terminal or key not in infosets:
+                    continue
+
+                strategy = infosets.avg_strategy(key)
+                if strategy.sum() > 0:
+                    probabilities[node.node_id, card_id] = strategy / strategy.sum()
+
+        return cls(probabilities, rng)
+
+    def act(self, node_id: int, card_id: int) -> int:
+        threshold = self._uniforms.uniform()
+        return int(np.count_nonzero(self._cdf[node_id, card_id] <= threshold))
+
+    def sample(self,
+               node_ids: np.array,
+               card_ids: np.array,
+               rng: Optional[np.random.Generator] = None) -> np.array:
+        """Samples one action for every pair of node id and card index"""
+        rng = self._rng if rng is None else rng
+        thresholds = rng.random(len(node_ids))
+        cdf = self._cdf[node_ids, card_ids]
+        return (cdf <= thresholds[:, np.newaxis]).sum(axis=1)
+
+    @classmethod
+    def constant(cls, strategy: np.array, rng: Optional[np.random.Generator] = None) -> 'KuhnPolicy':
+        """Policy playing the same strategy in every information set"""
+        probabilities = np.empty((len(GAME_TREE), len(CARDS), NUM_ACTIONS))
+        probabilities[:] = strategy
+        return cls(probabilities, rng)
+
+    @property
+    def probabilities(self) -> np.array:
+        return self._probabilities
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import sys
+from typing import Coroutine, List, Optional
+
+import numpy as np
+
+from cfre.kuhn.kuhn_rules import ACTION_TO_VALUE, CARDS, DEAL_CARD_IDS, DEALS
+from cfre.kuhn.kuhn_rules import GAME_TREE, VALUE_TO_ACTION
+from cfre.kuhn.policy import KuhnPolicy
+from cfre.kuhn.snapshots import SnapshotWatcher
+from cfre.utils.seeding import UniformStream
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds a session may wait for the next line of its client before it is closed
+SESSION_TIMEOUT = 600
+# Connections waiting to be accepted, many clients may connect at the same time
+CONNECTION_BACKLOG = 4096
+# Line sent by a client to end its session
+QUIT_COMMAND = 'q'
+# Seconds between checks for a newer strategy snapshot
+SNAPSHOT_POLL_INTERVAL = 1
+
+
+class KuhnSession:
+    """State of a single client playing a series of hands against the bot
+
+    Sessions only keep a few integers (a deal index and a node id in
+        `GAME_TREE` instead of cards and betting history) and a reference to
+        the shared policy played in the current hand, so a server can hold
+        many thousands of them at once.
+    """
+
+    __slots__ = ('policy', 'deal', 'node_id', 'user_player', 'num_hands', 'total_reward')
+
+    def __init__(self):
+        self.policy = None
+        self.deal = 0
+        self.node_id = 0
+        self.user_player = 0
+        self.num_hands = 0
+        self.total_reward = 0
+
+    def card_id(self, player: int) -> int:
+        return int(DEAL_CARD_IDS[self.deal, player])
+
+
+class KuhnServer:
+    """Hosts many concurrent Kuhn Poker sessions against a single policy
+
+    Clients talk a line-based protocol: the server sends the state of the
+        hand whenever it is the client's turn and the client answers with an
+        action ('p' - pass, 'b' - bet) or 'q' to leave. Hands follow each other
+        without asking, players switch seats after every hand.
+
+    All sessions share one read-only `policy`. Sessions are served by a
+        single event loop, so moves of the bot are plain table lookups
+        without any locking. Game logic (`start_hand` and `handle`) does not
+        touch any streams, so it can also be driven directly.
+
+    With `snapshots` the policy is replaced whenever a newer strategy snapshot
+        is published. Every hand is played to the end with the policy it was
+        dealt with, so sessions pick up new snapshots between hands.
+    """
+
+    def __init__(self,
+                 policy: KuhnPolicy,
+                 rng: Optional[np.random.Generator] = None,
+                 snapshots: Optional[SnapshotWatcher] = None):
+        self._policy = policy
+        self._snapshots = snapshots
+        self._uniforms = UniformStream(np.random.default_rng() if rng is None else rng)
+        self._num_sessions = 0
+
+    def start_hand(self, session: KuhnSession) -> List[str]:
+        """Deals a new hand and plays bot moves until the client has to act"""
+        session.policy = self._policy
+        session.deal = self._uniforms.integer(len(DEALS))
+        session.node_id = 0
+        session.user_player = session.num_hands % 2
+        card = CARDS[session.card_id(session.user_player)]
+        messages = [f'Starting game {session.num_hands + 1} as player '
+                    f'{session.user_player}, your card is {card}.']
+        return messages + self._advance(session)
+
+    def handle(self, session: KuhnSession, line: str) -> List[str]:
+        """Plays action of the client given as a line of the protocol"""
+        action = line.strip()
+        if action not in ACTION_TO_VALUE:
+            return [f'Invalid action. Was "{action}" but only one of '
+                    f'{list(VALUE_TO_ACTION.values())} is possible. Choose again.']
+
+        node = GAME_TREE[session.node_id]
+        session.node_id = node.children[ACTION_TO_VALUE[action]]
+        return self._advance(session)
+
+    def _advance(self, session: KuhnSession) -> List[str]:
+        # Plays bot moves until the client acts next, finishes terminated hands
+        node = GAME_TREE[session.node_id]
+        while not node.is_terminal and node.player != session.user_player:
+            action = session.policy.act(node.node_id, session.card_id(node.player))
+            node = GAME_TREE[node.children[action]]
+
+        session.node_id = node.node_id
+        if not node.is_terminal:
+            info_set_key = node.infoset_keys[session.card_id(node.player)]
+            return [f'Current state: {info_set_key}. '
+                    f'Choose your next action (p - pass, b - bet).']
+
+        reward_modifier = 1 if session.user_player == 0 else -1
+        reward = reward_modifier * int(node.utilities[session.deal])
+        session.num_hands += 1
+        session.total_reward += reward
+        bot_card = CARDS[session.card_id(1 - session.user_player)]
+        messages = [f'Game over after "{node.history}", bot card was {bot_card}.',
+                    f'Reward from game {session.num_hands}: {reward}',
+                    f'Total reward so far: {session.total_reward} '
+                    f'(average: {session.total_reward / session.num_hands})']
+        return messages + self.start_hand(session)
+
+    def refresh_snapshot(self) -> bool:
+        """Switches to a newer snapshot if any, returns whether it switched"""
+        if self._snapshots is None or not self._snapshots.refresh():
+            return False
+
+        self._policy = self._snapshots.policy
+        logger.info(f'Switched to strategy snapshot {self._snapshots.generation}.')
+        return True
+
+    async def watch_snapshots(self):
+        """Checks for newer snapshots every `SNAPSHOT_POLL_INTERVAL` seconds"""
+        while True:
+            await asyncio.sleep(SNAPSHOT_POLL_INTERVAL)
+            self.refresh_snapshot()
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Plays a session over a pair of streams until the client leaves"""
+        session = KuhnSession()
+        self._num_sessions += 1
+        logger.debug(f'Session started, {self._num_sessions} sessions active.')
+        try:
+            await _send(writer, self.start_hand(session))
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), SESSION_TIMEOUT)
+                    line = line.decode()
+                except UnicodeDecodeError:
+                    await _send(writer, ['Invalid input, lines have to be UTF-8 text. Choose again.'])
+                    continue
+                except ValueError:
+                    # Line longer than the stream limit, its remainder can not be told apart
+                    await _send(writer, ['Line too long, closing the session.'])
+                    break
+
+                if not line or line.strip() == QUIT_COMMAND:
+                    break
+
+                await _send(writer, self.handle(session, line))
+
+            await _send(writer, [f'Thanks for playing! Total reward: {session.total_reward} '
+                                 f'in {session.num_hands} games.'])
+        except (asyncio.TimeoutError, ConnectionError):
+            logger.debug('Session closed by a timeout or a lost connection.')
+        finally:
+            self._num_sessions -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve_tcp(self, host: str, port: int):
+        """Accepts sessions over TCP until cancelled"""
+        server = await asyncio.start_server(self.serve_client, host, port,
+                                            backlog=CONNECTION_BACKLOG)
+        addresses = ', '.join(str(s.getsockname()) for s in server.sockets)
+        logger.info(f'Serving Kuhn Poker on {addresses}.')
+        async with server:
+            await self._with_snapshots(server.serve_forever())
+
+    async def serve_stdio(self):
+        """Plays a single session over standard input and output, e.g. pipes"""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        # Stream protocol (with an unused reader) lets the writer wait until it is closed
+        transport, protocol = await loop.connect_write_pipe(
+            lambda: asyncio.StreamReaderProtocol(asyncio.StreamReader()), sys.stdout)
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        await self._with_snapshots(self.serve_client(reader, writer))
+
+    async def _with_snapshots(self, serving: Coroutine):
+        # Watches snapshots in the background while `serving` runs
+        if self._snapshots is None:
+            return await serving
+
+        watcher = asyncio.create_task(self.watch_snapshots())
+        try:
+            return await serving
+        finally:
+            watcher.cancel()
+
+    @property
+    def num_sessions(self) -> int:
+        """Number of sessions currently served"""
+        return self._num_sessions
+
+
+async def _send(writer: asyncio.StreamWriter, messages: List[str]):
+    writer.write(''.join(f'{m}\n' for m in messages).encode())
+    await writer.drain()
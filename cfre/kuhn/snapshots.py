@@ -0,0 +1,222 @@
+import logging
+import multiprocessing
+import os
+from typing import Callable, Optional, Tuple
+
+import click
+import numpy as np
+
+from cfre.kuhn.information_set import InformationSetTable, load_infosets, load_infosets_params
+from cfre.kuhn.information_set import load_saved_rounds, save_infosets
+from cfre.kuhn.config import PUBLISH_INTERVAL
+from cfre.kuhn.kuhn_rules import CARDS
+from cfre.kuhn.kuhn_trainer import TRAINING_MODES, create_round_function
+from cfre.kuhn.policy import KuhnPolicy
+
+logger = logging.getLogger(__name__)
+
+
+def publish_snapshot(infosets: InformationSetTable,
+                     path: str,
+                     generation: int,
+                     rounds: int):
+    """Publishes infosets as strategy snapshot number `generation`
+
+    Snapshots are regular infosets checkpoints with the generation stored in
+        their parameters. Checkpoints are replaced atomically, so readers
+        always see a complete snapshot and memory maps of older snapshots
+        stay valid after a newer one is published.
+    """
+    save_infosets(infosets, path, game='kuhn', cards=CARDS,
+                  rounds=rounds, generation=generation)
+
+
+def snapshot_generation(path: str) -> int:
+    """Generation of the snapshot at `path`, 0 for checkpoints without one"""
+    try:
+        return load_infosets_params(path).get('generation', 0)
+    except ValueError:
+        # Infosets pickled by older versions do not store any parameters
+        return 0
+
+
+def default_snapshot_path(loadpath: str) -> str:
+    """Snapshots of infosets at `loadpath` are published next to them by default"""
+    root, extension = os.path.splitext(loadpath)
+    return f'{root}.snapshot{extension}'
+
+
+def snapshot_options(command: Callable) -> Callable:
+    """Adds CLI options of training while playing to a click command"""
+    command = click.option('--snapshot-path', type=click.Path(dir_okay=False),
+                           help='File snapshots are published to by --train and '
+                                'read from by --watch, defaults to the loaded file '
+                                'with a .snapshot suffix. The loaded file itself '
+                                'is never overwritten.')(command)
+    command = click.option('--publish-interval', type=click.IntRange(min=1),
+                           default=PUBLISH_INTERVAL,
+                           help='Rounds trained with --train between published '
+                                'snapshots.')(command)
+    command = click.option('--train-mode', type=click.Choice(TRAINING_MODES), default='chance',
+                           help='Training mode of --train, as in train_kuhn.')(command)
+    command = click.option('--train', is_flag=True,
+                           help='Keep training the loaded infosets in a background '
+                                'process, publishing snapshots to --snapshot-path, '
+                                'and play the newest one (implies --watch).')(command)
+    command = click.option('--watch', is_flag=True,
+                           help='Play the newest strategy snapshot published to '
+                                '--snapshot-path, checked between hands.')(command)
+    return command
+
+
+class SnapshotWatcher:
+    """Frozen policy of the newest strategy snapshot published to a file
+
+    `refresh` checks whether the file was replaced since the last check and
+        if it holds a newer generation, memory-maps it and builds a new
+        `KuhnPolicy`. The policy is swapped by rebinding a single reference,
+        so code holding the previous policy (e.g. a hand in progress) keeps
+        playing it undisturbed. `policy` is None until a snapshot is published.
+
+    With `trainer` every refresh also checks that the process publishing the
+        snapshots is still running.
+    """
+
+    def __init__(self,
+                 path: str,
+                 rng: Optional[np.random.Generator] = None,
+                 trainer: Optional['BackgroundTrainer'] = None):
+        self._path = path
+        self._rng = np.random.default_rng() if rng is None else rng
+        self._trainer = trainer
+        self._file_id = None
+        self._generation = -1
+        self._policy = None
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """Picks up a newer snapshot, returns whether the policy changed"""
+        if self._trainer is not None:
+            self._trainer.poll()
+
+        try:
+            file_id = self._read_file_id()
+        except FileNotFoundError:
+            return False
+
+        if file_id == self._file_id:
+            return False
+
+        generation = snapshot_generation(self._path)
+        if generation <= self._generation:
+            self._file_id = file_id
+            return False
+
+        policy = KuhnPolicy.from_infosets(load_infosets(self._path, mmap=True), self._rng)
+        if self._read_file_id() != file_id:
+            # Header and arrays may come from different snapshots, retry next time
+            return False
+
+        self._file_id = file_id
+        self._policy = policy
+        self._generation = generation
+        logger.debug(f'Loaded strategy snapshot {generation} from {self._path}.')
+        return True
+
+    def _read_file_id(self) -> Tuple[int, int, int]:
+        # Every published snapshot is a new file replacing the previous one
+        stat = os.stat(self._path)
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    @property
+    def policy(self) -> KuhnPolicy:
+        return self._policy
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+
+class BackgroundTrainer:
+    """Trains infosets in a separate process, publishing snapshots as it goes
+
+    Training continues from the infosets at `loadpath`, which are published
+        to `snapshot_path` right away and then as a new generation every
+        `publish_interval` rounds until closed. `loadpath` is only read.
+        Use as a context manager so that the process is stopped.
+    """
+
+    def __init__(self,
+                 loadpath: str,
+                 snapshot_path: str,
+                 publish_interval: int,
+                 mode: str = 'chance',
+                 seed: Optional[np.random.SeedSequence] = None):
+        if os.path.abspath(loadpath) == os.path.abspath(snapshot_path):
+            raise ValueError(f'Snapshots can not be published to the loaded file {loadpath}')
+
+        # Readers of the snapshot path get a snapshot before the first one is trained
+        publish_snapshot(load_infosets(loadpath), snapshot_path,
+                         snapshot_generation(loadpath), load_saved_rounds(loadpath))
+        self._stop = multiprocessing.Event()
+        self._process = multiprocessing.Process(
+            target=_train_and_publish,
+            args=(loadpath, snapshot_path, publish_interval, mode, seed, self._stop),
+            daemon=True)
+        self._process.start()
+        self._exit_logged = False
+
+    def poll(self) -> bool:
+        """Returns whether training still runs, logs its exit code once it stopped"""
+        if self._process.exitcode is None:
+            return True
+
+        self._log_exit()
+        return False
+
+    def close(self):
+        self._stop.set()
+        self._process.join()
+        self._log_exit()
+
+    def _log_exit(self):
+        if self._exit_logged:
+            return
+
+        self._exit_logged = True
+        exitcode = self._process.exitcode
+        if exitcode != 0:
+            logger.error(f'Background training exited with code {exitcode}, '
+                         f'no newer snapshots will be published.')
+        else:
+            logger.info('Background training stopped.')
+
+    def __enter__(self) -> 'BackgroundTrainer':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _train_and_publish(loadpath: str,
+                       snapshot_path: str,
+                       publish_interval: int,
+                       mode: str,
+                       seed: Optional[np.random.SeedSequence],
+                       stop: multiprocessing.Event):
+    infosets = load_infosets(loadpath)
+    generation = snapshot_generation(loadpath)
+    rounds = load_saved_rounds(loadpath)
+
+    play_round = create_round_function(mode, infosets, np.random.default_rng(seed))
+    try:
+        while not stop.is_set():
+            for _ in range(publish_interval):
+                play_round()
+
+            rounds += publish_interval
+            generation += 1
+            publish_snapshot(infosets, snapshot_path, generation, rounds)
+    except KeyboardInterrupt:
+        # Ctrl+C reaches the whole process group, the parent stops training itself
+        pass
@@ -0,0 +1,54 @@
+import math
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class UpdateRule:
+    """Discounting applied to accumulators at the end of every CFR iteration
+
+    Follows Discounted CFR: after iteration `t` positive total regrets are
+        multiplied by `t^alpha / (t^alpha + 1)`, negative ones by
+        `t^beta / (t^beta + 1)` and contributions to the average strategy by
+        `(t / (t + 1))^gamma`. Infinite `alpha`/`beta` keep regrets as they are,
+        `beta = -inf` floors negative regrets at zero as in CFR+.
+    """
+    alpha: float = math.inf
+    beta: float = math.inf
+    gamma: float = 0
+
+    def positive_regret_discount(self, iteration: int) -> float:
+        return _regret_discount(iteration, self.alpha)
+
+    def negative_regret_discount(self, iteration: int) -> float:
+        return _regret_discount(iteration, self.beta)
+
+    def strategy_discount(self, iteration: int) -> float:
+        return (iteration / (iteration + 1)) ** self.gamma
+
+    @property
+    def floors_regrets(self) -> bool:
+        return self.beta == -math.inf
+
+    @property
+    def is_vanilla(self) -> bool:
+        return self == UpdateRule()
+
+
+ALGORITHMS = {
+    'vanilla': UpdateRule(),
+    # Regret matching+ with linearly weighted average strategy
+    'cfr+': UpdateRule(beta=-math.inf, gamma=1),
+    'linear': UpdateRule(alpha=1, beta=1, gamma=1),
+    'dcfr': UpdateRule(alpha=1.5, beta=0, gamma=2),
+}
+
+
+def _regret_discount(iteration: int, exponent: float) -> float:
+    if exponent == math.inf:
+        return 1
+
+    if exponent == -math.inf:
+        return 0
+
+    weight = iteration ** exponent
+    return weight / (weight + 1)
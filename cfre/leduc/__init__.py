@@ -0,0 +1,130 @@
+import logging
+
+import click
+import numpy as np
+
+from cfre.kuhn.information_set import InformationSetTable, infosets_to_pretty_str
+from cfre.kuhn.information_set import load_infosets, load_saved_rounds, save_infosets
+from cfre.kuhn.information_set import saved_game_callback
+from cfre.kuhn.update_rules import ALGORITHMS
+from cfre.leduc.benchmark import run_benchmark
+from cfre.leduc.config import LOGGING_FREQUENCY, NUM_ROUNDS
+from cfre.leduc.leduc_game import LeducGame
+from cfre.leduc.leduc_rules import NUM_ACTIONS, RANKS
+from cfre.leduc.leduc_trainer import LeducTrainer, infosets_exploitability, leduc_strategies
+from cfre.utils.profiling import PROFILER
+from cfre.utils.scheduler import TrainingScheduler, scheduler_options
+from cfre.utils.seeding import seed_option
+
+logger = logging.getLogger(__name__)
+
+
+# Rejects infosets paths of other games
+_check_game = saved_game_callback('leduc', 'Leduc Hold\'em')
+
+
+@click.command(name='train_leduc')
+@click.option('--savepath', '-s', type=click.Path(dir_okay=False, writable=True))
+@click.option('--loadpath', '-l', type=click.Path(dir_okay=False, readable=True, exists=True),
+              callback=_check_game)
+@click.option('--target-exploitability', '-e', type=click.FloatRange(min=0),
+              help='Stop once exploitability (mbb per hand) of the average '
+                   'strategy, checked at every logging round, is at most this.')
+@click.option('--algorithm', '-a', type=click.Choice(list(ALGORITHMS)),
+              help='Regret and average strategy update rule, defaults to the one '
+                   'stored in loaded infosets or vanilla CFR.')
+@scheduler_options
+def run_leduc_trainer(savepath: str,
+                      loadpath: str,
+                      target_exploitability: float,
+                      algorithm: str,
+                      tolerance: float,
+                      max_time: float):
+    start_round = 0
+    if loadpath is not None:
+        logger.info(f'Creating trainer using preexisting infosets from {loadpath}.')
+        infosets = load_infosets(loadpath)
+        start_round = load_saved_rounds(loadpath)
+        if algorithm is not None and algorithm != infosets.algorithm:
+            logger.info(f'Switching from {infosets.algorithm} to {algorithm} updates.')
+            infosets.set_algorithm(algorithm)
+    else:
+        logger.info(f'Creating trainer from scratch.')
+        infosets = InformationSetTable(NUM_ACTIONS, algorithm=algorithm or 'vanilla')
+
+    logger.info(f'Running {NUM_ROUNDS} iterations of the '
+                f'{infosets.algorithm} CFR for Leduc Hold\'em.')
+    scheduler = TrainingScheduler(NUM_ROUNDS, LOGGING_FREQUENCY,
+                                  time_budget=max_time,
+                                  strategy_tolerance=tolerance,
+                                  target_metric=target_exploitability,
+                                  metric_name='exploitability')
+    trainer = LeducTrainer(infosets)
+
+    total_reward = 0
+    rounds_played = start_round
+    PROFILER.start_interval(start_round)
+    for i in scheduler.rounds(start_round):
+        total_reward += trainer.play_round()
+        rounds_played = i + 1
+        if scheduler.is_check_round(i):
+            with PROFILER.timer('exploitability'):
+                exploitability = infosets_exploitability(infosets)
+
+            logger.info(f'Round {i}:')
+            logger.debug(f'Information sets: {infosets_to_pretty_str(infosets)}')
+            logger.info(f'Average reward: {total_reward / (i - start_round + 1)}')
+            logger.info(f'Exploitability: {exploitability:.3f} mbb/hand')
+            if savepath is not None:
+                logger.info(f'Saving infosets to {savepath}.')
+                save_infosets(infosets, savepath, game='leduc', ranks=RANKS, rounds=i + 1)
+            PROFILER.report(i + 1)
+            logger.info('****************\n')
+            scheduler.check(i, strategy=infosets.avg_strategies, metric=exploitability)
+
+    if savepath is not None:
+        # Rounds played since the last check round would be lost otherwise
+        logger.info(f'Saving infosets after {rounds_played} rounds to {savepath}.')
+        save_infosets(infosets, savepath, game='leduc', ranks=RANKS, rounds=rounds_played)
+
+
+@click.command(name='play_leduc')
+@click.option('--loadpath', '-l', type=click.Path(dir_okay=False, readable=True, exists=True),
+              callback=_check_game, required=True)
+@seed_option
+def run_leduc_game(loadpath: str, seed: int):
+    print(f'Loading pre-existing strategies from: {loadpath}')
+    game = LeducGame(leduc_strategies(load_infosets(loadpath, mmap=True)),
+                     np.random.default_rng(seed))
+
+    cont = 'y'
+    num_games = 0
+    total_reward = 0
+    while cont != 'n':
+        print(f'\nStarting game {num_games+1}')
+        reward = game.start_game(num_games % 2)
+        total_reward += reward
+        num_games += 1
+
+        print(f'Reward from game {num_games}: {reward}')
+        print(f'Total reward so far: {total_reward} '
+              f'(average: {total_reward / num_games})')
+        cont = input('Do you want to continue? (n for no) ')
+
+    print('\nThanks for playing!')
+
+
+@click.command(name='bench_leduc')
+@click.option('--iterations', '-n', type=click.IntRange(min=1), default=2000)
+@click.option('--check-frequency', '-c', type=click.IntRange(min=1), default=200,
+              help='Iterations between measurements of speed and exploitability.')
+@click.option('--algorithm', '-a', type=click.Choice(list(ALGORITHMS)), default='vanilla')
+def run_leduc_benchmark(iterations: int, check_frequency: int, algorithm: str):
+    logger.info(f'Benchmarking {iterations} iterations of the {algorithm} CFR for Leduc Hold\'em.')
+    samples = run_benchmark(LeducTrainer(algorithm=algorithm), iterations, check_frequency)
+    for sample in samples:
+        logger.info(f'Iteration {sample.iteration}: {sample.elapsed:.2f}s, '
+                    f'{sample.iterations_per_second:.1f} iterations/s, '
+                    f'exploitability {sample.exploitability:.3f} mbb/hand')
+
+    logger.info(f'Overall: {samples[-1].iteration / samples[-1].elapsed:.1f} iterations/s')
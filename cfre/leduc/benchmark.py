@@ -0,0 +1,40 @@
+import time
+from dataclasses import dataclass
+from typing import List
+
+from cfre.leduc.leduc_trainer import LeducTrainer, infosets_exploitability
+
+
+@dataclass(frozen=True)
+class BenchmarkSample:
+    iteration: int
+    # Training time so far in seconds, without exploitability computations
+    elapsed: float
+    iterations_per_second: float
+    # Exploitability of the average strategy in mbb per hand
+    exploitability: float
+
+
+def run_benchmark(trainer: LeducTrainer,
+                  num_iterations: int,
+                  check_frequency: int) -> List[BenchmarkSample]:
+    """Trains for `num_iterations`, measuring speed and exploitability
+
+    Every `check_frequency` iterations records the throughput of training
+        since the previous sample and exploitability of the average strategy.
+    """
+    samples = []
+    elapsed = 0
+    for start in range(0, num_iterations, check_frequency):
+        iterations = min(check_frequency, num_iterations - start)
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            trainer.play_round()
+
+        duration = time.perf_counter() - start_time
+        elapsed += duration
+        exploitability = infosets_exploitability(trainer.information_sets)
+        samples.append(BenchmarkSample(start + iterations, elapsed,
+                                       iterations / duration, exploitability))
+
+    return samples
@@ -0,0 +1,2 @@
+NUM_ROUNDS = 10000
+LOGGING_FREQUENCY = 1000
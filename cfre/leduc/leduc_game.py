@@ -0,0 +1,74 @@
+from typing import Optional
+
+import numpy as np
+
+from cfre.game_tree.game import CHANCE
+from cfre.leduc.leduc_rules import ACTION_TO_VALUE, LEDUC_TREE, RANKS
+from cfre.leduc.leduc_rules import VALUE_TO_ACTION, LeducRules
+
+
+class LeducGame:
+    """Interactive Leduc Hold'em against fixed strategies
+
+    `strategies` are action probabilities of every information set,
+        ordered like `LEDUC_TREE.infoset_keys`.
+    """
+
+    def __init__(self, strategies: np.array, rng: Optional[np.random.Generator] = None):
+        expected_shape = LEDUC_TREE.legal_actions.shape
+        if strategies.shape != expected_shape:
+            raise ValueError(f'Invalid shape of strategies. Was '
+                             f'{strategies.shape} but should be {expected_shape}')
+
+        self._strategies = strategies
+        self._infoset_index = {key: i for i, key in enumerate(LEDUC_TREE.infoset_keys)}
+        self._rules = LeducRules()
+        self._rng = np.random.default_rng() if rng is None else rng
+        self._user_player = None
+
+    def start_game(self, user_player=0):
+        if user_player > 1 or user_player < 0:
+            raise ValueError(f'User player can be either '
+                             f'0 or 1 but was: {user_player}')
+
+        self._user_player = user_player
+        reward_modifier = 1 if user_player == 0 else -1
+        return reward_modifier * self._play_game()
+
+    def _play_game(self) -> float:
+        """Plays the game from the root, returns reward of player 0"""
+        rules = self._rules
+        state = rules.initial_state()
+        while not rules.is_terminal(state):
+            player = rules.current_player(state)
+            if player == CHANCE:
+                outcomes = rules.chance_outcomes(state)
+                probs = [prob for _, prob in outcomes]
+                state = outcomes[self._rng.choice(len(outcomes), p=probs)][0]
+                continue
+
+            key = rules.infoset_key(state)
+            if player == self._user_player:
+                action = self._ask_for_action(key, rules.legal_actions(state))
+            else:
+                strategy = self._strategies[self._infoset_index[key]]
+                action = self._rng.choice(len(strategy), p=strategy)
+
+            state = rules.next_state(state, action)
+
+        private, public, history = state
+        print(f'Final history: {history}, private cards: '
+              f'{RANKS[private[0]]} and {RANKS[private[1]]}'
+              + (f', public card: {RANKS[public]}' if public is not None else ''))
+        return rules.terminal_utility(state)
+
+    @staticmethod
+    def _ask_for_action(info_set_key: str, legal_actions) -> int:
+        legal_names = [VALUE_TO_ACTION[a] for a in legal_actions]
+        action = input(f'Current state: {info_set_key}. Choose your next action, one of '
+                       f'{legal_names} (f - fold, c - call or check, r - raise or bet). ')
+        while action not in legal_names:
+            action = input(f'Invalid action. Was "{action}" but only one of '
+                           f'{legal_names} is possible. Choose again. ')
+
+        return ACTION_TO_VALUE[action]
@@ -0,0 +1,148 @@
+from itertools import product
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cfre.game_tree.compiler import compile_game
+from cfre.game_tree.game import CHANCE, Game
+
+
+RANKS = ['J', 'Q', 'K']
+# Number of cards of every rank in the deck
+CARDS_PER_RANK = 2
+NUM_ACTIONS = 3
+VALUE_TO_ACTION = {0: 'f', 1: 'c', 2: 'r'}
+ACTION_TO_VALUE = {a: v for v, a in VALUE_TO_ACTION.items()}
+ANTE = 1
+# Size of a bet or raise in each betting round
+RAISE_SIZES = [2, 4]
+# Maximum number of bets and raises in a single betting round
+MAX_RAISES = 2
+# Separates betting rounds in histories, the public card is dealt in between
+ROUND_SEPARATOR = '/'
+
+# State is (private ranks of both players, public rank, betting history),
+# ranks are indices in `RANKS` and None before they are dealt
+LeducState = Tuple[Optional[Tuple[int, int]], Optional[int], str]
+
+
+class LeducRules(Game):
+    """Leduc Hold'em as a generic `Game`
+
+    Deck has two suits of `RANKS`. Both players ante, get one private card
+        and bet in two rounds with fixed raise sizes and at most `MAX_RAISES`
+        raises per round; the public card is dealt after the first round.
+        A player pairing the public card wins the showdown, otherwise the
+        higher private card does. Suits never matter, so cards are dealt as
+        ranks with probabilities accounting for cards already dealt.
+
+    Actions are fold, call (check if there is no bet) and raise (bet if
+        there is no bet). Information set keys are the private rank, the
+        public rank once dealt, a colon and the betting history, e.g. 'QK:rc/c'.
+    """
+
+    def initial_state(self) -> LeducState:
+        return None, None, ''
+
+    def current_player(self, state: LeducState) -> int:
+        private, public, history = state
+        if private is None or (public is None and _round_finished(history)):
+            return CHANCE
+
+        return len(_current_round(history)) % 2
+
+    def is_terminal(self, state: LeducState) -> bool:
+        private, public, history = state
+        if history.endswith('f'):
+            return True
+
+        return public is not None and _round_finished(history)
+
+    def terminal_utility(self, state: LeducState) -> float:
+        private, public, history = state
+        contributions = _contributions(history)
+        if history.endswith('f'):
+            folder = (len(_current_round(history)) - 1) % 2
+            return float(-contributions[0] if folder == 0 else contributions[1])
+
+        return float(contributions[1] * _showdown(private, public))
+
+    def legal_actions(self, state: LeducState) -> Sequence[int]:
+        actions = _current_round(state[2])
+        facing_bet = actions.endswith('r')
+        legal_actions = [ACTION_TO_VALUE['f']] if facing_bet else []
+        legal_actions.append(ACTION_TO_VALUE['c'])
+        if actions.count('r') < MAX_RAISES:
+            legal_actions.append(ACTION_TO_VALUE['r'])
+
+        return legal_actions
+
+    def chance_outcomes(self, state: LeducState) -> List[Tuple[LeducState, float]]:
+        private, public, history = state
+        num_cards = len(RANKS) * CARDS_PER_RANK
+        if private is None:
+            outcomes = []
+            for ranks in product(range(len(RANKS)), repeat=2):
+                second_count = CARDS_PER_RANK - (ranks[0] == ranks[1])
+                prob = CARDS_PER_RANK / num_cards * second_count / (num_cards - 1)
+                outcomes.append(((ranks, None, history), prob))
+
+            return outcomes
+
+        outcomes = []
+        for rank in range(len(RANKS)):
+            count = CARDS_PER_RANK - private.count(rank)
+            if count > 0:
+                prob = count / (num_cards - 2)
+                outcomes.append(((private, rank, history + ROUND_SEPARATOR), prob))
+
+        return outcomes
+
+    def next_state(self, state: LeducState, action: int) -> LeducState:
+        private, public, history = state
+        return private, public, history + VALUE_TO_ACTION[action]
+
+    def infoset_key(self, state: LeducState) -> str:
+        private, public, history = state
+        public_rank = RANKS[public] if public is not None else ''
+        return f'{RANKS[private[self.current_player(state)]]}{public_rank}:{history}'
+
+    @property
+    def num_actions(self) -> int:
+        return NUM_ACTIONS
+
+
+def _current_round(history: str) -> str:
+    return history.split(ROUND_SEPARATOR)[-1]
+
+
+def _round_finished(history: str) -> bool:
+    actions = _current_round(history)
+    # Opening check does not finish the round, any other call does
+    return actions.endswith('f') or (len(actions) >= 2 and actions.endswith('c'))
+
+
+def _contributions(history: str) -> np.array:
+    """Returns chips put into the pot by both players"""
+    contributions = np.full(2, ANTE)
+    for raise_size, actions in zip(RAISE_SIZES, history.split(ROUND_SEPARATOR)):
+        for i, action in enumerate(actions):
+            player = i % 2
+            if action == 'c':
+                contributions[player] = contributions.max()
+            elif action == 'r':
+                contributions[player] = contributions.max() + raise_size
+
+    return contributions
+
+
+def _showdown(private: Tuple[int, int], public: int) -> int:
+    """Returns 1 if player 0 wins the showdown, -1 if player 1 does, 0 for a tie"""
+    pairs = [rank == public for rank in private]
+    if pairs[0] != pairs[1]:
+        return 1 if pairs[0] else -1
+
+    return int(np.sign(private[0] - private[1]))
+
+
+LEDUC_TREE = compile_game(LeducRules())
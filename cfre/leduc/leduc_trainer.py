@@ -0,0 +1,41 @@
+import numpy as np
+
+from cfre.game_tree import FlatCFRSolver, average_strategies, exploitability
+from cfre.kuhn.exploitability import MBB_PER_CHIP
+from cfre.kuhn.information_set import InformationSetTable
+from cfre.leduc.leduc_rules import LEDUC_TREE, NUM_ACTIONS
+
+
+class LeducTrainer:
+    """Full-width CFR for Leduc Hold'em over the precompiled `LEDUC_TREE`
+
+    Every round traverses all deals and public cards at once.
+    """
+
+    def __init__(self, infosets: InformationSetTable = None, algorithm: str = 'vanilla'):
+        self._infosets = infosets
+        if self._infosets is None:
+            self._infosets = InformationSetTable(NUM_ACTIONS, algorithm=algorithm)
+
+        self._solver = FlatCFRSolver(LEDUC_TREE, self._infosets)
+
+    def play_round(self) -> float:
+        """Runs one CFR iteration, returns expected reward of player 0"""
+        return self._solver.iterate()
+
+    @property
+    def information_sets(self) -> InformationSetTable:
+        return self._infosets
+
+
+def leduc_strategies(infosets: InformationSetTable) -> np.array:
+    """Average strategies of all infosets, ordered like `LEDUC_TREE.infoset_keys`"""
+    return average_strategies(LEDUC_TREE, infosets)
+
+
+def infosets_exploitability(infosets: InformationSetTable) -> float:
+    """Exploitability of the average strategy of the infosets in mbb per hand
+
+    Both players ante one chip, which is treated as the big blind.
+    """
+    return MBB_PER_CHIP * exploitability(LEDUC_TREE, leduc_strategies(infosets))
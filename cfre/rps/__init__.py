@@ -1,10 +1,18 @@
 import logging
 
 import click
+import numpy as np
+from click.core import ParameterSource
 
 from cfre.utils.dynamic_plots import DynamicPlot, SubplotConfig
+from cfre.utils.metrics import create_sink, metrics_options
+from cfre.utils.profiling import PROFILER
+from cfre.utils.sampling import AliasTable
+from cfre.utils.scheduler import TrainingScheduler, scheduler_options
+from cfre.utils.seeding import seed_option
+from cfre.utils.scheduler import load_checkpoint, save_checkpoint
 from cfre.rps.config import NUM_ROUNDS, PLOT_REFRESH_RATE, OPPONENT_STRATEGY
-from cfre.rps.rps_bot import RPSBot, sample_action
+from cfre.rps.rps_bot import create_rps_engine
 
 
 logger = logging.getLogger(__name__)
@@ -12,28 +20,100 @@ ACTIONS_MAP = {0: 'R', 1: 'P', 2: 'S'}
 
 
 @click.command(name='rps')
-def run_rps_bot():
-    logger.info(f'Running {NUM_ROUNDS} iterations of the Rock-Paper-Scissors.')
-    # Start with chossing always rock as a initial strategy
-    bot = RPSBot(initial_strategy=[1, 0, 0])
-    plot = _create_dynamic_plot()
-    for i in range(NUM_ROUNDS):
-        action1 = bot.act()
-        if OPPONENT_STRATEGY is None:
-            action2 = bot.act(perform_update=False)
-        else:
-            action2 = sample_action(OPPONENT_STRATEGY)
-
-        bot.update_regret(action2)
-        if i % PLOT_REFRESH_RATE == 0:
-            plot.update([i] * 3, bot.avg_strategy)
+@click.option('--savepath', '-s', type=click.Path(dir_okay=False, writable=True))
+@click.option('--loadpath', '-l', type=click.Path(dir_okay=False, readable=True, exists=True))
+@click.option('--runs', '-k', type=click.IntRange(min=1), default=1,
+              help='Number of independent runs trained at once.')
+@click.option('--expected', is_flag=True,
+              help='Update regrets deterministically against the full mixed '
+                   'strategy of the opponent instead of a sampled action.')
+@click.option('--gap-tolerance', type=click.FloatRange(min=0),
+              help='Stop once the duality gap of the average strategy is at most this.')
+@scheduler_options
+@metrics_options
+@seed_option
+def run_rps_bot(savepath: str,
+                loadpath: str,
+                runs: int,
+                expected: bool,
+                gap_tolerance: float,
+                tolerance: float,
+                max_time: float,
+                metrics_path: str,
+                headless: bool,
+                seed: int):
+    engine_seed, opponent_seed = np.random.SeedSequence(seed).spawn(2)
+    start_round = 0
+    if loadpath is not None:
+        # Generator of the engine is restored from the checkpoint
+        start_round, engine = load_checkpoint(loadpath)
+        logger.info(f'Resuming training from round {start_round} saved in {loadpath}.')
+        runs_source = click.get_current_context().get_parameter_source('runs')
+        if runs_source is not ParameterSource.DEFAULT and runs != engine.num_runs:
+            raise click.UsageError(f'--runs {runs} conflicts with {engine.num_runs} runs '
+                                   f'of the loaded engine.')
+
+        if seed is not None:
+            logger.warning('--seed only seeds the opponent, generator of the engine '
+                           'is restored from the checkpoint.')
+    else:
+        # Start with chossing always rock as a initial strategy
+        engine = create_rps_engine(runs, default_strategy=[1, 0, 0],
+                                   rng=np.random.default_rng(engine_seed))
+
+    logger.info(f'Running {NUM_ROUNDS} iterations of {engine.num_runs} '
+                f'Rock-Paper-Scissors runs.')
+    rng = np.random.default_rng(opponent_seed)
+    opponent_strategies = None
+    opponent_table = None
+    if OPPONENT_STRATEGY is not None:
+        opponent_strategies = np.broadcast_to(OPPONENT_STRATEGY, (engine.num_runs, 3))
+        # Fixed opponent is sampled every round, so its alias table is built once
+        opponent_table = AliasTable(opponent_strategies)
+
+    plot = _create_dynamic_plot(live=not headless)
+    sink = create_sink(plot.names, metrics_path, [plot])
+    scheduler = TrainingScheduler(NUM_ROUNDS, PLOT_REFRESH_RATE,
+                                  time_budget=max_time, strategy_tolerance=tolerance,
+                                  target_metric=gap_tolerance, metric_name='duality gap')
+    PROFILER.start_interval(start_round)
+    rounds_played = start_round
+    with sink:
+        for i in scheduler.rounds(start_round):
+            if expected:
+                engine.expected_update(opponent_strategies)
+            else:
+                engine.act()
+                if opponent_strategies is None:
+                    opponent_actions = engine.act(perform_update=False)
+                else:
+                    opponent_actions = opponent_table.sample(rng)
+
+                engine.update_regret(opponent_actions)
+
+            rounds_played = i + 1
+            if scheduler.is_check_round(i):
+                sink.record(i, engine.avg_strategy.mean(axis=0))
+                gap = engine.duality_gap(opponent_strategies).max()
+                scheduler.check(i, strategy=engine.avg_strategy, metric=gap)
+                if savepath is not None:
+                    save_checkpoint(savepath, i + 1, engine)
+
+                PROFILER.report(i + 1)
+
+    if savepath is not None:
+        # Rounds played since the last check round would be lost otherwise
+        save_checkpoint(savepath, rounds_played, engine)
 
     plot.save('rps.png')
-    logger.info(f'Final strategy: {bot.avg_strategy}')
+    logger.info(f'Final strategy: {engine.avg_strategy.mean(axis=0)}')
+    logger.info(f'Duality gap: {engine.duality_gap(opponent_strategies).max():.5f}')
+    if engine.num_runs > 1:
+        logger.info(f'Standard deviation across runs: {engine.avg_strategy.std(axis=0)}')
 
 
-def _create_dynamic_plot() -> DynamicPlot:
+def _create_dynamic_plot(live: bool) -> DynamicPlot:
     rock_config = SubplotConfig('Probability of choosing rock', y_range=(0, 1))
     paper_config = SubplotConfig('Probability of choosing paper', y_range=(0, 1))
     scissors_config = SubplotConfig('Probability of choosing scissors', y_range=(0, 1))
-    return DynamicPlot([rock_config, paper_config, scissors_config])
\ No newline at end of file
+    return DynamicPlot([rock_config, paper_config, scissors_config], live=live)
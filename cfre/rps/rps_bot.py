@@ -1,71 +1,50 @@
-from random import random
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 
+from cfre.utils.regret_matching import MatrixPayoffs, RegretMatching
 
-class RPSBot:
-
-    def __init__(self, initial_strategy: List[float] = None):
-        self._initial_strategy = initial_strategy
-        if initial_strategy is None:
-            # Default to uniformly mixed strategy
-            self._initial_strategy = [1/3, 1/3, 1/3]
-
-        self._avg_strategy = [0, 0, 0]
-        self._avg_reward = 0
 
-        self._total_regret = [0, 0, 0]
-        self._steps_num = 0
-        self._prev_action = None
+def create_rps_engine(num_runs: int = 1,
+                      default_strategy: List[float] = None,
+                      rng: Optional[np.random.Generator] = None) -> RegretMatching:
+    """Regret matching+ for Rock-Paper-Scissors with linearly weighted average
 
-    def update_regret(self, opponent_action: int):
-        reward = calculate_outcome(self._prev_action, opponent_action)
-        self._avg_reward += (reward - self._avg_reward) / self._steps_num
-
-        for i in range(len(self._total_regret)):
-            regret = calculate_outcome(i, opponent_action) - reward
-            self._total_regret[i] += regret
-            self._total_regret = np.maximum(self._total_regret, 0)
+    If all regrets of a run are non-positive it plays `default_strategy`,
+        which defaults to always choosing rock.
+    """
+    if default_strategy is None:
+        default_strategy = [1, 0, 0]
 
-    def act(self, perform_update: bool = True) -> int:
-        strategy = self._calculate_strategy()
-        action = sample_action(strategy)
+    return RegretMatching(RPS_PAYOFFS, num_runs, np.array(default_strategy),
+                          floor_regrets=True, linear_averaging=True, rng=rng)
 
-        if perform_update:
-            self._steps_num += 1
-            self._update_average_strategy(strategy)
-            self._prev_action = action
 
-        return action
+class RPSBot:
+    """Single run of `create_rps_engine`"""
 
-    def _calculate_strategy(self) -> List[float]:
-        strategy = [max(r, 0) for r in self._total_regret]
-        strategy_norm = sum(strategy)
-        if strategy_norm > 0:
-            return [s / strategy_norm for s in strategy]
+    def __init__(self,
+                 initial_strategy: List[float] = None,
+                 rng: Optional[np.random.Generator] = None):
+        self._engine = create_rps_engine(default_strategy=initial_strategy, rng=rng)
 
-        # If all regrets are non-positive, choose rock
-        strategy = [1, 0, 0]
-        strategy_norm = sum(strategy)
-        return [s / strategy_norm for s in strategy]
+    def update_regret(self, opponent_action: int):
+        self._engine.update_regret(np.array([opponent_action]))
 
-    def _update_average_strategy(self, strategy: List[float]):
-        # Average is weighted by t where t is the time at which the strategy was sampled
-        self._avg_strategy = [avg + 2 * (s - avg) / (self._steps_num + 1)
-                              for avg, s in zip(self._avg_strategy, strategy)]
+    def act(self, perform_update: bool = True) -> int:
+        return int(self._engine.act(perform_update)[0])
 
     @property
     def avg_strategy(self) -> List[float]:
-        return self._avg_strategy
+        return self._engine.avg_strategy[0].tolist()
 
     @property
     def avg_reward(self) -> float:
-        return self._avg_reward
+        return float(self._engine.avg_reward[0])
 
 
-def sample_action(strategy: List[float]) -> int:
-    rand = random()
+def sample_action(strategy: List[float], rng: np.random.Generator) -> int:
+    rand = rng.random()
     probs_sum = 0
     action = -1
     for prob in strategy:
@@ -85,3 +64,6 @@ def calculate_outcome(act1: int, act2: int) -> int:
         return -1
 
     return 1
+
+
+RPS_PAYOFFS = MatrixPayoffs([[calculate_outcome(a1, a2) for a2 in range(3)] for a1 in range(3)])
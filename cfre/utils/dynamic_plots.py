@@ -1,59 +1,135 @@
-import itertools
 import math
+import time
 from dataclasses import dataclass
 from typing import Tuple, Optional, Sequence
 
+import click
 import numpy as np
 from matplotlib import pyplot as plt
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+
+from cfre.utils.metrics import DEFAULT_CAPACITY, BufferSink, load_metrics
+
+
+# Minimum number of seconds between redraws of a live plot
+REDRAW_INTERVAL = 1.0
 
 
 @dataclass
 class SubplotConfig:
+    """Subplot showing one line, or one line per label if `labels` are given
+
+    With `max_lines` only lines with the highest latest values are drawn.
+    """
     title: str
     x_range: Optional[Tuple[float, float]] = None
     y_range: Optional[Tuple[float, float]] = None
+    labels: Optional[Sequence[str]] = None
+    max_lines: Optional[int] = None
+
+    @property
+    def num_lines(self) -> int:
+        return 1 if self.labels is None else len(self.labels)
+
+
+class DynamicPlot(BufferSink):
+    """Plot of metrics recorded during training
+
+    Recorded values are split between subplots in order of `subplot_configs`.
+        Samples are kept in a preallocated ring buffer and only rendered on
+        `draw` or `save`. Live plots (shown in a window) also redraw on
+        `record`, but at most once every `redraw_interval` seconds. Plots
+        which are not live never touch the display, so they work on
+        headless machines.
+    """
+
+    def __init__(self,
+                 subplot_configs: Sequence[SubplotConfig],
+                 cols: int = 1,
+                 live: bool = True,
+                 capacity: int = DEFAULT_CAPACITY,
+                 redraw_interval: float = REDRAW_INTERVAL):
+        names = [label for config in subplot_configs
+                 for label in (config.labels or [config.title])]
+        super().__init__(names, capacity)
+        self._configs = list(subplot_configs)
+        self._live = live
+        self._redraw_interval = redraw_interval
+        self._last_draw = None
 
+        rows = int(math.ceil(len(subplot_configs) / cols))
+        if live:
+            plt.ion()
+            self._figure, axs = plt.subplots(rows, cols, constrained_layout=True, squeeze=False)
+        else:
+            self._figure = Figure(constrained_layout=True)
+            axs = self._figure.subplots(rows, cols, squeeze=False)
 
-class DynamicPlot:
+        # Keep reference to only as many axes as there is configs
+        self._axs = [a for a, conf in zip(axs.flatten(), subplot_configs)]
+
+    def record(self, step: int, values: Sequence[float]):
+        super().record(step, values)
+        if self._live and (self._last_draw is None
+                           or time.monotonic() - self._last_draw >= self._redraw_interval):
+            self.draw()
+
+    def draw(self):
+        steps, values = self.buffer.steps, self.buffer.values
+        start = 0
+        for ax, config in zip(self._axs, self._configs):
+            _render_subplot(ax, config, steps, values[:, start:start + config.num_lines])
+            start += config.num_lines
+
+        if self._live:
+            self._figure.canvas.draw_idle()
+            self._figure.canvas.flush_events()
+            self._last_draw = time.monotonic()
 
-    def __init__(self, subplot_configs: Sequence[SubplotConfig], cols: int = 1):
-        plt.ion()
+    def save(self, path: str):
+        self.draw()
+        self._figure.savefig(path)
 
-        rows = int(math.ceil(len(subplot_configs) / cols))
-        self._figure, axs = plt.subplots(rows, cols, constrained_layout=True)
 
-        axs = axs.flatten()
-        # Keep reference to only as many axes as there is configs
-        self._axs = [a for a, conf in zip(axs, subplot_configs)]
+def render_metrics(loadpath: str,
+                   savepath: str,
+                   title: str = 'Metrics',
+                   max_lines: Optional[int] = None):
+    """Renders metrics written to a file during training, without a display"""
+    names, steps, values = load_metrics(loadpath)
+    figure = Figure(constrained_layout=True)
+    config = SubplotConfig(title, labels=names, max_lines=max_lines)
+    _render_subplot(figure.subplots(), config, steps, values)
+    figure.savefig(savepath)
 
-        self._lines = [ax.plot([], [])[0] for ax in self._axs]
 
-        for ax, config in zip(self._axs, subplot_configs):
-            ax.set_title(config.title)
-            if config.x_range is None:
-                ax.set_autoscalex_on(True)
-            else:
-                ax.set_xlim(*config.x_range)
+def _render_subplot(ax: Axes, config: SubplotConfig, steps: np.array, values: np.array):
+    ax.clear()
+    ax.set_title(config.title)
+    lines = np.arange(values.shape[1])
+    if config.max_lines is not None and len(steps) > 0:
+        # Stable sort keeps the original order of lines with equal values
+        lines = np.sort(np.argsort(-values[-1], kind='stable')[:config.max_lines])
 
-            if config.y_range is None:
-                ax.set_autoscaley_on(True)
-            else:
-                ax.set_ylim(*config.y_range)
+    for line in lines:
+        label = config.labels[line] if config.labels is not None else None
+        ax.plot(steps, values[:, line], label=label)
 
-    def update(self, xs: Sequence[float], ys: Sequence[float]):
-        for line, x, y in zip(self._lines, xs, ys):
-            xdata = np.append(line.get_xdata(), x)
-            line.set_xdata(xdata)
+    if config.labels is not None and len(lines) > 0:
+        ax.legend(fontsize='small')
 
-            ydata = np.append(line.get_ydata(), y)
-            line.set_ydata(ydata)
+    if config.x_range is not None:
+        ax.set_xlim(*config.x_range)
 
-        for ax in self._axs:
-            ax.relim()
-            ax.autoscale_view()
+    if config.y_range is not None:
+        ax.set_ylim(*config.y_range)
 
-        self._figure.canvas.draw()
-        self._figure.canvas.flush_events()
 
-    def save(self, path: str):
-        self._figure.savefig(path)
+@click.command(name='render_metrics')
+@click.option('--loadpath', '-l', type=click.Path(dir_okay=False, readable=True, exists=True), required=True)
+@click.option('--savepath', '-s', type=click.Path(dir_okay=False, writable=True), required=True)
+@click.option('--max-lines', '-m', type=click.IntRange(min=1),
+              help='Only draw this many metrics with the highest latest values.')
+def run_metrics_render(loadpath: str, savepath: str, max_lines: int):
+    render_metrics(loadpath, savepath, max_lines=max_lines)
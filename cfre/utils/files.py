@@ -0,0 +1,29 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+
+
+@contextmanager
+def atomic_write(path: str) -> Iterator[BinaryIO]:
+    """Opens a temporary file which replaces `path` once it is fully written
+
+    Readers of `path` see either its previous content or the complete new
+        one, never a partially written file.
+    """
+    savedir = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile('wb', dir=savedir, delete=False) as f:
+        try:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+
+    # Temporary files are private, give the file the usual permissions
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(f.name, 0o666 & ~umask)
+    os.replace(f.name, path)
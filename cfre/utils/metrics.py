@@ -0,0 +1,284 @@
+import csv
+import logging
+import os
+import queue
+import struct
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import click
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# Number of most recent samples kept in memory by default
+DEFAULT_CAPACITY = 10000
+# Samples waiting for a background sink before `record` blocks
+MAX_QUEUED_SAMPLES = 1000
+# Size of .npy headers written by `NpySink`, fixed so they can be rewritten
+# in place as rows are appended
+NPY_HEADER_SIZE = 256
+
+
+class MetricsSink(ABC):
+    """Destination of metrics recorded during training
+
+    Every sample is a step (e.g. training round) and one value for each of
+        the metric names the sink was created with.
+    """
+
+    @abstractmethod
+    def record(self, step: int, values: Sequence[float]):
+        pass
+
+    def flush(self):
+        """Makes recorded samples visible to readers of the sink"""
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> 'MetricsSink':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RingBuffer:
+    """Preallocated buffer keeping the last `capacity` samples"""
+
+    def __init__(self, capacity: int, width: int):
+        if capacity < 1:
+            raise ValueError(f'Capacity has to be at least 1 but was {capacity}')
+
+        self._steps = np.zeros(capacity, dtype=np.int64)
+        self._values = np.zeros((capacity, width))
+        self._size = 0
+        self._next = 0
+
+    def append(self, step: int, values: Sequence[float]):
+        self._steps[self._next] = step
+        self._values[self._next] = values
+        self._next = (self._next + 1) % len(self._steps)
+        self._size = min(self._size + 1, len(self._steps))
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def steps(self) -> np.array:
+        """Steps of stored samples from the oldest to the newest"""
+        return self._ordered(self._steps)
+
+    @property
+    def values(self) -> np.array:
+        """Values of stored samples, shape `(len(self), width)`"""
+        return self._ordered(self._values)
+
+    def _ordered(self, data: np.array) -> np.array:
+        if self._size < len(data):
+            return data[:self._size]
+
+        return np.roll(data, -self._next, axis=0)
+
+
+class BufferSink(MetricsSink):
+    """Keeps the most recent samples in memory"""
+
+    def __init__(self, names: Sequence[str], capacity: int = DEFAULT_CAPACITY):
+        self._names = list(names)
+        self._buffer = RingBuffer(capacity, len(self._names))
+
+    def record(self, step: int, values: Sequence[float]):
+        self._buffer.append(step, values)
+
+    @property
+    def names(self) -> List[str]:
+        return self._names
+
+    @property
+    def buffer(self) -> RingBuffer:
+        return self._buffer
+
+
+class CsvSink(MetricsSink):
+    """Appends samples to a CSV file with a step column and a column per metric"""
+
+    def __init__(self, path: str, names: Sequence[str]):
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(['step'] + list(names))
+
+    def record(self, step: int, values: Sequence[float]):
+        self._writer.writerow([step] + [repr(float(v)) for v in values])
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class NpySink(MetricsSink):
+    """Appends samples as rows of a float .npy array
+
+    The first column holds steps and the rest values of metrics, whose names
+        are stored in a `.names` text file next to the array. The header is
+        rewritten with the current number of rows on every `flush`, so the
+        file can be loaded (also memory-mapped) while training runs. Wrapped
+        in a `BackgroundSink`, it is flushed whenever all queued samples are
+        written.
+    """
+
+    def __init__(self, path: str, names: Sequence[str]):
+        with open(_names_path(path), 'w') as f:
+            f.write('\n'.join(names))
+
+        self._file = open(path, 'wb')
+        self._width = len(names) + 1
+        self._rows = 0
+        self._write_header()
+
+    def record(self, step: int, values: Sequence[float]):
+        row = np.empty(self._width)
+        row[0] = step
+        row[1:] = values
+        self._file.write(row.astype('<f8').tobytes())
+        self._rows += 1
+
+    def flush(self):
+        self._write_header()
+        self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def _write_header(self):
+        header = repr({'descr': '<f8', 'fortran_order': False, 'shape': (self._rows, self._width)})
+        prefix = np.lib.format.magic(1, 0) + struct.pack('<H', NPY_HEADER_SIZE - 10)
+        header = header.ljust(NPY_HEADER_SIZE - len(prefix) - 1) + '\n'
+        position = self._file.tell()
+        self._file.seek(0)
+        self._file.write(prefix + header.encode('latin1'))
+        self._file.seek(max(position, NPY_HEADER_SIZE))
+
+
+class BackgroundSink(MetricsSink):
+    """Forwards samples to `sink` from a background thread
+
+    Recording only copies values into a queue, so slow sinks (files, plots
+        without a display) do not hold back training. The wrapped sink is
+        flushed whenever the queue runs empty, so files are up to date while
+        training runs. Errors of the wrapped sink are raised on `close`.
+    """
+
+    def __init__(self, sink: MetricsSink, max_queued: int = MAX_QUEUED_SAMPLES):
+        self._sink = sink
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='metrics-sink', daemon=True)
+        self._thread.start()
+
+    def record(self, step: int, values: Sequence[float]):
+        self._queue.put((step, np.array(values, dtype=float)))
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._sink.close()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        while True:
+            sample = self._queue.get()
+            if sample is None:
+                return
+
+            if self._error is None:
+                try:
+                    self._sink.record(*sample)
+                    if self._queue.empty():
+                        self._sink.flush()
+                except Exception as e:
+                    logger.exception('Recording metrics failed, dropping further samples.')
+                    self._error = e
+
+
+class MultiSink(MetricsSink):
+    """Records every sample in all of `sinks`"""
+
+    def __init__(self, sinks: Sequence[MetricsSink]):
+        self._sinks = list(sinks)
+
+    def record(self, step: int, values: Sequence[float]):
+        for sink in self._sinks:
+            sink.record(step, values)
+
+    def flush(self):
+        for sink in self._sinks:
+            sink.flush()
+
+    def close(self):
+        for sink in self._sinks:
+            sink.close()
+
+
+def file_sink(path: str, names: Sequence[str]) -> MetricsSink:
+    """Sink appending to a .csv or .npy file depending on extension of `path`"""
+    extension = os.path.splitext(path)[1]
+    if extension == '.csv':
+        return CsvSink(path, names)
+    if extension == '.npy':
+        return NpySink(path, names)
+
+    raise ValueError(f'Metrics can be written to .csv or .npy files '
+                     f'but extension was "{extension}"')
+
+
+def create_sink(names: Sequence[str],
+                metrics_path: Optional[str] = None,
+                sinks: Sequence[MetricsSink] = ()) -> MetricsSink:
+    """Combines `sinks` with a background writer to `metrics_path` if given"""
+    sinks = list(sinks)
+    if metrics_path is not None:
+        logger.info(f'Writing metrics to {metrics_path}.')
+        sinks.append(BackgroundSink(file_sink(metrics_path, names)))
+
+    return MultiSink(sinks)
+
+
+def load_metrics(path: str) -> Tuple[List[str], np.array, np.array]:
+    """Returns metric names, steps and values written by `file_sink`"""
+    extension = os.path.splitext(path)[1]
+    if extension == '.csv':
+        with open(path, newline='') as f:
+            names = next(csv.reader(f))[1:]
+        data = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)
+    elif extension == '.npy':
+        with open(_names_path(path)) as f:
+            names = f.read().split('\n')
+        data = np.load(path)
+    else:
+        raise ValueError(f'Metrics can be read from .csv or .npy files '
+                         f'but extension was "{extension}"')
+
+    data = data.reshape(-1, len(names) + 1)
+    return names, data[:, 0].astype(np.int64), data[:, 1:]
+
+
+def metrics_options(command: Callable) -> Callable:
+    """Adds CLI options configuring where metrics of training go to a click command"""
+    command = click.option('--headless', is_flag=True,
+                           help='Do not open a live plot, the final plot '
+                                'is still saved.')(command)
+    command = click.option('--metrics-path', type=click.Path(dir_okay=False, writable=True),
+                           help='Stream metrics to this .csv or .npy file.')(command)
+    return command
+
+
+def _names_path(path: str) -> str:
+    return f'{path}.names'
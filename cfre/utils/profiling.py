@@ -0,0 +1,118 @@
+import functools
+import logging
+import time
+from collections import defaultdict
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class Profiler:
+    """Timers and counters of hot paths of trainers
+
+    Profiling is disabled by default. Instrumented code checks `enabled`
+        before recording anything (`timed` functions do it on every call),
+        so disabled instrumentation costs a single attribute lookup.
+
+    Phases are timed with `timed` or `timer` and events (e.g. visited nodes)
+        are counted with `count`. Trainers call `report` at every logging round
+        to log throughput and statistics gathered since the previous report.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._times = defaultdict(float)
+        self._calls = defaultdict(int)
+        self._counts = defaultdict(int)
+        self._interval_start = None
+        self._interval_iterations = 0
+
+    def enable(self):
+        self.enabled = True
+        self._interval_start = time.perf_counter()
+
+    def disable(self):
+        self.enabled = False
+
+    def count(self, name: str, num: int = 1):
+        self._counts[name] += num
+
+    def add_time(self, name: str, seconds: float):
+        self._times[name] += seconds
+        self._calls[name] += 1
+
+    def timer(self, name: str) -> '_Timer':
+        """Context manager timing its body as phase `name`"""
+        return _Timer(self, name)
+
+    def timed(self, name: str) -> Callable[[Callable], Callable]:
+        """Decorator timing every call of a function as phase `name`"""
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.add_time(name, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    def report(self, iteration: int):
+        """Logs statistics since the previous report and starts a new interval
+
+        `iteration` is the number of training iterations played so far.
+        """
+        if not self.enabled:
+            return
+
+        now = time.perf_counter()
+        elapsed = now - self._interval_start
+        iterations = iteration - self._interval_iterations
+        logger.info(f'Profile of iterations {self._interval_iterations}-{iteration}: '
+                    f'{iterations / elapsed:.1f} iterations/s over {elapsed:.2f}s')
+        for name in sorted(self._times, key=self._times.get, reverse=True):
+            seconds = self._times[name]
+            logger.info(f'  {name}: {seconds:.3f}s ({seconds / elapsed:.1%}) '
+                        f'in {self._calls[name]} calls')
+
+        for name in sorted(self._counts):
+            per_iteration = self._counts[name] / max(iterations, 1)
+            logger.info(f'  {name}: {self._counts[name]} ({per_iteration:.1f} per iteration)')
+
+        self._times.clear()
+        self._calls.clear()
+        self._counts.clear()
+        self._interval_start = now
+        self._interval_iterations = iteration
+
+    def start_interval(self, iteration: int):
+        """Starts measuring from `iteration`, e.g. when resuming training"""
+        self._interval_start = time.perf_counter()
+        self._interval_iterations = iteration
+
+
+class _Timer:
+
+    def __init__(self, profiler: Profiler, name: str):
+        self._profiler = profiler
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        if self._profiler.enabled:
+            self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        if self._start is not None:
+            self._profiler.add_time(self._name, time.perf_counter() - self._start)
+            self._start = None
+
+
+# Profiler shared by all instrumented code, enabled by the --profile CLI option
+PROFILER = Profiler()
@@ -0,0 +1,490 @@
+from collections import defaultdict
+from typing import Optional, Tuple
+
+import numpy as np
+
+from cfre.utils.profiling import PROFILER
+from cfre.utils.sampling import CdfTable
+
+
+# Logs of pruned regret matching are trimmed every this many steps
+MIN_LOG_TRIM = 1024
+
+
+class MatrixPayoffs:
+    """Payoffs of a two-player matrix game given as a dense matrix
+
+    `matrix[i, j]` is the payoff of the row player playing pure strategy `i`
+        against pure strategy `j`.
+    """
+
+    def __init__(self, matrix: np.array):
+        self._matrix = np.asarray(matrix)
+        # Columns as contiguous float rows, gathered on every sampled update
+        self._columns = np.ascontiguousarray(self._matrix.T, dtype=float)
+
+    def columns(self, opponent_actions: np.array) -> np.array:
+        """Payoffs of all pure strategies against each of `opponent_actions`
+
+        Returns array of shape `(len(opponent_actions), num_pure_strategies)`.
+        """
+        return self._columns.take(opponent_actions, axis=0)
+
+    def __getstate__(self):
+        # Columns are a copy of the matrix, so keep pickled checkpoints small
+        state = self.__dict__.copy()
+        del state['_columns']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._columns = np.ascontiguousarray(self._matrix.T, dtype=float)
+
+    def expected(self, opponent_strategies: np.array) -> np.array:
+        """Expected payoffs of all pure strategies against each mixed strategy
+
+        Returns array of shape `(len(opponent_strategies), num_pure_strategies)`.
+        """
+        return opponent_strategies @ self._matrix.T
+
+    def submatrix(self, rows: np.array, columns: np.array) -> np.array:
+        """Payoffs of pure strategies `rows` against pure strategies `columns`"""
+        return self._matrix[np.ix_(rows, columns)]
+
+    @property
+    def payoff_range(self) -> float:
+        """Difference between the highest and the lowest payoff"""
+        return float(self._matrix.max() - self._matrix.min())
+
+    @property
+    def num_pure_strategies(self) -> int:
+        return self._matrix.shape[0]
+
+    @property
+    def matrix(self) -> np.array:
+        return self._matrix
+
+
+class RegretMatching:
+    """Regret matching for a matrix game, running many independent runs at once
+
+    Every one of `num_runs` runs keeps its own regrets and average strategy,
+        stored as rows of `(num_runs, num_pure_strategies)` arrays, so acting
+        and updating all runs is a handful of NumPy operations. Actions are
+        0-based indices of pure strategies of `payoffs`, which has to provide
+        `num_pure_strategies`, `columns(opponent_actions)` and
+        `expected(opponent_strategies)` like `MatrixPayoffs`.
+
+    Runs with no positive regret play `default_strategy` (uniform by default).
+        `floor_regrets` clips cumulative regrets at zero after every update
+        (regret matching+), `linear_averaging` weights the strategy played at
+        step `t` by `t` in the average instead of weighting all steps equally.
+
+    Training either samples actions with `act` and updates regrets from the
+        sampled outcomes with `update_regret`, or deterministically updates
+        regrets against the full mixed strategy of the opponent with
+        `expected_update`.
+
+    Current strategies and their `CdfTable` are cached until regrets change,
+        so acting several times per step (e.g. also for a self-play opponent)
+        computes them once.
+    """
+
+    def __init__(self,
+                 payoffs,
+                 num_runs: int = 1,
+                 default_strategy: np.array = None,
+                 floor_regrets: bool = False,
+                 linear_averaging: bool = False,
+                 rng: Optional[np.random.Generator] = None):
+        self._payoffs = payoffs
+        self._num_runs = num_runs
+        num_pure_strategies = payoffs.num_pure_strategies
+
+        self._default_strategy = default_strategy
+        if default_strategy is None:
+            self._default_strategy = np.full(num_pure_strategies, 1 / num_pure_strategies)
+
+        self._default_strategy = np.asarray(self._default_strategy, dtype=float)
+        if self._default_strategy.shape != (num_pure_strategies,):
+            raise ValueError(f'Invalid shape of the default strategy. Was '
+                             f'{self._default_strategy.shape} but should be '
+                             f'{(num_pure_strategies,)}')
+
+        self._floor_regrets = floor_regrets
+        self._linear_averaging = linear_averaging
+        self._rng = np.random.default_rng() if rng is None else rng
+        self._run_indices = np.arange(num_runs)
+
+        self._avg_strategy = np.zeros((num_runs, num_pure_strategies))
+        self._avg_reward = np.zeros(num_runs)
+
+        self._total_regret = np.zeros((num_runs, num_pure_strategies))
+        self._steps_num = 0
+        self._prev_actions = None
+        self._strategies_cache = None
+        self._cdf_table_cache = None
+
+    @PROFILER.timed('regret_matching.update_regret')
+    def update_regret(self, opponent_actions: np.array):
+        """Updates regrets of actions played in the last `act` of every run"""
+        outcomes = self._payoffs.columns(opponent_actions)
+        if self._num_runs == 1:
+            # Basic indexing of a lone run is cheaper than gathering by run indices
+            rewards = outcomes[:, self._prev_actions[0]]
+        else:
+            rewards = outcomes[self._run_indices, self._prev_actions]
+        self._add_regrets(outcomes, rewards)
+
+    @PROFILER.timed('regret_matching.expected_update')
+    def expected_update(self, opponent_strategies: np.array = None):
+        """Updates regrets of every run against a mixed strategy of the opponent
+
+        Opponent plays `opponent_strategies` (one row per run), or the current
+            strategies of the runs themselves in self-play if not given.
+            No actions are sampled, so the update is deterministic.
+        """
+        strategies = self.current_strategies()
+        if opponent_strategies is None:
+            opponent_strategies = strategies
+
+        outcomes = self._payoffs.expected(opponent_strategies)
+        rewards = np.einsum('kn,kn->k', strategies, outcomes)
+
+        self._steps_num += 1
+        self._update_average_strategy(strategies)
+        self._add_regrets(outcomes, rewards)
+
+    def _add_regrets(self, outcomes: np.array, rewards: np.array):
+        # Outcomes of all pure strategies and rewards actually received by every run
+        if self._num_runs == 1:
+            # Python scalars of a lone run are cheaper than ufuncs on 1-element arrays
+            reward = float(rewards[0])
+            self._avg_reward[0] += (reward - self._avg_reward[0]) / self._steps_num
+            self._total_regret += outcomes
+            self._total_regret -= reward
+        else:
+            self._avg_reward += (rewards - self._avg_reward) / self._steps_num
+            self._total_regret += outcomes
+            self._total_regret -= rewards[:, np.newaxis]
+        if self._floor_regrets:
+            np.maximum(self._total_regret, 0, out=self._total_regret)
+
+        self._invalidate_caches()
+
+    def _invalidate_caches(self):
+        self._strategies_cache = None
+        self._cdf_table_cache = None
+
+    def duality_gap(self, opponent_strategies: np.array = None) -> np.array:
+        """Distance of the average strategy of every run from an equilibrium
+
+        Against fixed `opponent_strategies` it is how much more a best
+            response to them would gain than the average strategy. In self-play
+            (no opponent strategies) the game has to be symmetric and zero-sum,
+            i.e. `payoff(i, j) == -payoff(j, i)`, and it is the gain of the best
+            responses of both players to the average strategy. Either way it
+            is 0 only at a fixed point of the training.
+        """
+        if opponent_strategies is None:
+            # Average strategy is worth 0 against itself in a symmetric game
+            return 2 * self._payoffs.expected(self.avg_strategy).max(axis=1)
+
+        outcomes = self._payoffs.expected(opponent_strategies)
+        rewards = np.einsum('kn,kn->k', self.avg_strategy, outcomes)
+        return outcomes.max(axis=1) - rewards
+
+    def act(self, perform_update: bool = True) -> np.array:
+        """Samples an action of every run from its current strategy
+
+        With `perform_update` the strategy is added to the average and the
+            actions are remembered for the next `update_regret`, otherwise
+            the actions can serve as actions of a self-play opponent.
+        """
+        strategies = self.current_strategies()
+        if self._cdf_table_cache is None:
+            self._cdf_table_cache = CdfTable(strategies)
+
+        actions = self._cdf_table_cache.sample(self._rng)
+
+        if perform_update:
+            self._steps_num += 1
+            self._update_average_strategy(strategies)
+            self._prev_actions = actions
+
+        return actions
+
+    def current_strategies(self) -> np.array:
+        """Strategies of all runs given their regrets, a read-only array"""
+        if self._strategies_cache is None:
+            strategies = np.maximum(self._total_regret, 0)
+            if self._num_runs == 1:
+                # Scalar norm of a lone run is much cheaper than the batched division
+                strategy_norm = strategies.sum()
+                if strategy_norm > 0:
+                    strategies /= strategy_norm
+                else:
+                    strategies[0] = self._default_strategy
+            else:
+                strategy_norms = strategies.sum(axis=1, keepdims=True)
+                # If all regrets are non-positive, choose default strategy
+                defaults = np.broadcast_to(self._default_strategy, strategies.shape)
+                strategies = np.divide(strategies, strategy_norms, out=defaults.copy(),
+                                       where=strategy_norms > 0)
+            strategies.flags.writeable = False
+            self._strategies_cache = strategies
+
+        return self._strategies_cache
+
+    def _update_average_strategy(self, strategies: np.array):
+        if self._linear_averaging:
+            # Average is weighted by t where t is the time at which the strategy was sampled
+            weight = 2 / (self._steps_num + 1)
+        else:
+            weight = 1 / self._steps_num
+
+        self._avg_strategy += weight * (strategies - self._avg_strategy)
+
+    def __getstate__(self):
+        # Caches are rebuilt on demand, so keep pickled checkpoints small
+        state = self.__dict__.copy()
+        state['_strategies_cache'] = None
+        state['_cdf_table_cache'] = None
+        return state
+
+    def __setstate__(self, state):
+        # Checkpoints pickled by older versions do not have caches
+        self.__dict__.update(state)
+        self._run_indices = np.arange(self._num_runs)
+        self._invalidate_caches()
+
+    @property
+    def num_runs(self) -> int:
+        return self._num_runs
+
+    @property
+    def payoffs(self):
+        return self._payoffs
+
+    @property
+    def avg_strategy(self) -> np.array:
+        return self._avg_strategy
+
+    @property
+    def avg_reward(self) -> np.array:
+        return self._avg_reward
+
+
+class PrunedRegretMatching(RegretMatching):
+    """Regret matching that skips pure strategies with very negative regret
+
+    Regret of a pure strategy grows by at most `payoffs.payoff_range` per step,
+        so a strategy with regret `-r` will not be played for the next
+        `r // payoff_range` steps anyway. Such strategies leave the active set
+        of their run for that many steps and neither their strategy nor their
+        outcomes are computed meanwhile; only outcomes of active strategies are
+        requested from `payoffs.submatrix`. When a strategy comes back, its
+        regret is brought up to date at once from a sparse log of the opponent
+        actions (or mixed strategies) and rewards since it was pruned, which
+        costs one outcome per distinct opponent action in that window.
+
+    Training is equivalent to `RegretMatching` up to floating-point rounding,
+        the batched catch-up sums regrets in a different order. Regret matching
+        can amplify such differences (e.g. by breaking exact ties of a
+        symmetric self-play), so trajectories agree only over short horizons
+        and are not bit-identical.
+
+    Regrets can not be floored, since pruning relies on negative regrets.
+    """
+
+    def __init__(self,
+                 payoffs,
+                 num_runs: int = 1,
+                 default_strategy: np.array = None,
+                 linear_averaging: bool = False,
+                 rng: Optional[np.random.Generator] = None):
+        super().__init__(payoffs, num_runs, default_strategy,
+                         linear_averaging=linear_averaging, rng=rng)
+        num_pure_strategies = payoffs.num_pure_strategies
+        self._regret_bound = payoffs.payoff_range
+
+        self._active = np.ones((num_runs, num_pure_strategies), dtype=bool)
+        # Runs, strategies and prune steps of pruned strategies, keyed by the
+        # step before which they return to the active sets
+        self._reentries = defaultdict(list)
+        # Opponent runs, actions and their weights played in every step since
+        # step `_log_start`, and total reward of every run after each of them
+        self._opponent_log = []
+        self._reward_log = [np.zeros(num_runs)]
+        self._log_start = 1
+
+        # Average strategy is kept as a weighted sum, so that only active
+        # strategies are touched in every step
+        self._avg_strategy = None
+        self._strategy_sums = np.zeros((num_runs, num_pure_strategies))
+        self._strategy_weights = 0
+
+        # Strategies active in any run during the current step
+        self._step_actions = None
+        self._step_strategies = None
+        self._step_table = None
+        self._prev_positions = None
+
+    def act(self, perform_update: bool = True) -> np.array:
+        if perform_update:
+            self._start_step()
+
+        positions = self._step_table.sample(self._rng)
+        if perform_update:
+            self._prev_positions = positions
+            self._prev_actions = self._step_actions[positions]
+
+        return self._step_actions[positions]
+
+    @PROFILER.timed('regret_matching.update_regret')
+    def update_regret(self, opponent_actions: np.array):
+        outcomes = self._payoffs.submatrix(self._step_actions, opponent_actions).T
+        rewards = outcomes[np.arange(self._num_runs), self._prev_positions]
+        self._opponent_log.append((np.arange(self._num_runs), opponent_actions,
+                                   np.ones(self._num_runs)))
+        self._add_active_regrets(outcomes, rewards)
+
+    @PROFILER.timed('regret_matching.expected_update')
+    def expected_update(self, opponent_strategies: np.array = None):
+        self._start_step()
+        strategies = self._step_strategies
+        if opponent_strategies is None:
+            opponent_actions = self._step_actions
+            opponent_strategies = strategies
+        else:
+            opponent_actions = np.flatnonzero(opponent_strategies.any(axis=0))
+            opponent_strategies = opponent_strategies[:, opponent_actions]
+
+        submatrix = self._payoffs.submatrix(self._step_actions, opponent_actions)
+        outcomes = opponent_strategies @ submatrix.T
+        rewards = np.einsum('kn,kn->k', strategies, outcomes)
+        runs, positions = np.nonzero(opponent_strategies)
+        self._opponent_log.append((runs, opponent_actions[positions],
+                                   opponent_strategies[runs, positions]))
+        self._add_active_regrets(outcomes, rewards)
+
+    def current_strategies(self) -> np.array:
+        actions, active_strategies = self._active_strategies()
+        strategies = np.zeros_like(self._total_regret)
+        strategies[:, actions] = active_strategies
+        return strategies
+
+    def _start_step(self):
+        self._reenter(self._steps_num + 1)
+        self._step_actions, self._step_strategies = self._active_strategies()
+        self._step_table = CdfTable(self._step_strategies)
+
+        self._steps_num += 1
+        weight = self._steps_num if self._linear_averaging else 1
+        self._strategy_sums[:, self._step_actions] += weight * self._step_strategies
+        self._strategy_weights += weight
+
+    def _active_strategies(self) -> Tuple[np.array, np.array]:
+        # Returns strategies active in any run and their probabilities in every run
+        actions = np.flatnonzero(self._active.any(axis=0))
+        active = self._active[:, actions]
+        strategies = np.where(active, np.maximum(self._total_regret[:, actions], 0), 0)
+        strategy_norms = strategies.sum(axis=1, keepdims=True)
+
+        # If all regrets are non-positive, choose default strategy over active strategies
+        defaults = np.where(active, self._default_strategy[actions], 0)
+        default_norms = defaults.sum(axis=1, keepdims=True)
+        defaults = np.where(default_norms > 0, defaults, active)
+        defaults = defaults / defaults.sum(axis=1, keepdims=True)
+        return actions, np.divide(strategies, strategy_norms, out=defaults,
+                                  where=strategy_norms > 0)
+
+    def _add_active_regrets(self, outcomes: np.array, rewards: np.array):
+        # Outcomes of the step's active strategies and rewards received by every run
+        self._avg_reward += (rewards - self._avg_reward) / self._steps_num
+        self._reward_log.append(self._reward_log[-1] + rewards)
+
+        actions = self._step_actions
+        active = self._active[:, actions]
+        regrets = self._total_regret[:, actions]
+        regrets += np.where(active, outcomes - rewards[:, np.newaxis], 0)
+        self._total_regret[:, actions] = regrets
+
+        # Prune strategies which will not be played for at least one step, as long
+        # as their run keeps an active strategy with positive regret
+        skipped_steps = np.floor(-regrets / self._regret_bound)
+        has_positive_regret = (active & (regrets > 0)).any(axis=1, keepdims=True)
+        runs, positions = np.nonzero(active & has_positive_regret & (skipped_steps >= 1))
+        if len(runs) > 0:
+            pruned = actions[positions]
+            self._active[runs, pruned] = False
+            reentry_steps = self._steps_num + 1 + skipped_steps[runs, positions].astype(int)
+            for step in np.unique(reentry_steps):
+                at_step = reentry_steps == step
+                self._reentries[step].append((runs[at_step], pruned[at_step], self._steps_num))
+
+    def _reenter(self, step: int):
+        # Brings back strategies whose pruning ends before `step`, with up to date regrets
+        groups = self._reentries.pop(step, None)
+        if groups is not None:
+            runs, actions, prune_steps = (np.concatenate(group) for group in zip(*(
+                (runs, actions, np.full(len(runs), prune_step)) for runs, actions, prune_step in groups)))
+            first_step = prune_steps.min() + 1
+            window = self._opponent_log[first_step - self._log_start:]
+            log_runs, log_actions, log_weights = (np.concatenate(log) for log in zip(*window))
+            log_steps = np.repeat(np.arange(first_step, first_step + len(window)),
+                                  [len(log_runs) for log_runs, _, _ in window])
+            distinct_steps, step_indices = np.unique(prune_steps, return_inverse=True)
+            reward_at_prune = np.stack([self._reward_log[prune_step + 1 - self._log_start]
+                                        for prune_step in distinct_steps])[step_indices]
+
+            for run in np.unique(runs):
+                in_run = runs == run
+                in_log = log_runs == run
+                opponent_actions, indices = np.unique(log_actions[in_log], return_inverse=True)
+                run_prune_steps, prune_indices = np.unique(prune_steps[in_run], return_inverse=True)
+                # Weights of opponent actions played after each distinct prune step
+                after_prunes = np.searchsorted(run_prune_steps, log_steps[in_log])
+                weights = np.zeros((len(run_prune_steps) + 1, len(opponent_actions)))
+                np.add.at(weights, (after_prunes, indices), log_weights[in_log])
+                weights = weights[::-1].cumsum(axis=0)[-2::-1]
+
+                submatrix = self._payoffs.submatrix(actions[in_run], opponent_actions)
+                outcomes = np.einsum('ij,ij->i', submatrix, weights[prune_indices])
+                rewards = self._reward_log[-1][run] - reward_at_prune[in_run, run]
+                self._total_regret[run, actions[in_run]] += outcomes - rewards
+                self._active[run, actions[in_run]] = True
+
+        self._trim_logs()
+
+    def _trim_logs(self):
+        # Drops log entries no pruned strategy will need anymore
+        if self._steps_num % MIN_LOG_TRIM != 0:
+            return
+
+        pending = [prune_step for groups in self._reentries.values() for _, _, prune_step in groups]
+        first_needed = min(pending, default=self._steps_num) + 1
+        if first_needed > self._log_start:
+            del self._opponent_log[:first_needed - self._log_start]
+            del self._reward_log[:first_needed - self._log_start]
+            self._log_start = first_needed
+
+    @property
+    def avg_strategy(self) -> np.array:
+        if self._strategy_weights == 0:
+            return np.zeros_like(self._strategy_sums)
+
+        return self._strategy_sums / self._strategy_weights
+
+    @property
+    def num_active(self) -> np.array:
+        """Number of active pure strategies of every run"""
+        return self._active.sum(axis=1)
+
+
+def sample_actions(strategies: np.array, rng: np.random.Generator) -> np.array:
+    """Samples one action from every row of `strategies`
+
+    Strategies sampled more than once should be kept in a `CdfTable` instead.
+    """
+    return CdfTable(strategies).sample(rng)
@@ -0,0 +1,102 @@
+import numpy as np
+
+
+class CdfTable:
+    """Cumulative distributions of many discrete distributions, sampled by bisection
+
+    Rows of `(num_rows, n)` `probabilities` are turned into cumulative sums
+        shifted by their row index and flattened, so that the sums of all rows
+        form a single increasing array. Sampling an action of every row is
+        then one binary search of `num_rows` uniform numbers (each shifted by
+        its row) in O(num_rows * log(num_rows * n)), while the O(num_rows * n)
+        cumulative sums are only computed once per table.
+
+    Sampled action is the number of cumulative probabilities not above the
+        uniform number, clamped to `n - 1` to guard against rounding.
+
+    A single row (e.g. a lone bot) is sampled by a scalar bisection instead,
+        which draws the same uniform number and gives the same action without
+        the overhead of the batched arrays.
+    """
+
+    def __init__(self, probabilities: np.array):
+        num_rows, self._num_actions = probabilities.shape
+        self._offsets = np.arange(num_rows)
+        if num_rows == 1:
+            # Without other rows to overlap, only the last sum has to be rounded
+            self._keys = probabilities[0].cumsum()
+            self._keys[-1] = 1
+            return
+
+        cdf = np.cumsum(probabilities, axis=1)
+        # Rounding of the sums must not overlap rows or leave uniforms without an action
+        np.minimum(cdf, 1, out=cdf)
+        cdf[:, -1] = 1
+        cdf += self._offsets[:, np.newaxis]
+        self._keys = cdf.ravel()
+
+    def sample(self, rng: np.random.Generator) -> np.array:
+        """Samples one action from every row"""
+        if len(self._offsets) == 1:
+            return np.array([self._keys.searchsorted(rng.random(), side='right')])
+
+        thresholds = rng.random(len(self._offsets)) + self._offsets
+        positions = np.searchsorted(self._keys, thresholds, side='right')
+        return positions - self._offsets * self._num_actions
+
+    @property
+    def num_rows(self) -> int:
+        return len(self._offsets)
+
+
+class AliasTable:
+    """Walker's alias tables of many discrete distributions
+
+    Building tables for `(num_rows, n)` `probabilities` takes O(n) per row,
+        afterwards every sample takes O(1) regardless of `n`: a uniform column
+        is kept with its acceptance probability and replaced by its alias
+        otherwise. Worth it when the same distributions are sampled many
+        times, e.g. a fixed opponent strategy in every training round.
+    """
+
+    def __init__(self, probabilities: np.array):
+        probabilities = np.asarray(probabilities, dtype=float)
+        num_rows, n = probabilities.shape
+        self._acceptance = np.ones((num_rows, n))
+        self._aliases = np.tile(np.arange(n), (num_rows, 1))
+        for row, distribution in enumerate(probabilities):
+            self._build_row(row, distribution / distribution.sum())
+
+    def _build_row(self, row: int, distribution: np.array):
+        # Vose's variant, columns below the average are topped up by columns above it
+        scaled = (distribution * len(distribution)).tolist()
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._acceptance[row, less] = scaled[less]
+            self._aliases[row, less] = more
+            scaled[more] -= 1 - scaled[less]
+            (small if scaled[more] < 1 else large).append(more)
+
+        # Columns left in either list are full up to rounding and keep acceptance of 1
+
+    def sample(self, rng: np.random.Generator, size: int = None) -> np.array:
+        """Samples one action, or `size` actions if given, from every row
+
+        Returns array of shape `(num_rows,)` or `(num_rows, size)`.
+        """
+        num_rows, n = self._acceptance.shape
+        rows = np.arange(num_rows)
+        if size is not None:
+            rows = np.repeat(rows[:, np.newaxis], size, axis=1)
+
+        uniforms = rng.random(rows.shape) * n
+        columns = uniforms.astype(np.intp)
+        # Fractional part of the scaled uniform decides between a column and its alias
+        accepted = uniforms - columns < self._acceptance[rows, columns]
+        return np.where(accepted, columns, self._aliases[rows, columns])
+
+    @property
+    def num_rows(self) -> int:
+        return self._acceptance.shape[0]
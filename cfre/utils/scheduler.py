@@ -0,0 +1,132 @@
+import logging
+import pickle
+import time
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+import click
+import numpy as np
+
+from cfre.utils.files import atomic_write
+from cfre.utils.profiling import PROFILER
+
+logger = logging.getLogger(__name__)
+
+
+class TrainingScheduler:
+    """Decides for how many rounds a trainer keeps running
+
+    Training stops after `max_rounds`, once `time_budget` seconds have passed,
+        or at a check round (every `check_frequency` rounds) once the average
+        strategy changed by at most `strategy_tolerance` since the previous
+        check or a convergence metric (e.g. exploitability) dropped to
+        `target_metric`. Trainers iterate over `rounds()` and call `check()`
+        at rounds for which `is_check_round()` is true.
+    """
+
+    def __init__(self,
+                 max_rounds: int,
+                 check_frequency: int,
+                 time_budget: Optional[float] = None,
+                 strategy_tolerance: Optional[float] = None,
+                 target_metric: Optional[float] = None,
+                 metric_name: str = 'metric'):
+        self._max_rounds = max_rounds
+        self._check_frequency = check_frequency
+        self._time_budget = time_budget
+        self._strategy_tolerance = strategy_tolerance
+        self._target_metric = target_metric
+        self._metric_name = metric_name
+
+        self._start_time = None
+        self._prev_strategy = None
+        self._stop_reason = None
+
+    def rounds(self, start_round: int = 0, step: int = 1) -> Iterator[int]:
+        """Yields number of rounds played before each training step
+
+        Resumed training passes number of rounds already played as
+            `start_round`. Trainers playing many rounds per step pass
+            the number of rounds in a step as `step`.
+        """
+        self._start_time = time.monotonic()
+        for round_num in range(start_round, self._max_rounds, step):
+            if self._is_out_of_time():
+                self._stop(f'time budget of {self._time_budget}s ran out')
+
+            if self._stop_reason is not None:
+                return
+
+            yield round_num
+
+        self._stop(f'all {self._max_rounds} rounds were played')
+
+    def is_check_round(self, round_num: int, step: int = 1) -> bool:
+        """Whether the step starting at `round_num` contains a check round"""
+        # Smallest multiple of check frequency that is not below `round_num`
+        next_check = -(-round_num // self._check_frequency) * self._check_frequency
+        return next_check < round_num + step
+
+    def check(self,
+              round_num: int,
+              strategy: Optional[np.array] = None,
+              metric: Optional[float] = None) -> bool:
+        """Checks convergence of training, returns whether it should stop"""
+        if self._target_metric is not None and metric is not None \
+                and metric <= self._target_metric:
+            self._stop(f'{self._metric_name} {metric:.5f} reached target '
+                       f'{self._target_metric} at round {round_num}')
+
+        if self._strategy_tolerance is not None and strategy is not None:
+            strategy = np.array(strategy, dtype=float)
+            if self._prev_strategy is not None and self._prev_strategy.shape == strategy.shape:
+                change = np.abs(strategy - self._prev_strategy).max()
+                if change <= self._strategy_tolerance:
+                    self._stop(f'average strategy changed by {change:.2e} since '
+                               f'previous check at round {round_num}')
+
+            self._prev_strategy = strategy
+
+        return self.stopped
+
+    def _is_out_of_time(self) -> bool:
+        if self._time_budget is None:
+            return False
+
+        return time.monotonic() - self._start_time > self._time_budget
+
+    def _stop(self, reason: str):
+        if self._stop_reason is None:
+            self._stop_reason = reason
+            logger.info(f'Stopping training: {reason}.')
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_reason is not None
+
+    @property
+    def stop_reason(self) -> Optional[str]:
+        return self._stop_reason
+
+
+def scheduler_options(command: Callable) -> Callable:
+    """Adds CLI options configuring `TrainingScheduler` to a click command"""
+    command = click.option('--max-time', type=click.FloatRange(min=0),
+                           help='Stop training after this many seconds.')(command)
+    command = click.option('--tolerance', type=click.FloatRange(min=0),
+                           help='Stop training once the average strategy changes '
+                                'by at most this much between checks.')(command)
+    return command
+
+
+@PROFILER.timed('checkpoint.save')
+def save_checkpoint(savepath: str, round_num: int, state: Any):
+    """Atomically pickles trainer state together with number of played rounds"""
+    with atomic_write(savepath) as f:
+        pickle.dump((round_num, state), f)
+
+
+@PROFILER.timed('checkpoint.load')
+def load_checkpoint(loadpath: str) -> Tuple[int, Any]:
+    """Returns number of played rounds and trainer state saved with `save_checkpoint`"""
+    with open(loadpath, 'rb') as f:
+        return pickle.load(f)
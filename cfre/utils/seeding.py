@@ -0,0 +1,44 @@
+from typing import Callable
+
+import click
+import numpy as np
+
+
+# Number of uniform numbers drawn at once by `UniformStream`
+UNIFORMS_BLOCK_SIZE = 4096
+
+
+class UniformStream:
+    """Uniform numbers in [0, 1) drawn from a NumPy generator in blocks
+
+    Code sampling one value at a time (e.g. a deal per training round) takes
+        numbers from a block drawn with a single generator call instead of
+        calling the generator for every sample.
+    """
+
+    def __init__(self, rng: np.random.Generator, block_size: int = UNIFORMS_BLOCK_SIZE):
+        self._rng = rng
+        self._block_size = block_size
+        self._uniforms = []
+        self._next = 0
+
+    def uniform(self) -> float:
+        if self._next == len(self._uniforms):
+            # Python floats are faster to index and use than NumPy scalars
+            self._uniforms = self._rng.random(self._block_size).tolist()
+            self._next = 0
+
+        value = self._uniforms[self._next]
+        self._next += 1
+        return value
+
+    def integer(self, high: int) -> int:
+        """Uniform integer in [0, high)"""
+        return int(self.uniform() * high)
+
+
+def seed_option(command: Callable) -> Callable:
+    """Adds a --seed CLI option to a click command"""
+    return click.option('--seed', type=click.IntRange(min=0),
+                        help='Seed of random number generators, runs with '
+                             'the same seed are reproducible.')(command)
@@ -1,16 +1,41 @@
+import cProfile
 import logging
+import pstats
 
 import click
 
+from cfre.benchmarks import run_benchmarks
 from cfre.blotto import run_blotto_bot
-from cfre.kuhn import run_kuhn_trainer, run_kuhn_game
+from cfre.kuhn import run_kuhn_trainer, run_kuhn_game, run_kuhn_evaluation, run_kuhn_server
+from cfre.leduc import run_leduc_trainer, run_leduc_game, run_leduc_benchmark
 from cfre.rps import run_rps_bot
+from cfre.utils.dynamic_plots import run_metrics_render
+from cfre.utils.profiling import PROFILER
+
+
+# Number of functions with the highest cumulative time logged after profiling
+NUM_PROFILED_FUNCTIONS = 20
+
+logger = logging.getLogger('cfre')
 
 
 @click.group()
 @click.option('--debug', is_flag=True)
-def cli(debug: bool):
+@click.option('--profile', is_flag=True,
+              help='Report throughput and time spent in training phases '
+                   'at every logging round.')
+@click.option('--profile-path', type=click.Path(dir_okay=False, writable=True),
+              help='Also profile the whole command with cProfile and dump stats, '
+                   'readable with pstats, to this file. Slows training down.')
+@click.pass_context
+def cli(ctx: click.Context, debug: bool, profile: bool, profile_path: str):
     _setup_logging(debug)
+    if profile or profile_path is not None:
+        PROFILER.enable()
+        ctx.call_on_close(PROFILER.disable)
+
+    if profile_path is not None:
+        _start_cprofile(ctx, profile_path)
 
 
 def _setup_logging(debug: bool):
@@ -20,16 +45,37 @@ def _setup_logging(debug: bool):
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(log_formatter)
     console_handler.setLevel(level)
-    logger = logging.getLogger('cfre')
     logger.setLevel(level)
     logger.addHandler(console_handler)
     logger.info(f'Debug mode is {"on" if debug else "off"}')
 
 
+def _start_cprofile(ctx: click.Context, profile_path: str):
+    profile = cProfile.Profile()
+    profile.enable()
+
+    def finish():
+        profile.disable()
+        profile.dump_stats(profile_path)
+        logger.info(f'Saved cProfile stats to {profile_path}, functions '
+                    f'with the highest cumulative time:')
+        stats = pstats.Stats(profile)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(NUM_PROFILED_FUNCTIONS)
+
+    ctx.call_on_close(finish)
+
+
 cli.add_command(run_rps_bot)
 cli.add_command(run_blotto_bot)
 cli.add_command(run_kuhn_trainer)
 cli.add_command(run_kuhn_game)
+cli.add_command(run_kuhn_evaluation)
+cli.add_command(run_kuhn_server)
+cli.add_command(run_leduc_trainer)
+cli.add_command(run_leduc_game)
+cli.add_command(run_leduc_benchmark)
+cli.add_command(run_metrics_render)
+cli.add_command(run_benchmarks)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,32 @@
+from hamcrest import assert_that, equal_to, greater_than
+
+from cfre.benchmarks.cases import BenchmarkCase, benchmark_cases
+from cfre.benchmarks.runner import BenchmarkResult, find_regressions
+from cfre.benchmarks.runner import load_results, run_case, save_results
+
+
+def test_benchmarkCases_uniqueIds():
+    ids = [case.id for case in benchmark_cases()]
+    assert_that(len(set(ids)), equal_to(len(ids)))
+
+
+def test_runCase_measuresThroughputAndMemory(tmp_path):
+    case = BenchmarkCase('allocate', lambda: lambda: bytearray(100000), {'size': 100000})
+    result = run_case(case, min_time=0.01)
+    assert_that(result.id, equal_to('allocate[size=100000]'))
+    assert_that(result.iterations_per_second, greater_than(0))
+    assert_that(result.peak_memory, greater_than(100000))
+
+    path = str(tmp_path / 'results.json')
+    save_results([result], path)
+    assert_that(load_results(path), equal_to({result.id: result}))
+
+
+def test_findRegressions_onlySlowerThanThreshold():
+    baseline = {'a': BenchmarkResult('a', 100, 1, 100, 0), 'b': BenchmarkResult('b', 100, 1, 100, 0)}
+    results = [BenchmarkResult('a', 100, 1.1, 90, 0),
+               BenchmarkResult('b', 100, 2, 50, 0),
+               BenchmarkResult('c', 100, 9, 1, 0)]
+    regressions = find_regressions(results, baseline, threshold=0.2)
+    assert_that([r.id for r in regressions], equal_to(['b']))
+    assert_that(regressions[0].slowdown, equal_to(1))
@@ -4,6 +4,8 @@ from hamcrest import assert_that, equal_to, calling, raises
 from numpy import testing as npt
 
 from cfre.blotto.blotto_bot import action_to_battlefields, comb_with_repetition
+from cfre.blotto.allocations import battlefield_allocations, battlefield_partitions
+from cfre.blotto.allocations import battlefields_to_action, partition_multiplicities
 
 @pytest.mark.parametrize('action, soldiers, battlefields, expected_out', [
     (1, 10, 5, np.array([10, 0, 0, 0, 0])),
@@ -25,6 +27,37 @@ def test_actionToBattlefields_actionTooSmall():
     assert_that(calling(action_to_battlefields).with_args(0, 3, 3), raises(ValueError))
 
 
+@pytest.mark.parametrize('soldiers, battlefields', [(3, 2), (5, 3), (3, 4), (10, 5), (4, 1)])
+def test_battlefieldAllocations_matchesActionToBattlefields(soldiers, battlefields):
+    allocations = battlefield_allocations(soldiers, battlefields)
+    num_actions = comb_with_repetition(soldiers, battlefields)
+    expected = [action_to_battlefields(a, soldiers, battlefields)
+                for a in range(1, num_actions + 1)]
+    npt.assert_array_equal(allocations, expected)
+
+
+@pytest.mark.parametrize('battlefields, soldiers, num_battlefields, expected_out', [
+    (np.array([10, 0, 0, 0, 0]), 10, 5, 1),
+    (np.array([1, 0, 2]), 3, 3, 6),
+    (np.array([0, 1, 2, 0]), 3, 4, 14),
+    (np.array([2, 1, 1, 1]), 5, 4, 15)
+])
+def test_battlefieldsToAction(battlefields, soldiers, num_battlefields, expected_out):
+    assert_that(battlefields_to_action(battlefields, soldiers, num_battlefields),
+                equal_to(expected_out))
+
+
+def test_battlefieldsToAction_batchInvertsAllocations():
+    allocations = battlefield_allocations(6, 4)
+    npt.assert_array_equal(battlefields_to_action(allocations, 6, 4),
+                           np.arange(1, len(allocations) + 1))
+
+
+def test_battlefieldsToAction_invalidSum():
+    assert_that(calling(battlefields_to_action).with_args(np.array([1, 1]), 3, 2),
+                raises(ValueError))
+
+
 @pytest.mark.parametrize('elements, bins, expected_out', [
     (2, 2, 3),
     (2, 3, 6),
@@ -32,4 +65,14 @@ def test_actionToBattlefields_actionTooSmall():
     (11, 7, 12376)
 ])
 def test_combWithRepetition(elements, bins, expected_out):
-    assert_that(comb_with_repetition(elements, bins), equal_to(expected_out))
\ No newline at end of file
+    assert_that(comb_with_repetition(elements, bins), equal_to(expected_out))
+
+
+@pytest.mark.parametrize('soldiers, battlefields', [(4, 3), (5, 3), (3, 4), (10, 5), (4, 1)])
+def test_battlefieldPartitions_sortedAllocationsWithMultiplicities(soldiers, battlefields):
+    allocations = battlefield_allocations(soldiers, battlefields)
+    sorted_allocations, counts = np.unique(-np.sort(-allocations, axis=1), axis=0, return_counts=True)
+    partitions = battlefield_partitions(soldiers, battlefields)
+    # np.unique sorts ascending, partitions follow the descending order of allocations
+    npt.assert_array_equal(partitions, sorted_allocations[::-1])
+    npt.assert_array_equal(partition_multiplicities(partitions), counts[::-1])
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from hamcrest import assert_that, equal_to
+from numpy import testing as npt
+
+from cfre.blotto.allocations import battlefields_to_action
+from cfre.blotto.blotto_bot import action_to_battlefields, create_blotto_engine
+from cfre.blotto.payoffs import BlottoPayoffs, SymmetricBlottoPayoffs
+
+
+def _reference_outcome(act1, act2, soldiers, battlefields):
+    battlefields1 = action_to_battlefields(act1, soldiers, battlefields)
+    battlefields2 = action_to_battlefields(act2, soldiers, battlefields)
+    return (battlefields1 > battlefields2).sum() - (battlefields2 > battlefields1).sum()
+
+
+@pytest.mark.parametrize('act1, act2, soldiers, battlefields, expected_out', [
+    (1, 1, 5, 3, 0),
+    (1, 21, 5, 3, 0),
+    (2, 17, 5, 3, -1),
+    (15, 1, 5, 4, 2),
+])
+def test_blottoPayoffs_outcome(act1, act2, soldiers, battlefields, expected_out):
+    payoffs = BlottoPayoffs(soldiers, battlefields)
+    assert_that(payoffs.outcome(act1, act2), equal_to(expected_out))
+
+
+@pytest.mark.parametrize('soldiers, battlefields', [(5, 3), (4, 4)])
+def test_blottoPayoffs_matrixMatchesReference(soldiers, battlefields):
+    payoffs = BlottoPayoffs(soldiers, battlefields)
+    num_actions = payoffs.num_pure_strategies
+    for act2 in range(1, num_actions + 1):
+        expected = [_reference_outcome(act1, act2, soldiers, battlefields)
+                    for act1 in range(1, num_actions + 1)]
+        npt.assert_array_equal(payoffs.column(act2), expected)
+
+
+def test_blottoPayoffs_lazyColumnsMatchMatrix():
+    precomputed = BlottoPayoffs(5, 3, precompute=True)
+    lazy = BlottoPayoffs(5, 3, precompute=False)
+    for act2 in range(1, precomputed.num_pure_strategies + 1):
+        npt.assert_array_equal(lazy.column(act2), precomputed.column(act2))
+
+
+@pytest.mark.parametrize('precompute', [True, False])
+def test_blottoPayoffs_columnsMatchColumn(precompute):
+    payoffs = BlottoPayoffs(5, 3, precompute=precompute)
+    opponent_indices = np.array([0, 7, 20, 7])
+    expected = [payoffs.column(i + 1) for i in opponent_indices]
+    npt.assert_array_equal(payoffs.columns(opponent_indices), expected)
+
+
+def test_blottoPayoffs_expectedWithoutMatrixMatchesMatrix():
+    payoffs = BlottoPayoffs(5, 3, precompute=False)
+    opponent_strategies = np.random.default_rng(0).dirichlet(np.ones(payoffs.num_pure_strategies), 3)
+    opponent_strategies[0, :10] = 0
+    npt.assert_allclose(payoffs.expected(opponent_strategies),
+                        opponent_strategies @ payoffs.matrix.T, atol=1e-12)
+
+
+@pytest.mark.parametrize('precompute', [True, False])
+def test_blottoPayoffs_submatrixMatchesMatrix(precompute):
+    payoffs = BlottoPayoffs(5, 3, precompute=precompute)
+    rows, columns = np.array([3, 0, 20]), np.array([7, 7, 1, 19])
+    npt.assert_array_equal(payoffs.submatrix(rows, columns),
+                           BlottoPayoffs(5, 3).matrix[np.ix_(rows, columns)])
+
+
+@pytest.mark.parametrize('soldiers, battlefields', [(5, 3), (7, 4)])
+def test_symmetricBlottoPayoffs_matchFullGameOfExpandedStrategies(soldiers, battlefields):
+    payoffs = SymmetricBlottoPayoffs(soldiers, battlefields)
+    strategies = np.random.default_rng(0).dirichlet(np.ones(payoffs.num_pure_strategies), 2)
+    full_strategies = payoffs.expand(strategies)
+    npt.assert_allclose(full_strategies.sum(axis=1), 1)
+
+    # Representatives of partitions do as well as their expanded class
+    full_expected = full_strategies @ BlottoPayoffs(soldiers, battlefields).matrix.T
+    representatives = battlefields_to_action(payoffs.partitions, soldiers, battlefields) - 1
+    npt.assert_allclose(full_expected[:, representatives], payoffs.expected(strategies), atol=1e-12)
+
+
+def test_createBlottoEngine_symmetricGapMatchesFullGame():
+    engine = create_blotto_engine(6, 3, symmetric=True)
+    for _ in range(300):
+        engine.expected_update()
+
+    full_strategy = engine.payoffs.expand(engine.avg_strategy)
+    full_gap = 2 * (full_strategy @ BlottoPayoffs(6, 3).matrix.T).max(axis=1)
+    npt.assert_allclose(engine.duality_gap(), full_gap, atol=1e-12)
+    npt.assert_array_less(engine.duality_gap(), 0.1)
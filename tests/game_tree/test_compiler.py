@@ -0,0 +1,35 @@
+import numpy as np
+from hamcrest import assert_that, close_to, equal_to
+from numpy import testing as npt
+
+from cfre.game_tree import CHANCE, TERMINAL, compile_game
+from cfre.kuhn.kuhn_rules import DEALS, KuhnRules
+
+
+def test_compileGame_kuhnSizes():
+    tree = compile_game(KuhnRules())
+
+    # Chance root, 6 deals and 8 histories after every deal
+    assert_that(tree.num_nodes, equal_to(1 + len(DEALS) * 9))
+    assert_that(len(tree.infoset_keys), equal_to(12))
+    assert_that(tree.player[0], equal_to(CHANCE))
+    assert_that(int((tree.player == TERMINAL).sum()), equal_to(len(DEALS) * 5))
+
+
+def test_compileGame_levelsAndChildrenAreContiguous():
+    tree = compile_game(KuhnRules())
+
+    for node in range(tree.num_nodes):
+        children = np.arange(tree.child_offsets[node], tree.child_offsets[node + 1])
+        npt.assert_array_equal(tree.parent[children], node)
+
+    for depth in range(1, tree.num_levels):
+        level = tree.level(depth)
+        parents = tree.parent[level]
+        npt.assert_array_equal(np.isin(parents, np.arange(tree.num_nodes)[tree.level(depth - 1)]), True)
+
+
+def test_compileGame_chanceProbabilitiesSumToOne():
+    tree = compile_game(KuhnRules())
+
+    assert_that(tree.chance_prob[tree.level(1)].sum(), close_to(1, 1e-12))
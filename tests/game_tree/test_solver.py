@@ -0,0 +1,25 @@
+from hamcrest import assert_that, close_to, less_than
+
+from cfre.game_tree import FlatCFRSolver, compile_game
+from cfre.kuhn.evaluation import baseline_policy, expected_value
+from cfre.kuhn.exploitability import infosets_exploitability
+from cfre.kuhn.information_set import InformationSetTable
+from cfre.kuhn.kuhn_rules import KuhnRules, NUM_ACTIONS
+
+
+def _kuhn_solver() -> FlatCFRSolver:
+    return FlatCFRSolver(compile_game(KuhnRules()), InformationSetTable(NUM_ACTIONS))
+
+
+def test_iterate_firstIterationValueIsUniformStrategiesValue():
+    uniform = baseline_policy('uniform')
+
+    assert_that(_kuhn_solver().iterate(), close_to(expected_value(uniform, uniform), 1e-12))
+
+
+def test_iterate_averageStrategyConverges():
+    solver = _kuhn_solver()
+    for _ in range(2000):
+        solver.iterate()
+
+    assert_that(infosets_exploitability(solver.information_sets), less_than(20))
@@ -0,0 +1,31 @@
+import os
+
+from click.testing import CliRunner
+from hamcrest import assert_that, contains_string, equal_to
+
+import cfre.kuhn
+from cfre.kuhn import run_kuhn_evaluation, run_kuhn_trainer
+from cfre.kuhn.information_set import InformationSetTable, load_saved_rounds, save_infosets
+from cfre.kuhn.kuhn_rules import NUM_ACTIONS
+
+
+def test_runKuhnTrainer_resumedRunSavesRoundsPlayedAfterLastCheck(tmp_path, monkeypatch):
+    path = os.path.join(tmp_path, 'infosets.bin')
+    monkeypatch.setattr(cfre.kuhn, 'LOGGING_FREQUENCY', 10)
+    monkeypatch.setattr(cfre.kuhn, 'NUM_ROUNDS', 25)
+    result = CliRunner().invoke(run_kuhn_trainer, ['-s', path, '--seed', '0'])
+    assert_that(result.exit_code, equal_to(0))
+    assert_that(load_saved_rounds(path), equal_to(25))
+
+    monkeypatch.setattr(cfre.kuhn, 'NUM_ROUNDS', 37)
+    result = CliRunner().invoke(run_kuhn_trainer, ['-l', path, '-s', path, '--seed', '0'])
+    assert_that(result.exit_code, equal_to(0))
+    assert_that(load_saved_rounds(path), equal_to(37))
+
+
+def test_runKuhnEvaluation_rejectsInfosetsOfOtherGames(tmp_path):
+    path = os.path.join(tmp_path, 'leduc.bin')
+    save_infosets(InformationSetTable(NUM_ACTIONS), path, game='leduc', rounds=0)
+    result = CliRunner().invoke(run_kuhn_evaluation, ['-l', path, '-n', '10'])
+    assert_that(result.exit_code, equal_to(2))
+    assert_that(result.output, contains_string('not of Kuhn Poker'))
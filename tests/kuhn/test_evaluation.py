@@ -0,0 +1,30 @@
+import numpy as np
+from hamcrest import assert_that, close_to, greater_than, less_than
+
+from cfre.kuhn.evaluation import baseline_policy, evaluate, expected_value, play_hands
+
+
+def test_expectedValue_alwaysBetAgainstEachOther():
+    always_bet = baseline_policy('always_bet')
+    # Every hand is a showdown for two chips and each player wins half of them
+    assert_that(expected_value(always_bet, always_bet), close_to(0, 1e-12))
+
+
+def test_expectedValue_betAgainstPass():
+    # Player 0 always bets and player 1 always folds to it
+    value = expected_value(baseline_policy('always_bet'), baseline_policy('always_pass'))
+    assert_that(value, close_to(1, 1e-12))
+
+
+def test_playHands_matchesExpectedValue():
+    policy0 = baseline_policy('uniform')
+    policy1 = baseline_policy('always_bet')
+    rewards = play_hands(policy0, policy1, 200000, np.random.default_rng(0))
+    assert_that(rewards.mean(), close_to(expected_value(policy0, policy1), 0.02))
+
+
+def test_evaluate_confidenceIntervalContainsExpectedReward():
+    result = evaluate(baseline_policy('uniform'), baseline_policy('always_pass'),
+                      100000, np.random.default_rng(1), batch_size=30000)
+    assert_that(result.expected_reward, greater_than(result.ci_low))
+    assert_that(result.expected_reward, less_than(result.ci_high))
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from hamcrest import assert_that, close_to, less_than
+
+from cfre.kuhn.evaluation import baseline_policy, expected_value
+from cfre.kuhn.exploitability import best_response_value, exploitability
+from cfre.kuhn.exploitability import infosets_exploitability
+from cfre.kuhn.kuhn_rules import GAME_TREE
+from cfre.kuhn.kuhn_trainer import KuhnTrainer
+from cfre.kuhn.policy import KuhnPolicy
+
+# Nash equilibrium in which player one never bets first
+NASH_STRATEGY = {
+    '1': [1, 0], '2': [1, 0], '3': [1, 0],
+    '1p': [2 / 3, 1 / 3], '2p': [1, 0], '3p': [0, 1],
+    '1b': [1, 0], '2b': [2 / 3, 1 / 3], '3b': [0, 1],
+    '1pb': [1, 0], '2pb': [2 / 3, 1 / 3], '3pb': [0, 1],
+}
+
+
+def _nash_policy():
+    probabilities = np.full((len(GAME_TREE), 3, 2), 0.5)
+    for node in GAME_TREE:
+        for card_id, key in enumerate(node.infoset_keys):
+            probabilities[node.node_id, card_id] = NASH_STRATEGY.get(key, [0.5, 0.5])
+
+    return KuhnPolicy(probabilities)
+
+
+def test_exploitability_nashEquilibriumIsZero():
+    assert_that(exploitability(_nash_policy()), close_to(0, 1e-9))
+
+
+def test_bestResponseValue_atLeastValueOfAnyStrategy():
+    policy = baseline_policy('uniform')
+    always_bet = baseline_policy('always_bet')
+    assert_that(expected_value(always_bet, policy),
+                less_than(best_response_value(policy, 0) + 1e-12))
+    assert_that(-expected_value(policy, always_bet),
+                less_than(best_response_value(policy, 1) + 1e-12))
+
+
+def test_exploitability_uniformStrategy():
+    assert_that(exploitability(baseline_policy('uniform')), close_to(458.333, 1e-3))
+
+
+def test_infosetsExploitability_decreasesWithTraining():
+    trainer = KuhnTrainer()
+    for _ in range(1000):
+        trainer.play_full_round()
+
+    assert_that(infosets_exploitability(trainer.information_sets), less_than(10))
+
+
+@pytest.mark.parametrize('algorithm', ['cfr+', 'linear', 'dcfr'])
+def test_infosetsExploitability_decreasesWithTrainingVariants(algorithm):
+    trainer = KuhnTrainer(algorithm=algorithm)
+    for _ in range(1000):
+        trainer.play_full_round()
+
+    assert_that(infosets_exploitability(trainer.information_sets), less_than(10))
@@ -0,0 +1,156 @@
+import copy
+import pickle
+
+import numpy as np
+import pytest
+from hamcrest import assert_that, equal_to
+from numpy import testing as npt
+
+from cfre.kuhn.information_set import InformationSet, InformationSetTable
+from cfre.kuhn.information_set import load_infosets, load_infosets_params, load_saved_rounds
+from cfre.kuhn.information_set import save_infosets
+
+
+def test_informationSetTable_indexCreatesRowsOnce():
+    table = InformationSetTable(2, capacity=1)
+    rows = [table.index(key) for key in ['1', '2pb', '1', '3b']]
+    assert_that(rows, equal_to([0, 1, 0, 2]))
+    assert_that(table.keys(), equal_to(['1', '2pb', '3b']))
+
+
+def test_informationSetTable_getStrategiesMatchesGetStrategy():
+    table = InformationSetTable(2)
+    single = InformationSetTable(2)
+    rows = table.rows(['1', '2', '3'])
+    single.rows(['1', '2', '3'])
+    regrets = np.array([[1., 3.], [-1., -2.], [0., 2.]])
+    table.update_regrets(rows, regrets)
+    for row, regret in zip(rows, regrets):
+        single.update_regret(row, regret)
+
+    weights = np.array([0.5, 1., 0.])
+    strategies = table.get_strategies(rows, weights)
+    for row, weight, strategy in zip(rows, weights, strategies):
+        npt.assert_allclose(single.get_strategy(row, weight), strategy)
+
+    npt.assert_allclose(strategies, [[0.25, 0.75], [0.5, 0.5], [0, 1]])
+    npt.assert_allclose(table.avg_strategies, single.avg_strategies)
+    npt.assert_allclose(table.total_weights, weights)
+
+
+def test_informationSetTable_fromInfosets():
+    iset = InformationSet(2)
+    iset.update_regret(np.array([2., 1.]))
+    iset.get_strategy(1.)
+    table = InformationSetTable.from_infosets({'2pb': iset})
+    npt.assert_allclose(table.avg_strategy('2pb'), iset.avg_strategy)
+    npt.assert_allclose(table.total_regrets[0], [2, 1])
+
+
+def test_informationSetTable_mergeSumsUpdatesOfCopies():
+    table = InformationSetTable(2)
+    row = table.index('1')
+    table.update_regret(row, np.array([1., 0.]))
+    table.get_strategy(row, 1.)
+
+    worker1 = copy.deepcopy(table)
+    worker1.update_regret(row, np.array([0., 2.]))
+    worker1.get_strategy(row, 1.)
+    worker2 = copy.deepcopy(table)
+    worker2.update_regret(worker2.index('2p'), np.array([1., 1.]))
+    worker2.get_strategy(worker2.index('2p'), 2.)
+
+    table.merge([worker1, worker2])
+    npt.assert_allclose(table.total_regrets, [[1, 2], [1, 1]])
+    npt.assert_allclose(table.total_weights, [2, 2])
+    # Average of strategy [1, 0] and [1/3, 2/3] played with equal weights
+    npt.assert_allclose(table.avg_strategy('1'), [2 / 3, 1 / 3])
+    npt.assert_allclose(table.avg_strategy('2p'), [0.5, 0.5])
+
+
+def test_informationSetTable_mergeDiscountsBaseOnce():
+    table = InformationSetTable(2, algorithm='dcfr')
+    row = table.index('1')
+    table.update_regret(row, np.array([-4., 2.]))
+    table.get_strategy(row, 1.)
+    sequential = copy.deepcopy(table)
+    for _ in range(2):
+        sequential.end_iteration()
+
+    # Copies which only discount add nothing on top of the discounted base
+    workers = [copy.deepcopy(table) for _ in range(2)]
+    for worker in workers:
+        worker.end_iteration()
+
+    table.merge(workers)
+    npt.assert_allclose(table.total_regrets, sequential.total_regrets)
+    npt.assert_allclose(table.total_weights, sequential.total_weights)
+
+
+def _trained_table():
+    table = InformationSetTable(2)
+    rows = table.rows(['1', '2pb', '3b'])
+    table.update_regrets(rows, np.array([[1., 3.], [-1., 2.], [0., 0.]]))
+    table.get_strategies(rows, np.array([0.5, 1., 2.]))
+    return table
+
+
+@pytest.mark.parametrize('mmap', [False, True])
+def test_saveInfosets_roundTrip(tmp_path, mmap):
+    table = _trained_table()
+    path = str(tmp_path / 'infosets.bin')
+    save_infosets(table, path, game='kuhn')
+
+    loaded = load_infosets(path, mmap=mmap)
+    assert_that(loaded.keys(), equal_to(table.keys()))
+    npt.assert_array_equal(loaded.total_regrets, table.total_regrets)
+    npt.assert_array_equal(loaded.avg_strategies, table.avg_strategies)
+    npt.assert_array_equal(loaded.total_weights, table.total_weights)
+    assert_that(load_infosets_params(path), equal_to({'game': 'kuhn'}))
+
+
+def test_loadInfosets_legacyPickle(tmp_path):
+    iset = InformationSet(2)
+    iset.update_regret(np.array([2., 1.]))
+    iset.get_strategy(1.)
+    path = str(tmp_path / 'infosets.pkl')
+    with open(path, 'wb') as f:
+        pickle.dump({'2pb': iset}, f)
+
+    npt.assert_allclose(load_infosets(path).avg_strategy('2pb'), iset.avg_strategy)
+    # Legacy pickles do not store played rounds
+    assert_that(load_saved_rounds(path), equal_to(0))
+
+
+def test_informationSetTable_cfrPlusFloorsRegrets():
+    table = InformationSetTable(2, algorithm='cfr+')
+    row = table.index('1')
+    table.update_regret(row, np.array([-3., 2.]))
+    table.end_iteration()
+    npt.assert_allclose(table.total_regrets[row], [0, 2])
+
+
+def test_informationSetTable_linearWeightsLaterStrategiesMore():
+    table = InformationSetTable(2, algorithm='linear')
+    row = table.index('1')
+    table.update_regret(row, np.array([1., 0.]))
+    table.get_strategy(row, 1.)
+    table.end_iteration()
+    table.update_regret(row, np.array([-2., 1.]))
+    table.get_strategy(row, 1.)
+    table.end_iteration()
+    # Strategies [1, 0] and [0, 1] are averaged with weights 1 and 2
+    npt.assert_allclose(table.avg_strategy('1'), [1 / 3, 2 / 3])
+
+
+@pytest.mark.parametrize('algorithm', ['vanilla', 'cfr+', 'linear', 'dcfr'])
+def test_saveInfosets_storesAlgorithm(tmp_path, algorithm):
+    table = InformationSetTable(2, algorithm=algorithm)
+    table.index('1')
+    table.end_iteration()
+    path = str(tmp_path / 'infosets.bin')
+    save_infosets(table, path)
+
+    loaded = load_infosets(path)
+    assert_that(loaded.algorithm, equal_to(algorithm))
+    assert_that(loaded.iteration, equal_to(1))
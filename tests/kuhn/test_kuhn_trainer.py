@@ -0,0 +1,39 @@
+import numpy as np
+from hamcrest import assert_that, close_to, equal_to
+from numpy import testing as npt
+
+from cfre.kuhn.kuhn_rules import GAME_TREE
+from cfre.kuhn.kuhn_trainer import KuhnTrainer
+
+
+def test_gameTree_coversAllHistories():
+    histories = sorted(node.history for node in GAME_TREE)
+    npt.assert_array_equal(histories, sorted(['', 'p', 'b', 'pp', 'pb', 'bp', 'bb', 'pbp', 'pbb']))
+
+
+def test_playFullRound_convergesToNashEquilibrium():
+    trainer = KuhnTrainer()
+    for _ in range(2000):
+        trainer.play_full_round()
+
+    infosets = trainer.information_sets
+    # Dominated choices of the Nash equilibrium family
+    npt.assert_allclose(infosets.avg_strategy('1b'), [1, 0], atol=0.01)
+    npt.assert_allclose(infosets.avg_strategy('3b'), [0, 1], atol=0.01)
+    npt.assert_allclose(infosets.avg_strategy('2p'), [1, 0], atol=0.01)
+    # Player two calls a bet with the middle card a third of the time
+    assert_that(infosets.avg_strategy('2b')[1], close_to(1 / 3, 0.02))
+    # Player one bets with the highest card three times as often as with the lowest
+    alpha = infosets.avg_strategy('1')[1]
+    assert_that(infosets.avg_strategy('3')[1], close_to(3 * alpha, 0.05))
+
+
+def test_playRound_sameSeedSameInfosets():
+    trainers = [KuhnTrainer(rng=np.random.default_rng(5)) for _ in range(2)]
+    for trainer in trainers:
+        for _ in range(200):
+            trainer.play_round()
+
+    infosets1, infosets2 = [t.information_sets for t in trainers]
+    assert_that(infosets1.keys(), equal_to(infosets2.keys()))
+    npt.assert_array_equal(infosets1.total_regrets, infosets2.total_regrets)
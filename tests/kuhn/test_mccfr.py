@@ -0,0 +1,27 @@
+import pytest
+from hamcrest import assert_that, less_than
+from numpy import testing as npt
+
+from cfre.kuhn.exploitability import infosets_exploitability
+from cfre.kuhn.mccfr import MCCFRTrainer
+
+
+@pytest.mark.parametrize('sampling', ['external', 'outcome'])
+def test_mccfrTrainer_sameSeedSameInfosets(sampling):
+    trainers = [MCCFRTrainer(sampling=sampling, seed=7) for _ in range(2)]
+    for trainer in trainers:
+        for _ in range(100):
+            trainer.play_round()
+
+    infosets1, infosets2 = [t.information_sets for t in trainers]
+    npt.assert_array_equal(infosets1.total_regrets, infosets2.total_regrets)
+    npt.assert_array_equal(infosets1.avg_strategies, infosets2.avg_strategies)
+
+
+@pytest.mark.parametrize('sampling, max_exploitability', [('external', 20), ('outcome', 60)])
+def test_mccfrTrainer_converges(sampling, max_exploitability):
+    trainer = MCCFRTrainer(sampling=sampling, seed=2)
+    for _ in range(5000):
+        trainer.play_round()
+
+    assert_that(infosets_exploitability(trainer.information_sets), less_than(max_exploitability))
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from hamcrest import assert_that, equal_to, less_than
+
+from cfre.kuhn.exploitability import infosets_exploitability
+from cfre.kuhn.information_set import InformationSetTable
+from cfre.kuhn.kuhn_rules import NUM_ACTIONS
+from cfre.kuhn.kuhn_trainer import create_round_function
+from cfre.kuhn.parallel import ParallelKuhnTrainer, _train_shard, default_sync_interval
+
+
+def test_parallelKuhnTrainer_discountedUpdatesReduceExploitability():
+    with ParallelKuhnTrainer(4, 10, algorithm='dcfr', seed=0) as trainer:
+        for _ in range(10):
+            trainer.train()
+
+        early_exploitability = infosets_exploitability(trainer.information_sets)
+        for _ in range(190):
+            trainer.train()
+
+        exploitability = infosets_exploitability(trainer.information_sets)
+
+    assert_that(early_exploitability, less_than(100))
+    assert_that(exploitability, less_than(early_exploitability / 2))
+
+
+def test_parallelKuhnTrainer_workersSampleDistinctDeals():
+    seeds = np.random.SeedSequence(0).spawn(2)
+    tables = [_train_shard(InformationSetTable(NUM_ACTIONS), 50, 'chance', seed)[0]
+              for seed in seeds]
+    assert_that(np.array_equal(tables[0].avg_strategies, tables[1].avg_strategies),
+                equal_to(False))
+
+
+def test_parallelKuhnTrainer_rejectsFullWidthMode():
+    with pytest.raises(ValueError):
+        ParallelKuhnTrainer(2, 10, mode='full-width')
+
+
+def test_parallelKuhnTrainer_defaultSyncIntervalStaysCloseToSequentialTraining():
+    num_rounds = 10000
+    sequential = InformationSetTable(NUM_ACTIONS, algorithm='dcfr')
+    play_round = create_round_function('chance', sequential, np.random.default_rng(0))
+    for _ in range(num_rounds):
+        play_round()
+
+    sync_interval = default_sync_interval(4)
+    with ParallelKuhnTrainer(4, sync_interval, algorithm='dcfr', seed=0) as trainer:
+        for _ in range(num_rounds // (4 * sync_interval)):
+            trainer.train()
+
+        exploitability = infosets_exploitability(trainer.information_sets)
+
+    assert_that(exploitability, less_than(2 * infosets_exploitability(sequential)))
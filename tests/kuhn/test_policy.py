@@ -0,0 +1,42 @@
+import numpy as np
+from hamcrest import assert_that, equal_to
+from numpy import testing as npt
+
+from cfre.kuhn.information_set import InformationSetTable
+from cfre.kuhn.kuhn_rules import CARDS, GAME_TREE, NUM_ACTIONS
+from cfre.kuhn.policy import KuhnPolicy
+
+
+def test_kuhnPolicy_fromInfosetsUsesAverageStrategy():
+    infosets = InformationSetTable(NUM_ACTIONS)
+    row = infosets.index('2pb')
+    infosets.update_regret(row, np.array([1., 3.]))
+    infosets.get_strategy(row, 1.)
+
+    policy = KuhnPolicy.from_infosets(infosets)
+    node = next(n for n in GAME_TREE if n.history == 'pb')
+    npt.assert_allclose(policy.probabilities[node.node_id, CARDS.index(2)], [0.25, 0.75])
+    # Infosets missing from the table are played uniformly at random
+    npt.assert_allclose(policy.probabilities[node.node_id, CARDS.index(1)], [0.5, 0.5])
+
+
+def test_kuhnPolicy_sampleNeverPicksZeroProbabilityActions():
+    probabilities = np.zeros((len(GAME_TREE), len(CARDS), NUM_ACTIONS))
+    probabilities[..., 1] = 1
+    probabilities[0, 0] = [1, 0]
+    policy = KuhnPolicy(probabilities, np.random.default_rng(0))
+
+    node_ids = np.repeat([0, 1], 1000)
+    card_ids = np.zeros(2000, dtype=int)
+    actions = policy.sample(node_ids, card_ids)
+    npt.assert_array_equal(actions, np.repeat([0, 1], 1000))
+    assert_that(policy.act(0, 0), equal_to(0))
+
+
+def test_kuhnPolicy_sampleFrequencies():
+    probabilities = np.full((len(GAME_TREE), len(CARDS), NUM_ACTIONS), 0.5)
+    probabilities[0, 2] = [0.2, 0.8]
+    policy = KuhnPolicy(probabilities, np.random.default_rng(0))
+
+    actions = policy.sample(np.zeros(100000, dtype=int), np.full(100000, 2))
+    npt.assert_allclose(actions.mean(), 0.8, atol=0.01)
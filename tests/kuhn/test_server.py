@@ -0,0 +1,81 @@
+import asyncio
+
+import numpy as np
+from hamcrest import assert_that, contains_string, equal_to, starts_with
+
+from cfre.kuhn.policy import KuhnPolicy
+from cfre.kuhn.server import KuhnServer, KuhnSession
+
+
+def _always_pass_server() -> KuhnServer:
+    return KuhnServer(KuhnPolicy.constant(np.array([1., 0.])), np.random.default_rng(0))
+
+
+def test_kuhnServer_passesUntilShowdown():
+    server = _always_pass_server()
+    session = KuhnSession()
+    messages = server.start_hand(session)
+    assert_that(messages[-1], starts_with('Current state: '))
+
+    messages = server.handle(session, 'p\n')
+    assert_that(session.num_hands, equal_to(1))
+    assert_that(messages[0], starts_with('Game over after "pp"'))
+    # Next hand starts right away with switched seats
+    assert_that(session.user_player, equal_to(1))
+    assert_that(messages[-1], contains_string('Current state: '))
+
+
+def test_kuhnServer_rejectsInvalidAction():
+    server = _always_pass_server()
+    session = KuhnSession()
+    server.start_hand(session)
+    node_id = session.node_id
+    messages = server.handle(session, 'x')
+    assert_that(messages[0], starts_with('Invalid action.'))
+    assert_that(session.node_id, equal_to(node_id))
+
+
+def test_serveTcp_manyConcurrentSessions():
+    server = _always_pass_server()
+
+    async def play(port: int, num_hands: int):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        lines = []
+        while len([line for line in lines if line.startswith('Game over')]) < num_hands:
+            line = (await reader.readline()).decode()
+            lines.append(line)
+            if line.startswith('Current state: '):
+                writer.write(b'p\n')
+
+        writer.write(b'q\n')
+        lines.extend((await reader.read()).decode().splitlines())
+        writer.close()
+        return lines
+
+    async def run():
+        tcp_server = await asyncio.start_server(server.serve_client, '127.0.0.1', 0)
+        port = tcp_server.sockets[0].getsockname()[1]
+        async with tcp_server:
+            return await asyncio.gather(*(play(port, 3) for _ in range(50)))
+
+    for lines in asyncio.run(run()):
+        assert_that(lines[-1], starts_with('Thanks for playing!'))
+
+
+def test_serveClient_survivesMalformedInput():
+    server = _always_pass_server()
+
+    async def run():
+        tcp_server = await asyncio.start_server(server.serve_client, '127.0.0.1', 0)
+        port = tcp_server.sockets[0].getsockname()[1]
+        async with tcp_server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'\xff\xfe\n' + b'x' * 100000 + b'\n')
+            lines = (await reader.read()).decode().splitlines()
+            writer.close()
+            return lines
+
+    lines = asyncio.run(run())
+    assert_that(lines[-3], starts_with('Invalid input'))
+    assert_that(lines[-2], starts_with('Line too long'))
+    assert_that(lines[-1], starts_with('Thanks for playing!'))
@@ -0,0 +1,80 @@
+import os
+import time
+
+import numpy as np
+from hamcrest import assert_that, contains_string, equal_to, greater_than, starts_with
+
+from cfre.kuhn.information_set import InformationSetTable, load_infosets, save_infosets
+from cfre.kuhn.kuhn_rules import GAME_TREE, NUM_ACTIONS
+from cfre.kuhn.server import KuhnServer, KuhnSession
+from cfre.kuhn.snapshots import BackgroundTrainer, SnapshotWatcher, publish_snapshot
+from cfre.kuhn.snapshots import snapshot_generation
+
+
+def _constant_infosets(strategy: np.array) -> InformationSetTable:
+    keys = [key for node in GAME_TREE if not node.is_terminal for key in node.infoset_keys]
+    return InformationSetTable.from_arrays(keys, np.zeros((len(keys), NUM_ACTIONS)),
+                                           np.tile(strategy, (len(keys), 1)),
+                                           np.ones(len(keys)))
+
+
+def test_snapshotWatcher_picksUpOnlyNewerGenerations(tmp_path):
+    path = os.path.join(tmp_path, 'snapshot.bin')
+    publish_snapshot(_constant_infosets([1., 0.]), path, generation=2, rounds=0)
+    watcher = SnapshotWatcher(path)
+    assert_that(watcher.refresh(), equal_to(False))
+
+    publish_snapshot(_constant_infosets([0., 1.]), path, generation=1, rounds=0)
+    assert_that(watcher.refresh(), equal_to(False))
+    publish_snapshot(_constant_infosets([0., 1.]), path, generation=3, rounds=0)
+    assert_that(watcher.refresh(), equal_to(True))
+    assert_that(watcher.generation, equal_to(3))
+    np.testing.assert_array_equal(watcher.policy.probabilities[0, 0], [0, 1])
+
+
+def test_kuhnServer_sessionSwitchesSnapshotBetweenHands(tmp_path):
+    path = os.path.join(tmp_path, 'snapshot.bin')
+    publish_snapshot(_constant_infosets([1., 0.]), path, generation=1, rounds=0)
+    watcher = SnapshotWatcher(path)
+    server = KuhnServer(watcher.policy, np.random.default_rng(0), watcher)
+    session = KuhnSession()
+    server.start_hand(session)
+    server.handle(session, 'p')
+    # Second hand, bot acts first and passes
+    assert_that(GAME_TREE[session.node_id].history, equal_to('p'))
+
+    publish_snapshot(_constant_infosets([0., 1.]), path, generation=2, rounds=0)
+    assert_that(server.refresh_snapshot(), equal_to(True))
+    # Hand in progress finishes with the old snapshot, the next one uses the new one
+    messages = server.handle(session, 'p')
+    assert_that(messages[0], starts_with('Game over after "pp"'))
+    server.handle(session, 'p')
+    assert_that(GAME_TREE[session.node_id].history, equal_to('pb'))
+
+
+def test_backgroundTrainer_publishesNewGenerationsNextToLoadedInfosets(tmp_path):
+    loadpath = os.path.join(tmp_path, 'infosets.bin')
+    path = os.path.join(tmp_path, 'snapshot.bin')
+    save_infosets(InformationSetTable(NUM_ACTIONS), loadpath, game='kuhn', rounds=0)
+    with BackgroundTrainer(loadpath, path, publish_interval=100,
+                           seed=np.random.SeedSequence(0)):
+        deadline = time.monotonic() + 30
+        while snapshot_generation(path) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    assert_that(snapshot_generation(path), greater_than(1))
+    watcher = SnapshotWatcher(path)
+    assert_that(watcher.policy.probabilities[0, 0, 0], greater_than(0))
+    assert_that(load_infosets(loadpath).keys(), equal_to([]))
+
+
+def test_backgroundTrainer_logsExitCodeOfFailedTraining(tmp_path, caplog):
+    loadpath = os.path.join(tmp_path, 'infosets.bin')
+    save_infosets(InformationSetTable(NUM_ACTIONS), loadpath, game='kuhn', rounds=0)
+    with BackgroundTrainer(loadpath, os.path.join(tmp_path, 'snapshot.bin'),
+                           publish_interval=100, mode='unknown') as trainer:
+        deadline = time.monotonic() + 30
+        while trainer.poll() and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    assert_that(caplog.text, contains_string('exited with code 1'))
@@ -0,0 +1,42 @@
+from hamcrest import assert_that, close_to, equal_to
+
+from cfre.game_tree import CHANCE, TERMINAL
+from cfre.leduc.leduc_rules import ACTION_TO_VALUE, LEDUC_TREE, LeducRules
+
+
+def test_leducTree_standardSize():
+    assert_that(len(LEDUC_TREE.infoset_keys), equal_to(288))
+    assert_that(LEDUC_TREE.player[0], equal_to(CHANCE))
+
+
+def test_leducTree_chanceProbabilitiesSumToOne():
+    deals = LEDUC_TREE.level(1)
+
+    assert_that(LEDUC_TREE.chance_prob[deals].sum(), close_to(1, 1e-12))
+
+
+def test_terminalUtility_foldLosesContribution():
+    rules = LeducRules()
+    # Player 0 bets 2 and player 1 raises by 2 more, then player 0 folds
+    state = ((0, 2), None, 'rrf')
+
+    assert_that(rules.is_terminal(state), equal_to(True))
+    assert_that(rules.terminal_utility(state), equal_to(-3))
+
+
+def test_terminalUtility_pairWinsShowdown():
+    rules = LeducRules()
+    # Both check in the first round, player 1 bets 4 in the second and is called
+    state = ((0, 2), 0, 'cc/rc')
+
+    assert_that(rules.is_terminal(state), equal_to(True))
+    assert_that(rules.terminal_utility(state), equal_to(5))
+
+
+def test_legalActions_noRaiseAfterTwoRaises():
+    rules = LeducRules()
+
+    assert_that(list(rules.legal_actions(((0, 1), None, 'rr'))),
+                equal_to([ACTION_TO_VALUE['f'], ACTION_TO_VALUE['c']]))
+    assert_that(list(rules.legal_actions(((0, 1), None, ''))),
+                equal_to([ACTION_TO_VALUE['c'], ACTION_TO_VALUE['r']]))
@@ -0,0 +1,25 @@
+from hamcrest import assert_that, close_to, greater_than, less_than
+
+from cfre.game_tree import best_response_value
+from cfre.kuhn.information_set import InformationSetTable
+from cfre.leduc.leduc_rules import LEDUC_TREE, NUM_ACTIONS
+from cfre.leduc.leduc_trainer import LeducTrainer, infosets_exploitability, leduc_strategies
+
+
+def test_leducStrategies_emptyInfosetsAreUniformOverLegalActions():
+    strategies = leduc_strategies(InformationSetTable(NUM_ACTIONS))
+
+    assert_that(strategies[~LEDUC_TREE.legal_actions].sum(), close_to(0, 1e-12))
+    assert_that(strategies.sum(), close_to(len(LEDUC_TREE.infoset_keys), 1e-9))
+
+
+def test_playRound_cfrPlusConverges():
+    trainer = LeducTrainer(algorithm='cfr+')
+    for _ in range(1000):
+        trainer.play_round()
+
+    assert_that(infosets_exploitability(trainer.information_sets), less_than(10))
+    # Best responses bound the value of Leduc Hold'em for the first player, about -0.0856
+    strategies = leduc_strategies(trainer.information_sets)
+    assert_that(best_response_value(LEDUC_TREE, strategies, 0), greater_than(-0.0856))
+    assert_that(-best_response_value(LEDUC_TREE, strategies, 1), less_than(-0.0856))
@@ -0,0 +1,64 @@
+import time
+
+import numpy as np
+import pytest
+from hamcrest import assert_that, equal_to
+from numpy import testing as npt
+
+from cfre.utils.dynamic_plots import DynamicPlot, SubplotConfig, render_metrics
+from cfre.utils.metrics import BackgroundSink, RingBuffer, file_sink, load_metrics
+
+
+def test_ringBuffer_keepsLatestSamplesInOrder():
+    buffer = RingBuffer(3, 2)
+    for step in range(5):
+        buffer.append(step, [step, -step])
+
+    assert_that(len(buffer), equal_to(3))
+    npt.assert_array_equal(buffer.steps, [2, 3, 4])
+    npt.assert_array_equal(buffer.values, [[2, -2], [3, -3], [4, -4]])
+
+
+@pytest.mark.parametrize('extension', ['csv', 'npy'])
+def test_fileSink_backgroundWritesLoadBack(tmp_path, extension):
+    path = str(tmp_path / f'metrics.{extension}')
+    values = np.random.default_rng(0).random((50, 3))
+    with BackgroundSink(file_sink(path, ['a', 'b', 'c'])) as sink:
+        for step, row in enumerate(values):
+            sink.record(10 * step, row)
+
+    names, steps, loaded = load_metrics(path)
+    assert_that(names, equal_to(['a', 'b', 'c']))
+    npt.assert_array_equal(steps, np.arange(50) * 10)
+    npt.assert_array_equal(loaded, values)
+
+
+def test_npySink_readableBeforeClose(tmp_path):
+    path = str(tmp_path / 'metrics.npy')
+    with BackgroundSink(file_sink(path, ['a'])) as sink:
+        for step in range(3):
+            sink.record(step, [step / 2])
+
+        deadline = time.monotonic() + 5
+        while len(load_metrics(path)[1]) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        _, steps, loaded = load_metrics(path)
+        npt.assert_array_equal(steps, [0, 1, 2])
+        npt.assert_array_equal(loaded, [[0], [0.5], [1]])
+
+
+def test_dynamicPlot_headlessSavesAndRendersOffline(tmp_path):
+    labels = [f'strategy {i}' for i in range(20)]
+    plot = DynamicPlot([SubplotConfig('Strategies', labels=labels, max_lines=3),
+                        SubplotConfig('Gap')], live=False)
+    metrics_path = str(tmp_path / 'metrics.csv')
+    with file_sink(metrics_path, plot.names) as sink:
+        for step in range(10):
+            values = np.append(np.linspace(0, 1, 20), 1 / (step + 1))
+            plot.record(step, values)
+            sink.record(step, values)
+
+    plot.save(str(tmp_path / 'plot.png'))
+    render_metrics(metrics_path, str(tmp_path / 'rendered.png'), max_lines=3)
+    assert_that((tmp_path / 'plot.png').exists() and (tmp_path / 'rendered.png').exists(), equal_to(True))
@@ -0,0 +1,30 @@
+from hamcrest import assert_that, equal_to, greater_than
+
+from cfre.utils.profiling import Profiler
+
+
+def test_profiler_disabledRecordsNothing():
+    profiler = Profiler()
+    square = profiler.timed('square')(lambda x: x * x)
+    with profiler.timer('block'):
+        assert_that(square(3), equal_to(9))
+
+    assert_that(dict(profiler._times), equal_to({}))
+
+
+def test_profiler_enabledTimesPhasesAndReportResets():
+    profiler = Profiler()
+    profiler.enable()
+    square = profiler.timed('square')(lambda x: x * x)
+    for i in range(3):
+        with profiler.timer('block'):
+            square(i)
+    profiler.count('visits', 5)
+
+    assert_that(profiler._calls['square'], equal_to(3))
+    assert_that(profiler._calls['block'], equal_to(3))
+    assert_that(profiler._times['block'], greater_than(0))
+    assert_that(profiler._counts['visits'], equal_to(5))
+
+    profiler.report(3)
+    assert_that(dict(profiler._calls), equal_to({}))
@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+from hamcrest import assert_that, equal_to, greater_than, less_than
+from numpy import testing as npt
+
+from cfre.blotto.payoffs import BlottoPayoffs
+from cfre.rps.rps_bot import RPS_PAYOFFS, create_rps_engine
+from cfre.utils.regret_matching import MatrixPayoffs, PrunedRegretMatching
+from cfre.utils.regret_matching import RegretMatching, sample_actions
+
+
+def test_matrixPayoffs_columnsPerOpponentAction():
+    payoffs = MatrixPayoffs(np.arange(6).reshape(2, 3))
+    npt.assert_array_equal(payoffs.columns(np.array([2, 0])), [[2, 5], [0, 3]])
+
+
+def test_sampleActions_deterministicStrategies():
+    strategies = np.array([[0, 1, 0], [0, 0, 1], [1, 0, 0]])
+    npt.assert_array_equal(sample_actions(strategies, np.random.default_rng(0)), [1, 2, 0])
+
+
+def test_regretMatching_selfPlayConvergesToUniform():
+    engine = RegretMatching(RPS_PAYOFFS, num_runs=4, rng=np.random.default_rng(0))
+    for _ in range(5000):
+        engine.act()
+        engine.update_regret(engine.act(perform_update=False))
+
+    assert_that(engine.avg_strategy.shape, equal_to((4, 3)))
+    npt.assert_allclose(engine.avg_strategy, 1 / 3, atol=0.05)
+
+
+def test_regretMatching_runsAreIndependent():
+    engine = RegretMatching(RPS_PAYOFFS, num_runs=2, rng=np.random.default_rng(0))
+    for _ in range(50):
+        engine.act()
+        # Only the first run ever faces rock
+        engine.update_regret(np.array([0, 1]))
+
+    # Paper beats rock and scissors beat paper
+    assert_that(engine.avg_strategy[0].argmax(), equal_to(1))
+    assert_that(engine.avg_strategy[1].argmax(), equal_to(2))
+
+
+def test_createRpsEngine_flooredRegretsLearnBestResponse():
+    engine = create_rps_engine(num_runs=3)
+    rng = np.random.default_rng(0)
+    opponent_strategies = np.broadcast_to([0.4, 0.3, 0.3], (3, 3))
+    for _ in range(2000):
+        engine.act()
+        engine.update_regret(sample_actions(opponent_strategies, rng))
+
+    assert_that(engine.avg_strategy[:, 1].min(), greater_than(0.5))
+
+
+def test_expectedUpdate_selfPlayDualityGapVanishes():
+    engine = create_rps_engine(num_runs=2)
+    engine.expected_update()
+    initial_gap = engine.duality_gap()
+    for _ in range(1000):
+        engine.expected_update()
+
+    npt.assert_array_less(engine.duality_gap(), initial_gap)
+    npt.assert_array_less(engine.duality_gap(), 0.05)
+    # Deterministic updates give the same strategy in every run
+    npt.assert_array_equal(engine.avg_strategy[0], engine.avg_strategy[1])
+
+
+def test_dualityGap_zeroForBestResponseToFixedOpponent():
+    engine = create_rps_engine(default_strategy=[0, 1, 0])
+    opponent_strategies = np.array([[0.4, 0.3, 0.3]])
+    # No regret is ever positive against this opponent, so paper is played throughout
+    for _ in range(10):
+        engine.expected_update(opponent_strategies)
+
+    npt.assert_allclose(engine.duality_gap(opponent_strategies), 0, atol=1e-12)
+
+
+@pytest.mark.parametrize('default_strategy', [None, np.eye(21)[0]])
+def test_prunedRegretMatching_expectedMatchesUnprunedUpToRounding(default_strategy):
+    payoffs = BlottoPayoffs(5, 3)
+    engine = RegretMatching(payoffs, num_runs=2, default_strategy=default_strategy)
+    pruned = PrunedRegretMatching(payoffs, num_runs=2, default_strategy=default_strategy)
+    # Rounding differences grow over longer horizons, e.g. after ties in self-play break
+    for _ in range(60):
+        engine.expected_update()
+        pruned.expected_update()
+
+    assert_that(pruned.num_active.max(), less_than(payoffs.num_pure_strategies))
+    npt.assert_allclose(pruned.avg_strategy, engine.avg_strategy, atol=1e-9)
+    npt.assert_allclose(pruned.duality_gap(), engine.duality_gap(), atol=1e-9)
+
+
+def test_prunedRegretMatching_sampledActionsMatchUnprunedUpToRounding():
+    payoffs = BlottoPayoffs(5, 3)
+    engine = RegretMatching(payoffs, num_runs=3, rng=np.random.default_rng(0))
+    pruned = PrunedRegretMatching(payoffs, num_runs=3, rng=np.random.default_rng(0))
+    for _ in range(100):
+        actions = engine.act()
+        npt.assert_array_equal(pruned.act(), actions)
+        opponent_actions = engine.act(perform_update=False)
+        npt.assert_array_equal(pruned.act(perform_update=False), opponent_actions)
+        engine.update_regret(opponent_actions)
+        pruned.update_regret(opponent_actions)
+
+    npt.assert_allclose(pruned.avg_strategy, engine.avg_strategy, atol=1e-9)
+
+
+def test_regretMatching_strategiesCachedUntilRegretsChange():
+    engine = RegretMatching(RPS_PAYOFFS, rng=np.random.default_rng(0))
+    strategies = engine.current_strategies()
+    engine.act(perform_update=False)
+    assert_that(engine.current_strategies() is strategies, equal_to(True))
+
+    engine.act()
+    engine.update_regret(np.array([0]))
+    npt.assert_array_equal(engine.current_strategies(), [[0, 1, 0]])
@@ -0,0 +1,35 @@
+import numpy as np
+from numpy import testing as npt
+
+from cfre.utils.sampling import AliasTable, CdfTable
+
+
+def test_cdfTable_matchesCountOfCumulativeSumsBelowThresholds():
+    strategies = np.random.default_rng(1).dirichlet(np.ones(7), 500)
+    strategies[:, 3] = 0
+    strategies /= strategies.sum(axis=1, keepdims=True)
+    thresholds = np.random.default_rng(0).random(len(strategies))
+    expected = (strategies.cumsum(axis=1) <= thresholds[:, np.newaxis]).sum(axis=1)
+
+    actions = CdfTable(strategies).sample(np.random.default_rng(0))
+    npt.assert_array_equal(actions, np.minimum(expected, 6))
+
+
+def test_aliasTable_frequenciesMatchProbabilities():
+    probabilities = np.array([[0.1, 0.0, 0.6, 0.3], [0.25, 0.25, 0.25, 0.25]])
+    samples = AliasTable(probabilities).sample(np.random.default_rng(0), size=100000)
+    for row, row_samples in zip(probabilities, samples):
+        npt.assert_allclose(np.bincount(row_samples, minlength=4) / 100000, row, atol=0.01)
+
+
+def test_aliasTable_singleSamplePerRow():
+    probabilities = np.array([[0, 1, 0], [0, 0, 1], [1, 0, 0]])
+    npt.assert_array_equal(AliasTable(probabilities).sample(np.random.default_rng(0)), [1, 2, 0])
+
+
+def test_cdfTable_singleRowMatchesBatchedRows():
+    strategy = np.array([[0.2, 0.0, 0.5, 0.3]])
+    rng = np.random.default_rng(0)
+    single = [CdfTable(strategy).sample(rng)[0] for _ in range(1000)]
+    batched = CdfTable(np.repeat(strategy, 1000, axis=0)).sample(np.random.default_rng(0))
+    npt.assert_array_equal(single, batched)
@@ -0,0 +1,55 @@
+import numpy as np
+from hamcrest import assert_that, equal_to, is_
+
+from cfre.utils.scheduler import TrainingScheduler, load_checkpoint, save_checkpoint
+
+
+def test_trainingScheduler_runsAllRounds():
+    scheduler = TrainingScheduler(10, 3)
+    assert_that(list(scheduler.rounds()), equal_to(list(range(10))))
+    assert_that(scheduler.stopped, is_(True))
+
+
+def test_trainingScheduler_resumesFromStartRound():
+    scheduler = TrainingScheduler(10, 3)
+    assert_that(list(scheduler.rounds(start_round=7)), equal_to([7, 8, 9]))
+
+
+def test_trainingScheduler_isCheckRoundWithSteps():
+    scheduler = TrainingScheduler(100, 10)
+    checks = [i for i in range(0, 100, 4) if scheduler.is_check_round(i, step=4)]
+    assert_that(checks, equal_to([0, 8, 20, 28, 40, 48, 60, 68, 80, 88]))
+
+
+def test_trainingScheduler_stopsOnceStrategyConverges():
+    scheduler = TrainingScheduler(100, 1, strategy_tolerance=0.01)
+    played = []
+    for i in scheduler.rounds():
+        played.append(i)
+        scheduler.check(i, strategy=np.array([1 / (i + 1), 1 - 1 / (i + 1)]))
+
+    # Strategy changes by 1/(i * (i + 1)), which first drops below 0.01 at i = 10
+    assert_that(played[-1], equal_to(10))
+
+
+def test_trainingScheduler_stopsOnceMetricReachesTarget():
+    scheduler = TrainingScheduler(100, 5, target_metric=2)
+    played = []
+    for i in scheduler.rounds():
+        played.append(i)
+        if scheduler.is_check_round(i):
+            scheduler.check(i, metric=100 / (i + 1))
+
+    # Metric drops to 2 at round 49 and the next check is at round 50
+    assert_that(played[-1], equal_to(50))
+
+
+def test_trainingScheduler_stopsWhenOutOfTime():
+    scheduler = TrainingScheduler(100, 5, time_budget=0)
+    assert_that(list(scheduler.rounds()), equal_to([]))
+
+
+def test_saveCheckpoint_roundTrip(tmp_path):
+    path = str(tmp_path / 'bot.pkl')
+    save_checkpoint(path, 42, {'regret': [1, 2]})
+    assert_that(load_checkpoint(path), equal_to((42, {'regret': [1, 2]})))
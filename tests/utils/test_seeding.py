@@ -0,0 +1,18 @@
+import numpy as np
+from hamcrest import assert_that, equal_to
+from numpy import testing as npt
+
+from cfre.utils.seeding import UniformStream
+
+
+def test_uniformStream_continuesAcrossBlocks():
+    stream = UniformStream(np.random.default_rng(0), block_size=3)
+    npt.assert_array_equal([stream.uniform() for _ in range(7)],
+                           np.random.default_rng(0).random(9)[:7])
+
+
+def test_uniformStream_integersCoverRangeUniformly():
+    stream = UniformStream(np.random.default_rng(0))
+    counts = np.bincount([stream.integer(6) for _ in range(60000)], minlength=6)
+    assert_that(len(counts), equal_to(6))
+    npt.assert_allclose(counts / 60000, 1 / 6, atol=0.01)